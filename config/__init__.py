@@ -7,11 +7,14 @@ for the Reltio MCP Strands Client.
 
 from .auth import OAuth2Client
 from .config import config
-from .exceptions import ConfigurationError, AuthenticationError
+from .exceptions import ConfigurationError, AuthenticationError, ReplayError, ToolCallError, PromptCancelledError
 
 __all__ = [
     "config",
     "OAuth2Client", 
     "ConfigurationError",
     "AuthenticationError",
+    "ReplayError",
+    "ToolCallError",
+    "PromptCancelledError",
 ] 
\ No newline at end of file
@@ -29,7 +29,17 @@ class OAuth2Client:
         self.endpoint = endpoint
         self._access_token: Optional[str] = None
         self._token_expiry: float = 0
-        
+
+    def token_expires_in(self) -> Optional[float]:
+        """Seconds until the cached token is due for refresh.
+
+        Returns:
+            Seconds left (negative once due), or None if no token was retrieved yet
+        """
+        if not self._access_token:
+            return None
+        return self._token_expiry - time.time()
+
     def get_access_token(self) -> str:
         """Get valid access token, refreshing if necessary.
         
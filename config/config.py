@@ -1,9 +1,19 @@
 """
 Simple configuration for Reltio AgentFlow MCP Server - Strands Client.
+
+The global ``config`` is created on first use rather than at import time. The
+system prompt file and the model settings in ``.env`` are cached and reloaded
+when their modification time changes, so newly created agents pick up edits
+without restarting the process.
 """
 
 import os
-from dotenv import load_dotenv
+import threading
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Optional, Set, Tuple
+
+from dotenv import dotenv_values, load_dotenv
 
 
 # OAuth endpoint is fixed for Reltio
@@ -15,8 +25,22 @@ class Config:
     
     def __init__(self, env_file: str = ".env"):
         """Initialize configuration from environment variables."""
-        if os.path.exists(env_file):
+        # Variables set outside the .env file always take precedence over it
+        self._env_file = env_file
+        self._external_env = set(os.environ)
+        self._env_mtime = self._mtime(env_file)
+        # Variables taken from the .env file, unset again when removed from it
+        self._env_applied: Set[str] = set()
+        if self._env_mtime is not None:
             load_dotenv(env_file)
+            self._env_applied = {
+                key for key, value in dotenv_values(env_file).items()
+                if key not in self._external_env and value is not None
+            }
+        self._reload_lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self._prompt_cache: Optional[Tuple[str, float, str]] = None
+        self._prompt_checked = 0.0
         
         # OAuth configuration
         self.oauth_client_id = os.getenv('OAUTH_CLIENT_ID', '')
@@ -32,13 +56,152 @@ class Config:
         self.openai_api_key = os.getenv('OPENAI_API_KEY', '')
         self.anthropic_api_key = os.getenv('ANTHROPIC_API_KEY', '')
         
-        # Model settings with defaults
+        # Model settings with defaults (hot reloaded from .env)
+        self._load_model_settings()
+        
+        # Hot reload of .env model settings and system_prompt.txt
+        self.config_hot_reload = os.getenv('CONFIG_HOT_RELOAD', 'true').lower() == 'true'
+        self.config_reload_interval = float(os.getenv('CONFIG_RELOAD_INTERVAL', '2'))
+        
+        # Client-side rate limiting (disabled by default)
+        self.rate_limit_enabled = os.getenv('RATE_LIMIT_ENABLED', 'false').lower() == 'true'
+        self.mcp_rate_limit_rps = float(os.getenv('MCP_RATE_LIMIT_RPS', '10'))
+        self.mcp_rate_limit_burst = int(os.getenv('MCP_RATE_LIMIT_BURST', '20'))
+        self.model_rate_limit_rps = float(os.getenv('MODEL_RATE_LIMIT_RPS', '2'))
+        self.model_rate_limit_burst = int(os.getenv('MODEL_RATE_LIMIT_BURST', '5'))
+        self.rate_limit_max_concurrency = int(os.getenv('RATE_LIMIT_MAX_CONCURRENCY', '16'))
+        self.rate_limit_max_retries = int(os.getenv('RATE_LIMIT_MAX_RETRIES', '2'))
+        
+        # MCP HTTP connection tuning
+        self.mcp_http2 = os.getenv('MCP_HTTP2', 'false').lower() == 'true'
+        self.mcp_pool_max_connections = int(os.getenv('MCP_POOL_MAX_CONNECTIONS', '20'))
+        self.mcp_pool_max_keepalive = int(os.getenv('MCP_POOL_MAX_KEEPALIVE', '10'))
+        self.mcp_keepalive_expiry = float(os.getenv('MCP_KEEPALIVE_EXPIRY', '60'))
+        self.mcp_connect_timeout = float(os.getenv('MCP_CONNECT_TIMEOUT', '10'))
+        self.mcp_read_timeout = float(os.getenv('MCP_READ_TIMEOUT', '300'))
+        self.mcp_share_connections = os.getenv('MCP_SHARE_CONNECTIONS', 'false').lower() == 'true'
+        
+        # Tool catalog filtering
+        self.toolset = os.getenv('TOOLSET', 'all')
+        self.toolsets_file = os.getenv('TOOLSETS_FILE', '')
+        self.tool_selection_top_k = int(os.getenv('TOOL_SELECTION_TOP_K', '0'))
+        
+        # Traffic record/replay for offline performance testing
+        self.record_file = os.getenv('RECORD_FILE', '')
+        self.replay_file = os.getenv('REPLAY_FILE', '')
+        self.replay_latency_scale = float(os.getenv('REPLAY_LATENCY_SCALE', '1.0'))
+        
+        # Composite bulk tools
+        self.bulk_tools_enabled = os.getenv('BULK_TOOLS_ENABLED', 'false').lower() == 'true'
+        self.bulk_max_concurrency = int(os.getenv('BULK_MAX_CONCURRENCY', '8'))
+        self.bulk_max_result_chars = int(os.getenv('BULK_MAX_RESULT_CHARS', '2000'))
+        
+        # Chat session persistence (disabled when SESSION_STORE is empty)
+        self.session_store = os.getenv('SESSION_STORE', '').lower()
+        self.session_store_path = os.getenv('SESSION_STORE_PATH', '')
+        self.session_max_bytes = int(os.getenv('SESSION_MAX_BYTES', '1000000'))
+        self.session_ref_threshold = int(os.getenv('SESSION_REF_THRESHOLD', '1024'))
+        self.session_idle_ttl = float(os.getenv('SESSION_IDLE_TTL', '604800'))
+        
+        # Speculative prefetch of read-only MCP calls (disabled without a rules file)
+        self.prefetch_rules_file = os.getenv('PREFETCH_RULES_FILE', '')
+        self.prefetch_max_concurrency = int(os.getenv('PREFETCH_MAX_CONCURRENCY', '4'))
+        self.prefetch_max_calls = int(os.getenv('PREFETCH_MAX_CALLS', '5'))
+        
+        # Spill oversize tool results to disk (disabled when the threshold is 0)
+        self.large_result_threshold = int(os.getenv('LARGE_RESULT_THRESHOLD', '0'))
+        self.result_store_dir = os.getenv('RESULT_STORE_DIR', '')
+        self.result_store_max_bytes = int(os.getenv('RESULT_STORE_MAX_BYTES', '500000000'))
+        self.result_page_items = int(os.getenv('RESULT_PAGE_ITEMS', '50'))
+        self.result_page_chars = int(os.getenv('RESULT_PAGE_CHARS', '20000'))
+        
+        # Memory profiling and history compaction for long-running workers
+        self.memory_profile = os.getenv('MEMORY_PROFILE', 'false').lower() == 'true'
+        self.memory_profile_output = os.getenv('MEMORY_PROFILE_OUTPUT', '')
+        self.history_slim = os.getenv('HISTORY_SLIM', 'false').lower() == 'true'
+        self.history_tool_result_max_chars = int(os.getenv('HISTORY_TOOL_RESULT_MAX_CHARS', '0'))
+        
+        # Default deadline of a prompt in seconds (0 disables)
+        self.prompt_timeout = float(os.getenv('PROMPT_TIMEOUT', '0'))
+        
+        # Priority classes and fair scheduling of agent turns across tenants
+        self.scheduler_enabled = os.getenv('SCHEDULER_ENABLED', 'false').lower() == 'true'
+        self.scheduler_max_concurrency = int(os.getenv('SCHEDULER_MAX_CONCURRENCY', '8'))
+        self.scheduler_interactive_max_concurrency = int(os.getenv('SCHEDULER_INTERACTIVE_MAX_CONCURRENCY', '8'))
+        self.scheduler_batch_max_concurrency = int(os.getenv('SCHEDULER_BATCH_MAX_CONCURRENCY', '4'))
+        self.scheduler_tenant_weights = os.getenv('SCHEDULER_TENANT_WEIGHTS', '')
+        self.default_priority = os.getenv('DEFAULT_PRIORITY', 'interactive').lower()
+        
+        # Footprint of the tool block against the model's input budget, and schema compaction
+        self.tool_schema_compaction = os.getenv('TOOL_SCHEMA_COMPACTION', 'warn').lower()
+        self.tool_schema_budget_fraction = float(os.getenv('TOOL_SCHEMA_BUDGET_FRACTION', '0.25'))
+        self.tool_description_max_chars = int(os.getenv('TOOL_DESCRIPTION_MAX_CHARS', '160'))
+        self.tool_schema_max_enum = int(os.getenv('TOOL_SCHEMA_MAX_ENUM', '10'))
+        self.model_context_window = int(os.getenv('MODEL_CONTEXT_WINDOW', '0'))
+        
+        # Share identical concurrent read-only MCP calls across all clients of the process
+        self.mcp_coalesce_enabled = os.getenv('MCP_COALESCE_ENABLED', 'false').lower() == 'true'
+        
+        # Background health probing with warm standby reconnects of the MCP session
+        self.health_watchdog_enabled = os.getenv('HEALTH_WATCHDOG_ENABLED', 'false').lower() == 'true'
+        self.health_watchdog_interval = float(os.getenv('HEALTH_WATCHDOG_INTERVAL', '30'))
+        self.health_watchdog_failure_threshold = int(os.getenv('HEALTH_WATCHDOG_FAILURE_THRESHOLD', '2'))
+        self.health_watchdog_probe_timeout = float(os.getenv('HEALTH_WATCHDOG_PROBE_TIMEOUT', '10'))
+    
+    @staticmethod
+    def _mtime(path: str) -> Optional[float]:
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
+    
+    def _load_model_settings(self) -> None:
+        """Read the model settings from the environment."""
         self.model_temperature = float(os.getenv('MODEL_TEMPERATURE', '0.7'))
         self.model_max_tokens = int(os.getenv('MODEL_MAX_TOKENS', '4096'))
         
+        # Explicit provider ("openai", "anthropic" or "local"); empty selects by available API key
+        self.model_provider = os.getenv('MODEL_PROVIDER', '').lower()
+        # OpenAI-compatible server for the local provider (llama.cpp, vLLM, Ollama, ...)
+        self.local_model_base_url = os.getenv('LOCAL_MODEL_BASE_URL', 'http://localhost:8080/v1')
+        self.local_model_api_key = os.getenv('LOCAL_MODEL_API_KEY', '')
+        
         # Model ID selection based on provider
         self._set_model_id()
     
+    def _due(self, last_check: float) -> bool:
+        return self.config_hot_reload and time.monotonic() - last_check >= self.config_reload_interval
+    
+    def refresh(self) -> bool:
+        """Reload the model settings if the .env file changed.
+        
+        The file modification time is checked at most once per
+        CONFIG_RELOAD_INTERVAL seconds. Settings exported in the process
+        environment are never overridden; settings removed from the file
+        fall back to their defaults.
+        
+        Returns:
+            bool: True if the settings were reloaded.
+        """
+        if not self._due(self._last_check):
+            return False
+        with self._reload_lock:
+            self._last_check = time.monotonic()
+            mtime = self._mtime(self._env_file)
+            if mtime is None or mtime == self._env_mtime:
+                return False
+            self._env_mtime = mtime
+            applied = set()
+            for key, value in dotenv_values(self._env_file).items():
+                if key not in self._external_env and value is not None:
+                    os.environ[key] = value
+                    applied.add(key)
+            for key in self._env_applied - applied:
+                os.environ.pop(key, None)
+            self._env_applied = applied
+            self._load_model_settings()
+        return True
+    
     def _set_model_id(self):
         """Set model ID based on preferred provider."""
         provider = self.get_preferred_model_provider()
@@ -47,18 +210,23 @@ class Config:
             self.model_id = os.getenv('MODEL_ID', 'gpt-4.1')
         elif provider == "anthropic":
             self.model_id = os.getenv('MODEL_ID', 'claude-3-5-sonnet-20241022')
+        elif provider == "local":
+            self.model_id = os.getenv('MODEL_ID', 'local-model')
         else:
             # Default fallback
             self.model_id = 'gpt-4.1'
     
     def get_preferred_model_provider(self) -> str:
         """
-        Determine the preferred model provider based on available API keys.
+        Determine the preferred model provider from MODEL_PROVIDER or the available API keys.
         
         Returns:
-            str: "openai" or "anthropic" based on available keys.
+            str: MODEL_PROVIDER when set ("openai", "anthropic" or "local"), otherwise
+                 "openai" or "anthropic" based on available keys.
                  Prefers OpenAI if both are available.
         """
+        if self.model_provider:
+            return self.model_provider
         if self.openai_api_key:
             return "openai"
         elif self.anthropic_api_key:
@@ -77,11 +245,21 @@ class Config:
         try:
             # Try to read from system_prompt.txt in the project root
             prompt_file = os.path.join(os.getcwd(), 'system_prompt.txt')
+            cached = self._prompt_cache
+            if cached and cached[0] == prompt_file and not self._due(self._prompt_checked):
+                return cached[2]
+            self._prompt_checked = time.monotonic()
             if os.path.exists(prompt_file):
+                mtime = self._mtime(prompt_file)
+                if cached and cached[0] == prompt_file and mtime is not None and cached[1] == mtime:
+                    return cached[2]
                 with open(prompt_file, 'r', encoding='utf-8') as f:
                     content = f.read().strip()
                     if content:  # Only return if file has content
+                        if mtime is not None:
+                            self._prompt_cache = (prompt_file, mtime, content)
                         return content
+            self._prompt_cache = None
         except Exception:
             # If anything goes wrong reading the file, fall back to default
             pass
@@ -90,5 +268,47 @@ class Config:
         return "You are a helpful AI assistant with access to Reltio AgentFlow MCP Server tools."
 
 
-# Global config instance
-config = Config() 
\ No newline at end of file
+# Times the first load of the global config, e.g. as a profiler span (None: not timed)
+_load_timer: Optional[Callable[[], ContextManager[Any]]] = None
+
+
+def set_load_timer(timer: Optional[Callable[[], ContextManager[Any]]]) -> None:
+    """Time the first load of the global config with the context managers made by ``timer``.
+    
+    Args:
+        timer: Factory of a context manager wrapping the load (None stops timing)
+    """
+    global _load_timer
+    _load_timer = timer
+
+
+class _LazyConfig:
+    """Proxy creating the global Config on first attribute access."""
+    
+    _instance: Optional[Config]
+    _lock: threading.Lock
+    
+    def __init__(self) -> None:
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+    
+    def _get(self) -> Config:
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    with _load_timer() if _load_timer else nullcontext():
+                        instance = Config()
+                    object.__setattr__(self, '_instance', instance)
+        return instance
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._get(), name)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._get(), name, value)
+
+
+# Global config instance, loaded on first use
+config = _LazyConfig()
@@ -10,4 +10,19 @@ class AuthenticationError(Exception):
 
 class ConfigurationError(Exception):
     """Raised when configuration validation fails."""
-    pass 
\ No newline at end of file
+    pass
+
+
+class ReplayError(Exception):
+    """Raised when recorded traffic cannot satisfy a replayed call."""
+    pass
+
+
+class ToolCallError(Exception):
+    """Raised when a direct MCP tool call is invalid or fails."""
+    pass
+
+
+class PromptCancelledError(Exception):
+    """Raised when a prompt is cancelled or exceeds its deadline."""
+    pass
@@ -7,8 +7,19 @@ Built on the Strands AI Agents Framework: https://github.com/strands-agents/sdk-
 Learn more at: https://strandsagents.com/
 """
 
-from .client import StrandsReltioClient
-from .task import process_prompt
+from typing import Any
 
 __version__ = "0.1.0"
-__all__ = ["StrandsReltioClient", "process_prompt"] 
\ No newline at end of file
+__all__ = ["StrandsReltioClient", "process_prompt"]
+
+
+def __getattr__(name: str) -> Any:
+    # Exports are imported lazily so lightweight modules (e.g. the CLIs'
+    # profiling helpers) can be imported without loading the agent SDKs
+    if name == "StrandsReltioClient":
+        from .client import StrandsReltioClient
+        return StrandsReltioClient
+    if name == "process_prompt":
+        from .task import process_prompt
+        return process_prompt
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}") 
\ No newline at end of file
@@ -0,0 +1,205 @@
+"""
+Client-side composite tools that batch many MCP calls into one tool call.
+
+Prompts such as "summarize these 200 entities" otherwise make the agent issue
+one MCP tool call per entity, each costing a model cycle and a network round
+trip. The ``bulk_call`` tool lets the model pass the whole list at once; the
+client deduplicates the values, fans the calls out with bounded concurrency
+and returns a single compact aggregated result.
+"""
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from strands.types.tools import ToolSpec, ToolUse
+
+from .tools import ClientTool, MCPCallFn
+from .toolsets import WRITE_TOOL_PATTERNS, Toolset
+
+logger = logging.getLogger(__name__)
+
+BULK_TOOL_NAME = "bulk_call"
+
+# Only read tools may be fanned out; bulk writes must stay explicit
+_READ_ONLY = Toolset("bulk", exclude=tuple(WRITE_TOOL_PATTERNS))
+
+
+def _result_text(result: Dict[str, Any]) -> str:
+    return "\n".join(
+        str(item.get("text", ""))
+        for item in result.get("content") or []
+        if isinstance(item, dict)
+    )
+
+
+def _compact(text: str, max_chars: int) -> Any:
+    """Parse JSON results so they are embedded without escaping, truncating large ones."""
+    if len(text) > max_chars:
+        return text[:max_chars] + f"... [truncated {len(text) - max_chars} chars]"
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _value_key(value: Any) -> str:
+    """Canonical key of a value, used both to deduplicate and to key its result."""
+    return (
+        value
+        if isinstance(value, str)
+        else json.dumps(value, sort_keys=True, default=str)
+    )
+
+
+def _input_properties(tool: Any) -> List[str]:
+    schema = tool.tool_spec.get("inputSchema") or {}
+    schema = schema.get("json", schema)
+    return list(schema.get("properties") or {})
+
+
+def create_bulk_tool(
+    tools: Sequence[Any],
+    call: MCPCallFn,
+    tenant_id: str,
+    max_concurrency: int = 8,
+    max_result_chars: int = 2000,
+) -> Optional[ClientTool]:
+    """Create the ``bulk_call`` tool for the read-only tools of a catalog.
+
+    Args:
+        tools: MCP tools available to the agent
+        call: Client MCP call path used for every fanned-out call
+        tenant_id: Tenant injected into calls whose schema has a ``tenant_id`` argument
+        max_concurrency: Maximum number of MCP calls in flight
+        max_result_chars: Per-item size limit in the aggregated result
+
+    Returns:
+        The composite tool, or None if the catalog has no read-only tools
+    """
+    targets: Dict[str, Any] = {}
+    # Arguments declared by each tool's input schema (empty when it declares none)
+    properties: Dict[str, List[str]] = {}
+    for tool in tools:
+        if _READ_ONLY.matches(tool.tool_name):
+            targets[tool.tool_name] = tool
+            properties[tool.tool_name] = _input_properties(tool)
+    if not targets:
+        return None
+
+    def error(tool_use: ToolUse, message: str) -> Dict[str, Any]:
+        return {
+            "toolUseId": tool_use["toolUseId"],
+            "status": "error",
+            "content": [{"text": message}],
+        }
+
+    def run(tool_use: ToolUse) -> Dict[str, Any]:
+        params = tool_use.get("input") or {}
+        tool_name = str(params.get("tool_name") or "")
+        argument_name = str(params.get("argument_name") or "")
+        common = dict(params.get("arguments") or {})
+        tool = targets.get(tool_name)
+        if tool is None or not argument_name:
+            return error(
+                tool_use,
+                f"bulk_call supports these tools: {', '.join(sorted(targets))}",
+            )
+        declared = properties[tool_name]
+        if declared and argument_name not in declared:
+            return error(
+                tool_use,
+                f"{tool_name} has no argument '{argument_name}'; its arguments are: {', '.join(declared)}",
+            )
+        if "tenant_id" in declared:
+            common.setdefault("tenant_id", tenant_id)
+        mcp_name = getattr(getattr(tool, "mcp_tool", None), "name", None) or tool_name
+
+        # 1 and "1" share a key, so they are called once and reported under one key
+        unique: Dict[str, Any] = {}
+        for value in params.get("values") or []:
+            unique.setdefault(_value_key(value), value)
+
+        def call_one(index: int, value: Any) -> Dict[str, Any]:
+            arguments = dict(common, **{argument_name: value})
+            return call(f"{tool_use['toolUseId']}-{index}", mcp_name, arguments)
+
+        results: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        workers = max(1, min(max_concurrency, len(unique)))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="bulk-call"
+        ) as executor:
+            futures = [
+                executor.submit(call_one, i, value)
+                for i, value in enumerate(unique.values())
+            ]
+            for key, future in zip(unique, futures, strict=True):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors[key] = str(e)
+                    continue
+                if result.get("status") == "error":
+                    errors[key] = _result_text(result)[:max_result_chars]
+                else:
+                    results[key] = _compact(_result_text(result), max_result_chars)
+
+        logger.info(
+            f"bulk_call {tool_name}: {len(unique)} unique of {len(params.get('values') or [])} values, "
+            f"{len(errors)} failed"
+        )
+        summary = {
+            "tool": tool_name,
+            "requested": len(params.get("values") or []),
+            "unique": len(unique),
+            "succeeded": len(results),
+            "failed": len(errors),
+            "results": results,
+        }
+        if errors:
+            summary["errors"] = errors
+        return {
+            "toolUseId": tool_use["toolUseId"],
+            "status": "success",
+            "content": [
+                {"text": json.dumps(summary, separators=(",", ":"), default=str)}
+            ],
+        }
+
+    tool_spec: ToolSpec = {
+        "name": BULK_TOOL_NAME,
+        "description": (
+            "Call one read-only tool for many values (e.g. a list of entity IDs) in a single step. "
+            "Duplicates are removed, calls run in parallel and results are returned together. "
+            "Prefer this over calling the same tool repeatedly."
+        ),
+        "inputSchema": {
+            "json": {
+                "type": "object",
+                "properties": {
+                    "tool_name": {
+                        "type": "string",
+                        "enum": sorted(targets),
+                        "description": "Tool to call for each value",
+                    },
+                    "argument_name": {
+                        "type": "string",
+                        "description": "Argument of the tool that receives each value",
+                    },
+                    "values": {
+                        "type": "array",
+                        "items": {},
+                        "description": "Values to fan out over, e.g. entity IDs",
+                    },
+                    "arguments": {
+                        "type": "object",
+                        "description": "Arguments shared by every call",
+                    },
+                },
+                "required": ["tool_name", "argument_name", "values"],
+            }
+        },
+    }
+    return ClientTool(BULK_TOOL_NAME, tool_spec, run)
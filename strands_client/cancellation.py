@@ -0,0 +1,126 @@
+"""
+Cancellation tokens and deadlines for the Reltio MCP Strands Client.
+
+Every ``process_prompt`` turn runs under a ``CancellationToken``. Its event is
+passed to the Strands agent as the invocation's ``cancel_signal``, to the
+in-flight MCP calls of the turn and to ``CancellableModel``, which aborts a
+model stream still waiting on the provider. A deadline sets the same event
+when it expires, so timeouts and explicit cancellation (Ctrl-C in chat, a
+client disconnect in a server) stop the turn the same way::
+
+    token = CancellationToken(timeout=30)
+    threading.Timer(5, token.cancel).start()
+    client.process_prompt("Summarize entity 123", cancel_token=token)
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Cancellation reasons
+CANCELLED = "cancelled"
+DEADLINE = "deadline"
+
+
+class CancellationToken:
+    """Thread-safe cancellation signal with an optional deadline."""
+
+    def __init__(self, timeout: Optional[float] = None):
+        """Initialize the token.
+
+        Args:
+            timeout: Seconds until the token cancels itself (optional)
+        """
+        self.event = threading.Event()
+        self.reason: Optional[str] = None
+        self.cancelled_at: Optional[float] = None
+        self.deadline: Optional[float] = None
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        if timeout:
+            self.set_timeout(timeout)
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the token was cancelled or its deadline expired."""
+        return self.event.is_set()
+
+    def cancel(self, reason: str = CANCELLED) -> bool:
+        """Cancel the token; the first reason wins.
+
+        Returns:
+            True if this call cancelled the token, False if it was already cancelled
+        """
+        with self._lock:
+            if self.event.is_set():
+                return False
+            self.reason = reason
+            self.cancelled_at = time.monotonic()
+            self.event.set()
+        return True
+
+    def set_timeout(self, seconds: float) -> None:
+        """Arm a deadline, keeping an earlier one if already set."""
+        deadline = time.monotonic() + seconds
+        with self._lock:
+            if self.event.is_set() or (
+                self.deadline is not None and self.deadline <= deadline
+            ):
+                return
+            if self._timer:
+                self._timer.cancel()
+            self.deadline = deadline
+            self._timer = threading.Timer(seconds, self.cancel, args=(DEADLINE,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without a deadline."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def close(self) -> None:
+        """Disarm the deadline timer once the work is over."""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+
+class CancellationStats:
+    """Counters of cancelled turns, model streams and MCP calls."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._turns: Dict[str, int] = {}
+        self._counters: Dict[str, int] = {"model_streams": 0, "mcp_calls": 0}
+        self._stop_seconds_total = 0.0
+        self._stop_seconds_max = 0.0
+
+    def record_turn(self, reason: str, stop_seconds: float) -> None:
+        """Count a cancelled turn and the time it took to stop after cancellation."""
+        with self._lock:
+            self._turns[reason] = self._turns.get(reason, 0) + 1
+            self._stop_seconds_total += stop_seconds
+            self._stop_seconds_max = max(self._stop_seconds_max, stop_seconds)
+
+    def count(self, counter: str) -> None:
+        """Count a cancelled model stream or MCP call."""
+        with self._lock:
+            self._counters[counter] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Cancelled turns by reason, cancelled streams and calls, and stop latency."""
+        with self._lock:
+            turns = sum(self._turns.values())
+            return {
+                "turns_cancelled": turns,
+                "by_reason": dict(self._turns),
+                "model_streams_cancelled": self._counters["model_streams"],
+                "mcp_calls_cancelled": self._counters["mcp_calls"],
+                "stop_avg_seconds": (
+                    round(self._stop_seconds_total / turns, 4) if turns else 0.0
+                ),
+                "stop_max_seconds": round(self._stop_seconds_max, 4),
+            }
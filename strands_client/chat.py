@@ -10,7 +10,16 @@ No complex abstractions - just simple, readable code.
 import argparse
 import logging
 import os
+import signal
 import sys
+from types import FrameType
+from typing import TYPE_CHECKING, Optional
+
+from strands_client.cancellation import CancellationToken
+from strands_client.profiling import add_profile_arguments, profile_run, span
+
+if TYPE_CHECKING:
+    from strands_client.client import StrandsReltioClient
 
 def setup_logging(debug: bool = False) -> None:
     """Setup simple logging."""
@@ -18,22 +27,52 @@ def setup_logging(debug: bool = False) -> None:
     logging.basicConfig(level=level, format='%(message)s')
 
 
+def process_prompt_cancellable(client: "StrandsReltioClient", prompt: str) -> str:
+    """Process a prompt; Ctrl-C cancels the turn, a second Ctrl-C interrupts the chat."""
+    token = CancellationToken()
+    
+    def interrupt(signum: int, frame: Optional[FrameType]) -> None:
+        if token.cancelled:
+            raise KeyboardInterrupt
+        print("\n⏹️ Cancelling... (press Ctrl-C again to quit)")
+        token.cancel("interrupted")
+    
+    previous = signal.signal(signal.SIGINT, interrupt)
+    try:
+        return client.process_prompt(prompt, cancel_token=token)
+    finally:
+        signal.signal(signal.SIGINT, previous)
 
-def run_interactive_chat() -> int:
-    """Run interactive chat loop."""
+
+def run_interactive_chat(session_id: Optional[str] = None) -> int:
+    """Run interactive chat loop.
+    
+    Args:
+        session_id: Optional persisted session to resume
+    """
     try:
         # Import here to avoid issues if environment is not set up
-        from strands_client.client import StrandsReltioClient
+        with span("import"):
+            from config import PromptCancelledError
+            from strands_client.client import StrandsReltioClient
         
         print("🔄 Initializing Reltio MCP Strands Client...")
         client = StrandsReltioClient()
+        if session_id:
+            if client.resume_session(session_id):
+                print(f"📂 Resumed session {session_id}")
+            else:
+                print(f"⚠️ Session {session_id} not found, starting a new conversation")
         print("✅ Client ready!\n")
+        if client.session_id:
+            print(f"💾 Session ID: {client.session_id} (resume with --session {client.session_id})")
         
         print("🤖 Reltio MCP Chat - Strands Framework")
         print("=" * 50)
         print("Welcome to the interactive chat with Reltio MCP AgentFlow!")
         print("Type your questions or requests below.")
         print("Commands: 'quit', 'exit' to stop | 'health' for health check | 'clear' to clear screen")
+        print("Press Ctrl-C while the agent is working to cancel the current request")
         print("=" * 50)
         
         while True:
@@ -62,7 +101,9 @@ def run_interactive_chat() -> int:
                 
                 print("\n🤔 Agent is thinking...")        
                 try:
-                    client.process_prompt(prompt)
+                    process_prompt_cancellable(client, prompt)
+                except PromptCancelledError:
+                    print("\n⏹️ Request cancelled")
                 except Exception as e:
                     print(f"\n❌ Error processing prompt: {e}")
                 
@@ -90,6 +131,8 @@ def main() -> int:
 Examples:
   %(prog)s                    # Start interactive chat
   %(prog)s --debug            # Start with debug logging
+  %(prog)s --profile          # Print a timing breakdown on exit
+  %(prog)s --session ID       # Resume a saved conversation (requires SESSION_STORE)
         """
     )
     parser.add_argument(
@@ -97,6 +140,11 @@ Examples:
         action="store_true",
         help="Enable debug logging"
     )
+    parser.add_argument(
+        "--session",
+        help="Resume a saved conversation by session ID (requires SESSION_STORE)"
+    )
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
     
@@ -104,7 +152,8 @@ Examples:
     setup_logging(args.debug)
     
     # Run interactive chat
-    return run_interactive_chat()
+    with profile_run(args):
+        return run_interactive_chat(args.session)
 
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file
@@ -8,29 +8,141 @@ Strands Framework: https://github.com/strands-agents/sdk-python
 Official Site: https://strandsagents.com/
 """
 
+import copy
 import json
 import logging
+import threading
+import time
 import uuid
-from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Optional, Dict, Any, Callable, Iterator, List, Mapping, Sequence, Tuple, cast
 from mcp.client.streamable_http import streamablehttp_client
 from strands import Agent
+from strands.tools.mcp import MCPAgentTool
 from strands.tools.mcp.mcp_client import MCPClient
 from strands.models.openai import OpenAIModel
 from strands.models.anthropic import AnthropicModel
+from strands.models.model import Model
+from strands.types.content import Messages
+from strands.types.tools import ToolSpec
 
-from config import config, OAuth2Client, ConfigurationError
+from config import config, OAuth2Client, ConfigurationError, PromptCancelledError, ToolCallError
+from .bulk import create_bulk_tool
+from .cancellation import CancellationStats, CancellationToken
+from .coalescing import SingleFlight, call_key, is_coalescable, shared_single_flight
+from .direct import ArgumentValidator, ToolNamespace, parse_tool_result, tool_input_schema
+from .connections import (
+    HTTPSettings,
+    connection_stats,
+    create_http_client_factory,
+    shared_connections,
+)
+from .memory import MemoryProfiler, find_turn_start, slim_history
+from .models import CancellableModel, ProfiledModel, RateLimitedModel
+from .prefetch import PrefetchBatch, Prefetcher, load_prefetch_rules
+from .profiling import get_profiler, span
+from .recording import (
+    RecordingModel,
+    ReplayModel,
+    TrafficRecorder,
+    TrafficRecording,
+    recording_transport,
+    replay_transport,
+)
+from .scheduling import PRIORITY_CLASSES, FairScheduler, shared_scheduler
+from .schemas import ALWAYS, AUTO, COMPACTION_MODES, OFF, compact_tool_spec, context_window, tool_block_tokens
+from .sessions import SessionStore, create_session_store
+from .rate_limit import RateLimiterRegistry, is_rate_limited, retry_after_seconds
+from .results import LargeResultHandler, ResultStore
+from .tools import ClientTool
+from .watchdog import HealthWatchdog, UNKNOWN
+from .toolsets import (
+    BUILTIN_TOOLSETS,
+    KeywordToolSelector,
+    Toolset,
+    filter_tools,
+    load_toolsets,
+    savings_report,
+)
 
 logger = logging.getLogger(__name__)
 
+# Marks answers cut to fit the aggregation prompt of reduce_results
+_TRUNCATED = "... [truncated]"
+
 
 class StrandsReltioClient:
     """Client for integrating Strands framework with Reltio MCP Clients."""
     
-    def __init__(self, oauth_client: Optional[OAuth2Client] = None):
+    # Optional client-side components; None when the feature is disabled
+    _rate_limiters: Optional[RateLimiterRegistry] = None
+    _http_settings: Optional[HTTPSettings] = None
+    _shared_connection_key: Optional[Tuple[str, str]] = None
+    _toolset: Optional[str] = None
+    _toolsets: Dict[str, Toolset] = BUILTIN_TOOLSETS
+    _tool_selection_top_k: int = 0
+    _tool_selection_report: Optional[Dict[str, Any]] = None
+    _agent_tool_names: Optional[List[str]] = None
+    # Per-prompt toolset the agent tools were last selected for (None: client toolset)
+    _agent_toolset: Optional[str] = None
+    _recorder: Optional[TrafficRecorder] = None
+    _replay: Optional[TrafficRecording] = None
+    _bulk_tools_enabled: bool = False
+    _session_store: Optional[SessionStore] = None
+    session_id: Optional[str] = None
+    _mcp_tool_cache: Optional[List[Any]] = None
+    _prefetcher: Optional[Prefetcher] = None
+    _prefetch_batch: Optional[PrefetchBatch] = None
+    _tool_namespace: Optional[ToolNamespace] = None
+    _result_handler: Optional[LargeResultHandler] = None
+    _memory_profiler: Optional[MemoryProfiler] = None
+    _history_slim: bool = False
+    _history_result_max_chars: int = 0
+    # Tool wrappers shared by every agent of the client instead of per-agent copies
+    _wrapped_tools: Optional[Dict[str, Tuple[Any, bool, ClientTool]]] = None
+    _schema_compaction: str = OFF
+    _compact_specs: Optional[Dict[str, Tuple[Any, ToolSpec]]] = None
+    _tool_schema_key: Optional[Tuple[Any, ...]] = None
+    _tool_schema_report: Optional[Dict[str, Any]] = None
+    _bulk_tool_cache: Optional[Tuple[Tuple[str, ...], Optional[ClientTool]]] = None
+    # Token of the turn in progress, read by its model and MCP calls
+    _cancel_token: Optional[CancellationToken] = None
+    _cancel_stats: Optional[CancellationStats] = None
+    _prompt_timeout: float = 0.0
+    _scheduler: Optional[FairScheduler] = None
+    _single_flight: Optional[SingleFlight] = None
+    priority: str = "interactive"
+    _watchdog: Optional[HealthWatchdog] = None
+    # Set when the watchdog swapped in a new session the agent has not moved to yet
+    _standby_pending: bool = False
+    _retired_mcp_clients: Optional[List[MCPClient]] = None
+    # Fan-out siblings in progress and the tokens of the fan-out prompts, for cancel()
+    _fan_out_siblings: Optional[List["StrandsReltioClient"]] = None
+    _fan_out_tokens: Optional[List[CancellationToken]] = None
+    _session_token_refresh_at: Optional[float] = None
+    
+    def __init__(
+        self,
+        oauth_client: Optional[OAuth2Client] = None,
+        toolset: Optional[str] = None,
+        record_file: Optional[str] = None,
+        replay_file: Optional[str] = None,
+        mcp_tools: Optional[List[Any]] = None,
+        traffic: Optional[TrafficRecording] = None,
+        priority: Optional[str] = None,
+    ):
         """Initialize Strands Reltio client.
         
         Args:
             oauth_client: OAuth2Client instance (optional, will create from config if None)
+            toolset: Default toolset for agents (optional, defaults to TOOLSET from config)
+            record_file: Record MCP and model traffic to this file (optional, defaults to RECORD_FILE)
+            replay_file: Serve MCP and model traffic from this recording (optional, defaults to REPLAY_FILE)
+            mcp_tools: MCP tool definitions listed earlier (optional); skips tool listing on connect
+            traffic: Serve MCP and model traffic from this loaded recording or stand-in (optional)
+            priority: Default priority class of the prompts, "interactive" or "batch" (optional, defaults to DEFAULT_PRIORITY)
         """
         self.oauth_client = oauth_client or OAuth2Client(
             client_id=config.oauth_client_id,
@@ -49,13 +161,80 @@ class StrandsReltioClient:
         self._tools: Optional[List] = None
         self._tool_names: List[str] = []
         self._connection_started: bool = False
+        self._mcp_tool_cache = mcp_tools
+        self._session_lock = threading.Lock()
+        
+        if config.rate_limit_enabled:
+            self._rate_limiters = RateLimiterRegistry.from_config(config)
+        self._http_settings = HTTPSettings.from_config(config)
+        self._tool_selectors: Dict[str, KeywordToolSelector] = {}
+        self._argument_validators: Dict[str, ArgumentValidator] = {}
+        self._cancel_stats = CancellationStats()
         
         logger.info("StrandsReltioClient initialized - starting connections...")
         
         # Establish connections immediately during initialization
         try:
+            self._toolsets = load_toolsets(config.toolsets_file)
+            self._toolset = toolset or config.toolset
+            self._get_toolset(self._toolset)
+            self._tool_selection_top_k = config.tool_selection_top_k
+            self._schema_compaction = config.tool_schema_compaction
+            if self._schema_compaction not in COMPACTION_MODES:
+                raise ConfigurationError(
+                    f"Unknown TOOL_SCHEMA_COMPACTION '{self._schema_compaction}'. "
+                    f"Use one of: {', '.join(COMPACTION_MODES)}"
+                )
+            self._bulk_tools_enabled = config.bulk_tools_enabled
+            self._prompt_timeout = config.prompt_timeout
+            self.priority = priority or config.default_priority
+            if self.priority not in PRIORITY_CLASSES:
+                raise ConfigurationError(
+                    f"Unknown priority class '{self.priority}'. Use one of: {', '.join(PRIORITY_CLASSES)}"
+                )
+            if config.scheduler_enabled:
+                self._scheduler = shared_scheduler(config)
+            if config.mcp_coalesce_enabled:
+                self._single_flight = shared_single_flight()
+            self._history_slim = config.history_slim
+            self._history_result_max_chars = config.history_tool_result_max_chars
+            if config.memory_profile:
+                self._memory_profiler = MemoryProfiler()
+            if config.large_result_threshold:
+                self._result_handler = LargeResultHandler(
+                    ResultStore(config.result_store_dir or None, config.result_store_max_bytes),
+                    config.large_result_threshold,
+                    page_items=config.result_page_items,
+                    page_chars=config.result_page_chars,
+                )
+            self._session_store = create_session_store(config)
+            if self._session_store:
+                self.session_id = uuid.uuid4().hex
+            
+            replay_file = replay_file or config.replay_file
+            record_file = record_file or config.record_file
+            if traffic is not None:
+                self._replay = traffic
+            elif replay_file:
+                self._replay = TrafficRecording.load(replay_file, config.replay_latency_scale)
+            elif record_file:
+                self._recorder = TrafficRecorder(record_file)
+            
             self.start_connection()
+            if config.prefetch_rules_file:
+                self._prefetcher = Prefetcher(
+                    load_prefetch_rules(config.prefetch_rules_file),
+                    self._tools or [],
+                    self._prefetch_call,
+                    self.tenant_id,
+                    max_concurrency=config.prefetch_max_concurrency,
+                    max_calls=config.prefetch_max_calls,
+                )
             self.create_agent()
+            if self._memory_profiler:
+                self._memory_profiler.snapshot("ready", cast(List[Dict[str, Any]], self._current_agent().messages))
+            if config.health_watchdog_enabled:
+                self._start_watchdog()
             logger.info("StrandsReltioClient ready for use")
         except Exception as e:
             logger.error(f"Failed to initialize StrandsReltioClient: {e}")
@@ -63,7 +242,21 @@ class StrandsReltioClient:
     
     def _create_mcp_transport(self):
         """Create MCP transport with authentication headers."""
-        token = self.oauth_client.get_access_token()
+        if self._replay:
+            # Serve MCP traffic from the recording, no network or OAuth needed
+            return lambda: replay_transport(self._replay)
+        
+        with span("oauth_token"):
+            token = self.oauth_client.get_access_token()
+        
+        # Tuned connection pool shared by all requests of the MCP session
+        transport_kwargs: Dict[str, Any] = {}
+        if self._http_settings:
+            transport_kwargs["httpx_client_factory"] = create_http_client_factory(
+                self._http_settings, connection_stats
+            )
+            transport_kwargs["timeout"] = self._http_settings.connect_timeout
+            transport_kwargs["sse_read_timeout"] = self._http_settings.read_timeout
         
         # Create a transport callable that includes authentication headers
         def transport_callable():
@@ -72,16 +265,19 @@ class StrandsReltioClient:
                 headers={
                     "Authorization": f"Bearer {token}",
                     "Content-Type": "application/json"
-                }
+                },
+                **transport_kwargs
             )
         
+        if self._recorder:
+            return lambda: recording_transport(transport_callable(), self._recorder)
         return transport_callable
     
     def _create_model(self):
         """Create appropriate model object based on configuration.
         
         Returns:
-            Configured model object (OpenAIModel or AnthropicModel)
+            Configured model object (OpenAIModel for OpenAI and local servers, or AnthropicModel)
             
         Raises:
             ConfigurationError: If no valid API key is found
@@ -91,6 +287,22 @@ class StrandsReltioClient:
         temperature = config.model_temperature
         max_tokens = config.model_max_tokens
         
+        model: Model
+        if self._replay:
+            model = ReplayModel(self._replay, model_id)
+        else:
+            model = self._create_provider_model(provider, model_id, temperature, max_tokens)
+            if self._recorder:
+                model = RecordingModel(model, self._recorder)
+        if self._rate_limiters:
+            model = RateLimitedModel(model, self._rate_limiters.for_provider(provider))
+        profiler = get_profiler()
+        if profiler:
+            model = ProfiledModel(model, profiler, model_id)
+        return CancellableModel(model, self._cancel_stats)
+    
+    def _create_provider_model(self, provider: str, model_id: str, temperature: float, max_tokens: int) -> Model:
+        """Create the provider SDK model object."""
         if provider == "openai":
             logger.info(f"Creating OpenAI model: {model_id} (max_tokens: {max_tokens}, temperature: {temperature})")
             return OpenAIModel(
@@ -115,6 +327,25 @@ class StrandsReltioClient:
                     "temperature": temperature,
                 }
             )
+        elif provider == "local":
+            # OpenAI-compatible server on this machine or network; no hosted LLM round trip
+            base_url = config.local_model_base_url
+            logger.info(f"Creating local model: {model_id} at {base_url} (max_tokens: {max_tokens}, temperature: {temperature})")
+            return OpenAIModel(
+                client_args={
+                    "api_key": config.local_model_api_key or "local",
+                    "base_url": base_url,
+                },
+                model_id=model_id,
+                params={
+                    "max_tokens": max_tokens,
+                    "temperature": temperature,
+                }
+            )
+        elif config.model_provider:
+            raise ConfigurationError(
+                f"Unknown MODEL_PROVIDER '{config.model_provider}'. Use one of: openai, anthropic, local"
+            )
         else:
             raise ConfigurationError("No valid API key found. Please set OPENAI_API_KEY or ANTHROPIC_API_KEY environment variable.")
     
@@ -129,14 +360,14 @@ class StrandsReltioClient:
             return self._tools
             
         try:
-            transport_callable = self._create_mcp_transport()
-            
-            # Create MCP client
-            self._mcp_client = MCPClient(transport_callable)
-            
-            # Start the connection and get tools
-            self._mcp_client.start()  # Start the background thread
-            tools = self._mcp_client.list_tools_sync()
+            if config.mcp_share_connections:
+                # Reuse the session (and its warm connections) of other clients
+                # on the same endpoint and OAuth client
+                key = (self.mcp_endpoint, self.oauth_client.client_id)
+                self._mcp_client, tools = shared_connections.acquire(key, self._connect_mcp)
+                self._shared_connection_key = key
+            else:
+                self._mcp_client, tools = self._connect_mcp()
             self._tools = tools
             
             # Extract and store tool names for easy access
@@ -151,58 +382,991 @@ class StrandsReltioClient:
             logger.error(f"Failed to start MCP connection: {e}")
             raise ConfigurationError(f"MCP setup failed: {e}")
       
-    def create_agent(self, system_prompt: str = None) -> Agent:
+    def _connect_mcp(self) -> Tuple[MCPClient, List]:
+        """Open a new MCP session and list its tools.
+        
+        Returns:
+            Tuple of the started MCPClient and its tools
+        """
+        transport_callable = self._create_mcp_transport()
+        
+        # Create MCP client
+        mcp_client = MCPClient(transport_callable)
+        
+        # Start the connection and get tools
+        with span("mcp_connect"):
+            mcp_client.start()  # Start the background thread
+        with span("mcp_list_tools"):
+            if self._mcp_tool_cache is not None:
+                tools = [MCPAgentTool(tool, mcp_client) for tool in self._mcp_tool_cache]
+            else:
+                tools = mcp_client.list_tools_sync()
+        return mcp_client, tools
+    
+    def close(self) -> None:
+        """Close the MCP session, or release it if it is shared with other clients."""
+        if not self._connection_started:
+            return
+        if self._watchdog:
+            self._watchdog.stop()
+            self._watchdog = None
+        try:
+            if self._shared_connection_key:
+                shared_connections.release(self._shared_connection_key)
+                self._shared_connection_key = None
+            elif self._mcp_client:
+                self._mcp_client.stop(None, None, None)
+            self._stop_retired_sessions()
+        finally:
+            self._connection_started = False
+            if self._prefetcher:
+                self._prefetcher.close()
+            if self._result_handler:
+                self._result_handler.store.close()
+            if self._memory_profiler:
+                if config.memory_profile_output:
+                    self._memory_profiler.write(config.memory_profile_output)
+                self._memory_profiler.stop()
+            if self._recorder:
+                self._recorder.close()
+            logger.info("MCP connection closed")
+      
+    def create_agent(self, system_prompt: str = None, toolset: Optional[str] = None) -> Agent:
         """
         Create an agent with the configured model and MCP tools.
         
         Args:
             system_prompt: Optional custom system prompt. If not provided, 
                           will read from system_prompt.txt file or use default.
+            toolset: Optional toolset name overriding the client default.
         
         Returns:
             Agent: Configured agent ready for processing prompts.
         """
         # Connection is already established during initialization
-        model = self._create_model()
-        prompt = system_prompt or config.get_system_prompt()
-        prompt += f"\n\n For all MCP tool executions, you must use {self.tenant_id} as the tenant_id of the tool input."
-        # Create agent with configurable system prompt
-        self._agent = Agent(
-            tools=self._tools,
-            model=model,
-            system_prompt=prompt,
-        )
+        with span("agent_create"):
+            # Pick up edited model settings; MCP connections are left untouched
+            if config.refresh():
+                logger.info("Model settings reloaded from .env")
+            model = self._create_model()
+            prompt = system_prompt or config.get_system_prompt()
+            prompt += f"\n\n For all MCP tool executions, you must use {self.tenant_id} as the tenant_id of the tool input."
+            # Create agent with configurable system prompt
+            tools = self._select_tools(toolset)
+            self._agent = Agent(
+                tools=self._agent_tools(tools),
+                model=model,
+                system_prompt=prompt,
+            )
+            self._agent_tool_names = [tool.tool_name for tool in tools or []]
+            self._agent_toolset = toolset
         
         logger.info("Strands agent created successfully")
         return self._agent
     
-    def process_prompt(self, prompt: str) -> str:
+    def _get_toolset(self, name: str) -> Toolset:
+        """Look up a toolset by name.
+        
+        Raises:
+            ConfigurationError: If the toolset is not defined
+        """
+        try:
+            return self._toolsets[name]
+        except KeyError:
+            raise ConfigurationError(
+                f"Unknown toolset '{name}'. Available toolsets: {', '.join(sorted(self._toolsets))}"
+            ) from None
+    
+    def _select_tools(self, toolset: Optional[str] = None, prompt: Optional[str] = None) -> List:
+        """Select the MCP tools to expose to the model.
+        
+        Args:
+            toolset: Toolset name (defaults to the client toolset)
+            prompt: Prompt used for dynamic selection when TOOL_SELECTION_TOP_K is set
+            
+        Returns:
+            Selected tools (``self._tools`` itself when nothing is filtered out)
+        """
+        name = toolset or self._toolset or "all"
+        all_tools: List[Any] = self._tools if self._tools is not None else []
+        tools = all_tools
+        if name != "all":
+            tools = filter_tools(tools, self._get_toolset(name))
+        
+        top_k = self._tool_selection_top_k
+        if prompt and top_k and len(tools) > top_k:
+            if name not in self._tool_selectors:
+                self._tool_selectors[name] = KeywordToolSelector(tools)
+            tools = self._tool_selectors[name].select(prompt, top_k)
+        
+        if tools is not all_tools:
+            self._tool_selection_report = savings_report(all_tools, tools, name)
+            report = self._tool_selection_report
+            logger.info(
+                f"Toolset '{name}': {report['tools_selected']}/{report['tools_total']} tools, "
+                f"~{report['tokens_saved']} tool-spec tokens saved per request"
+            )
+        return tools
+    
+    def _agent_tools(self, tools: List) -> List:
+        """Tools handed to new agents.
+        
+        When client-side call controls are enabled the MCP tools are wrapped so
+        that agent tool calls go through ``_call_mcp_tool``. Composite bulk tools
+        are added alongside the MCP tools when enabled. Tools whose schemas are
+        compacted are always wrapped, to carry the compacted specification.
+        """
+        agent_tools = tools
+        compact = self._compact_schemas(tools or [])
+        if compact or self._intercepts_tool_calls():
+            agent_tools = [self._wrapped_tool(tool, compact) for tool in tools or []]
+        if self._bulk_tools_enabled:
+            names = tuple(tool.tool_name for tool in tools or [])
+            if self._bulk_tool_cache is None or self._bulk_tool_cache[0] != names:
+                self._bulk_tool_cache = (names, create_bulk_tool(
+                    tools or [],
+                    self._call_turn_tool,
+                    self.tenant_id,
+                    max_concurrency=config.bulk_max_concurrency,
+                    max_result_chars=config.bulk_max_result_chars,
+                ))
+            bulk_tool = self._bulk_tool_cache[1]
+            if bulk_tool:
+                agent_tools = list(agent_tools or []) + [bulk_tool]
+        if self._result_handler:
+            agent_tools = list(agent_tools or []) + [self._result_handler.create_tool()]
+        return agent_tools
+    
+    def _wrapped_tool(self, tool: Any, compact: bool = False) -> ClientTool:
+        """Wrapper routing an MCP tool through ``_call_agent_tool``, created once per tool."""
+        if self._wrapped_tools is None:
+            self._wrapped_tools = {}
+        cached = self._wrapped_tools.get(tool.tool_name)
+        if cached is None or cached[0] is not tool or cached[1] != compact:
+            spec = self._compact_spec(tool) if compact else None
+            cached = (tool, compact, ClientTool.wrap_mcp_tool(tool, self._call_agent_tool, spec))
+            self._wrapped_tools[tool.tool_name] = cached
+        return cached[2]
+    
+    def _compact_spec(self, tool: Any) -> ToolSpec:
+        """Compacted specification of an MCP tool, computed once per tool."""
+        if self._compact_specs is None:
+            self._compact_specs = {}
+        cached = self._compact_specs.get(tool.tool_name)
+        if cached is None or cached[0] is not tool:
+            spec = compact_tool_spec(tool.tool_spec, config.tool_description_max_chars, config.tool_schema_max_enum)
+            cached = (tool, cast(ToolSpec, spec))
+            self._compact_specs[tool.tool_name] = cached
+        return cached[1]
+    
+    def _compact_schemas(self, tools: List) -> bool:
+        """Measure the tool block against the model's input budget and decide on compaction.
+        
+        The budget is TOOL_SCHEMA_BUDGET_FRACTION of the context window minus
+        MODEL_MAX_TOKENS. A tool block over budget is logged, and compacted in
+        ``auto`` mode; ``always`` compacts regardless of size.
+        
+        Returns:
+            True if the tools must be given to the agent with compacted schemas
+        """
+        if self._schema_compaction == OFF:
+            return False
+        provider = config.get_preferred_model_provider()
+        model_id = config.model_id
+        key = (tuple(tool.tool_name for tool in tools), provider, model_id, config.model_max_tokens)
+        if key == self._tool_schema_key:
+            return bool(self._tool_schema_report and self._tool_schema_report["compacted"])
+        
+        window = context_window(model_id, config.model_context_window)
+        budget = int(max(0, window - config.model_max_tokens) * config.tool_schema_budget_fraction)
+        tokens = tool_block_tokens((tool.tool_spec for tool in tools), provider)
+        compact = self._schema_compaction == ALWAYS or (self._schema_compaction == AUTO and tokens > budget)
+        report = {
+            "model": model_id,
+            "context_window": window,
+            "budget_tokens": budget,
+            "tools": len(tools),
+            "tokens": tokens,
+            "compacted": compact,
+        }
+        if compact:
+            report["compacted_tokens"] = tool_block_tokens((self._compact_spec(tool) for tool in tools), provider)
+            logger.info(f"Tool schemas compacted from ~{tokens} to ~{report['compacted_tokens']} tokens")
+        sent = report.get("compacted_tokens", tokens)
+        if sent > budget:
+            advice = "narrow the toolset" if compact else "set TOOL_SCHEMA_COMPACTION=auto or narrow the toolset"
+            logger.warning(
+                f"Tool schemas take ~{sent} tokens, over the {budget}-token budget for {model_id} "
+                f"({window}-token context window); {advice}"
+            )
+        self._tool_schema_key = key
+        self._tool_schema_report = report
+        return compact
+    
+    def _retarget_agent(self, prompt: str, toolset: Optional[str]) -> None:
+        """Swap the agent tools for a prompt, keeping model and conversation.
+        
+        Without a toolset the client toolset applies, so the tools of a
+        previous per-prompt toolset are replaced by the default ones.
+        """
+        tools = self._select_tools(toolset, prompt)
+        tool_names = [tool.tool_name for tool in tools or []]
+        self._agent_toolset = toolset
+        if tool_names == self._agent_tool_names:
+            return
+        agent = self._current_agent()
+        self._agent = Agent(
+            tools=self._agent_tools(tools),
+            model=agent.model,
+            system_prompt=agent.system_prompt,
+            messages=agent.messages,
+            callback_handler=agent.callback_handler,
+        )
+        self._agent_tool_names = tool_names
+    
+    def _intercepts_tool_calls(self) -> bool:
+        """Whether agent tool calls must go through ``_call_mcp_tool``."""
+        return (
+            bool(self._rate_limiters)
+            or bool(self._single_flight)
+            or bool(self._prefetcher)
+            or bool(self._result_handler)
+            or get_profiler() is not None
+        )
+    
+    def _call_agent_tool(self, tool_use_id: str, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Call an MCP tool for the agent, spilling oversize results when enabled."""
+        result = self._call_turn_tool(tool_use_id, name, arguments)
+        if self._result_handler:
+            result = self._result_handler.process(name, result)
+        return result
+    
+    def _call_turn_tool(self, tool_use_id: str, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Call an MCP tool on behalf of the agent's turn in progress, with its token and prefetches."""
+        return self._call_mcp_tool(tool_use_id, name, arguments, self._cancel_token, self._prefetch_batch)
+    
+    def _call_mcp_tool(
+        self,
+        tool_use_id: str,
+        name: str,
+        arguments: Dict[str, Any],
+        token: Optional[CancellationToken] = None,
+        batch: Optional[PrefetchBatch] = None,
+    ) -> Dict[str, Any]:
+        """Call an MCP tool through the client-side call controls.
+        
+        Args:
+            tool_use_id: Tool use ID for the call
+            name: MCP tool name
+            arguments: Tool input arguments
+            token: Cancellation token of the caller (optional)
+            batch: Prefetched calls the result may be taken from (optional)
+            
+        Returns:
+            MCP tool result
+        """
+        with span("tool_call", tool=name):
+            if batch:
+                result = batch.take(name, arguments)
+                if result is not None:
+                    return dict(result, toolUseId=tool_use_id)
+            return self._call_mcp_tool_limited(tool_use_id, name, arguments, token)
+    
+    def _prefetch_call(
+        self, name: str, arguments: Dict[str, Any], token: Optional[CancellationToken] = None
+    ) -> Dict[str, Any]:
+        """Speculative MCP call launched by the prefetcher for a turn."""
+        with span("prefetch_call", tool=name):
+            return self._call_mcp_tool_limited(f"prefetch-{uuid.uuid4()}", name, arguments, token)
+    
+    def _call_mcp_tool_limited(
+        self, tool_use_id: str, name: str, arguments: Dict[str, Any], token: Optional[CancellationToken] = None
+    ) -> Dict[str, Any]:
+        """Call an MCP tool, sharing identical concurrent read calls when coalescing is enabled."""
+        if not self._single_flight or not is_coalescable(name):
+            return self._call_mcp_tool_shaped(tool_use_id, name, arguments, token)
+        key = call_key((self.mcp_endpoint, self.oauth_client.client_id, self.tenant_id), name, arguments)
+        result = self._single_flight.call(
+            key,
+            lambda: self._call_mcp_tool_shaped(tool_use_id, name, arguments, token),
+            # A call cut short by this turn's cancellation says nothing to other turns
+            shareable=lambda: not (token and token.cancelled),
+            cancel_event=token.event if token else None,
+            tool=name,
+            cancelled=lambda: self._cancelled_tool_result(tool_use_id, name, token),
+        )
+        return dict(result, toolUseId=tool_use_id) if isinstance(result, dict) else result
+    
+    def _cancelled_tool_result(
+        self, tool_use_id: str, name: str, token: Optional[CancellationToken]
+    ) -> Dict[str, Any]:
+        """Error result of an MCP call given up because its turn was cancelled, as Strands returns it."""
+        reason = token.reason if token and token.reason else "cancelled"
+        if self._cancel_stats:
+            self._cancel_stats.count("mcp_calls")
+        logger.info(f"MCP tool {name} cancelled ({reason})")
+        return {
+            "status": "error",
+            "toolUseId": tool_use_id,
+            "content": [{"text": f"Tool execution cancelled ({reason})"}],
+            "cancelled": True,
+        }
+    
+    def _call_mcp_tool_shaped(
+        self, tool_use_id: str, name: str, arguments: Dict[str, Any], token: Optional[CancellationToken] = None
+    ) -> Dict[str, Any]:
+        """Call an MCP tool, shaped by the tenant rate limiter when enabled."""
+        if not self._rate_limiters:
+            return self._call_mcp_tool_cancellable(token, tool_use_id, name, arguments)
+        
+        limiter = self._rate_limiters.for_tenant(self.tenant_id)
+        for attempt in range(config.rate_limit_max_retries + 1):
+            limiter.acquire()
+            throttled = False
+            retry_after = None
+            try:
+                result = self._call_mcp_tool_cancellable(token, tool_use_id, name, arguments)
+                throttled = is_rate_limited(result)
+                retry_after = retry_after_seconds(result) if throttled else None
+            except Exception as e:
+                throttled = is_rate_limited(e)
+                retry_after = retry_after_seconds(e) if throttled else None
+                raise
+            finally:
+                limiter.release(throttled, retry_after)
+            if not throttled or (token and token.cancelled):
+                break
+            logger.info(f"MCP tool {name} rate limited (attempt {attempt + 1})")
+        return result
+    
+    def _call_mcp_tool_cancellable(
+        self, token: Optional[CancellationToken], tool_use_id: str, name: str, arguments: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Call an MCP tool, stopping the call when the turn is cancelled or its deadline expires."""
+        if self._mcp_client is None:
+            raise ConfigurationError("No MCP session; call start_connection() first")
+        if token is None:
+            return cast(Dict[str, Any], self._mcp_client.call_tool_sync(tool_use_id, name, arguments))
+        kwargs: Dict[str, Any] = {"cancel_signal": token.event}
+        remaining = token.remaining()
+        if remaining is not None:
+            kwargs["read_timeout_seconds"] = timedelta(seconds=max(remaining, 0.001))
+        result = cast(Dict[str, Any], self._mcp_client.call_tool_sync(tool_use_id, name, arguments, **kwargs))
+        if token.cancelled and self._cancel_stats:
+            self._cancel_stats.count("mcp_calls")
+            logger.info(f"MCP tool {name} cancelled ({token.reason})")
+        return result
+    
+    def call_tool(
+        self,
+        name: str,
+        arguments: Optional[Dict[str, Any]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Call an MCP tool directly, without the agent or the model.
+        
+        The arguments are validated against the tool's input schema and the
+        configured tenant is injected when the tool takes a ``tenant_id``.
+        Calls reuse the live MCP session and may be made from several threads;
+        they are independent of any agent turn in progress.
+        
+        Args:
+            name: Tool name
+            arguments: Tool arguments (may also be passed as keyword arguments)
+            cancel_token: Token cancelling the call from another thread (optional)
+            
+        Returns:
+            Tool result, decoded from JSON when possible
+            
+        Raises:
+            ToolCallError: If the tool is unknown, the arguments are invalid or the tool fails
+        """
+        arguments = dict(arguments or {}, **kwargs)
+        tool = next((tool for tool in self._tools or [] if tool.tool_name == name), None)
+        if tool is None:
+            raise ToolCallError(f"Unknown tool '{name}'. Available tools: {', '.join(self._tool_names)}")
+        
+        schema = tool_input_schema(tool)
+        if "tenant_id" in (schema.get("properties") or {}):
+            arguments.setdefault("tenant_id", self.tenant_id)
+        validator = self._argument_validators.get(name)
+        if validator is None:
+            validator = self._argument_validators[name] = ArgumentValidator(name, schema)
+        validator.validate(arguments)
+        
+        mcp_name = getattr(getattr(tool, "mcp_tool", None), "name", None) or name
+        result = self._call_mcp_tool(f"direct-{uuid.uuid4()}", mcp_name, arguments, cancel_token)
+        return parse_tool_result(name, result)
+    
+    def call_tools(
+        self,
+        calls: Sequence[Tuple[str, Dict[str, Any]]],
+        max_concurrency: int = 8,
+        return_exceptions: bool = False,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> List[Any]:
+        """Make several direct tool calls concurrently.
+        
+        Args:
+            calls: (tool name, arguments) pairs
+            max_concurrency: Maximum number of calls in flight
+            return_exceptions: Return errors in place of results instead of raising the first one
+            cancel_token: Token cancelling all the calls from another thread (optional)
+            
+        Returns:
+            Results in the order of ``calls``
+        """
+        workers = max(1, min(max_concurrency, len(calls)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="direct-call") as executor:
+            futures = [executor.submit(self.call_tool, name, arguments, cancel_token) for name, arguments in calls]
+        results = []
+        for future in futures:
+            error = future.exception()
+            if error is not None and not return_exceptions:
+                raise error
+            results.append(error if error is not None else future.result())
+        return results
+    
+    @property
+    def tools(self) -> ToolNamespace:
+        """Discovered MCP tools as methods, e.g. ``client.tools.get_entity_tool(entity_id="123")``."""
+        if self._tool_namespace is None:
+            self._tool_namespace = ToolNamespace(self._tools or [], self.call_tool, injected=["tenant_id"])
+        return self._tool_namespace
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return client-side metrics for enabled components.
+        
+        Returns:
+            Metrics keyed by component name
+        """
+        metrics: Dict[str, Any] = {}
+        if self._rate_limiters:
+            metrics["rate_limits"] = self._rate_limiters.metrics()
+        if self._tool_selection_report:
+            metrics["tool_selection"] = self._tool_selection_report
+        if self._tool_schema_report:
+            metrics["tool_schema"] = self._tool_schema_report
+        if self._prefetcher:
+            metrics["prefetch"] = self._prefetcher.metrics()
+        if self._result_handler:
+            metrics["large_results"] = self._result_handler.metrics()
+        if self._memory_profiler:
+            metrics["memory"] = self._memory_profiler.report()
+        if self._cancel_stats:
+            metrics["cancellation"] = self._cancel_stats.metrics()
+        if self._scheduler:
+            metrics["scheduler"] = self._scheduler.metrics()
+        if self._single_flight:
+            metrics["coalescing"] = self._single_flight.metrics()
+        if self._watchdog:
+            metrics["health"] = self._watchdog.metrics()
+        if self._http_settings:
+            metrics["connections"] = connection_stats.metrics()
+            metrics["shared_sessions"] = shared_connections.metrics()
+        return metrics
+    
+    def process_prompt(
+        self,
+        prompt: str,
+        toolset: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        timeout: Optional[float] = None,
+        priority: Optional[str] = None,
+    ) -> str:
         """Process a prompt using the Strands agent.
         
+        The turn stops at the next model event or MCP response once
+        ``cancel_token`` is cancelled or the deadline expires; in-flight model
+        streams and MCP calls are aborted. With the scheduler enabled, the turn
+        first waits for a slot of its priority class.
+        
         Args:
             prompt: User prompt to process
+            toolset: Optional toolset for this prompt (defaults to the client toolset)
+            cancel_token: Token cancelling the turn from another thread (optional)
+            timeout: Deadline of the turn in seconds (optional, defaults to PROMPT_TIMEOUT)
+            priority: Priority class of this prompt (optional, defaults to the client priority)
             
         Returns:
             Agent response
+            
+        Raises:
+            PromptCancelledError: If the turn was cancelled or exceeded its deadline
         """
+        token = cancel_token or CancellationToken()
+        timeout = timeout if timeout is not None else self._prompt_timeout
+        if timeout:
+            token.set_timeout(timeout)
+        self._cancel_token = token
+        ticket = None
         try:
-            # Agent and connection are already established during initialization
-            response = self._agent(prompt)
+            if self._scheduler:
+                with span("queue_wait"):
+                    ticket = self._scheduler.acquire(priority or self.priority, self.tenant_id, token)
+                if ticket is None:
+                    raise PromptCancelledError(self._cancelled_turn(token))
+            if self._standby_pending:
+                self._adopt_standby()
+            if toolset or self._tool_selection_top_k or self._agent_toolset:
+                self._retarget_agent(prompt, toolset)
+            # Launch likely read-only MCP calls in parallel with the first model call
+            batch = self._prefetcher.start(prompt, token) if self._prefetcher else None
+            self._prefetch_batch = batch
+            agent = self._current_agent()
+            last_before_turn = agent.messages[-1] if self._history_slim and agent.messages else None
+            try:
+                # Agent and connection are already established during initialization
+                with span("prompt"):
+                    response = agent(prompt, cancel_signal=token.event)
+            finally:
+                if batch:
+                    batch.finish()
+                    self._prefetch_batch = None
+            if self._history_slim:
+                turn_start = find_turn_start(agent.messages, last_before_turn)
+                slim_history(agent, turn_start, self._history_result_max_chars)
+            if self._memory_profiler:
+                self._memory_profiler.snapshot(
+                    f"turn {len(self._memory_profiler.snapshots)}", cast(List[Dict[str, Any]], agent.messages)
+                )
+            self._save_session()
+            if token.cancelled:
+                raise PromptCancelledError(self._cancelled_turn(token))
             return str(response)
+        except PromptCancelledError:
+            raise
         except Exception as e:
+            if token.cancelled:
+                raise PromptCancelledError(self._cancelled_turn(token)) from e
             logger.error(f"Failed to process prompt: {e}")
             raise
+        finally:
+            if ticket and self._scheduler:
+                self._scheduler.release(ticket)
+            self._cancel_token = None
+            token.close()
+    
+    def _cancelled_turn(self, token: CancellationToken) -> str:
+        """Record a cancelled turn and describe it."""
+        reason = token.reason or "cancelled"
+        stop_seconds = time.monotonic() - (token.cancelled_at or time.monotonic())
+        if self._cancel_stats:
+            self._cancel_stats.record_turn(reason, stop_seconds)
+        message = "Prompt exceeded its deadline" if reason == "deadline" else f"Prompt {reason}"
+        logger.info(f"{message}; stopped {stop_seconds:.2f}s after cancellation")
+        return message
+    
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """Cancel the prompt in progress, e.g. when the requesting client disconnected.
+        
+        Fan-out prompts of ``process_prompts``, ``map_prompt`` and
+        ``reduce_results`` are cancelled too, including those still queued.
+        Safe to call from any thread.
+        
+        Args:
+            reason: Cancellation reason reported in metrics
+            
+        Returns:
+            True if a prompt was in progress and is now cancelled
+        """
+        token = self._cancel_token
+        cancelled = bool(token and token.cancel(reason))
+        for fan_out_token in self._fan_out_tokens or []:
+            cancelled = fan_out_token.cancel(reason) or cancelled
+        return cancelled
+    
+    def process_prompts(
+        self,
+        prompts: Sequence[str],
+        concurrency: int = 4,
+        toolset: Optional[str] = None,
+        timeout: Optional[float] = None,
+        priority: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Process independent prompts concurrently.
+        
+        Each prompt runs on its own agent with an empty conversation; the
+        agents share this client's MCP session, model and client-side
+        controls (rate limits, scheduler, coalescing). The client's own
+        conversation is left untouched.
+        
+        Args:
+            prompts: Prompts to process
+            concurrency: Maximum number of prompts in flight
+            toolset: Optional toolset for these prompts (defaults to the client toolset)
+            timeout: Deadline of each prompt in seconds (optional, defaults to PROMPT_TIMEOUT)
+            priority: Priority class of these prompts (optional, defaults to the client priority)
+            
+        Returns:
+            One result per prompt, in order: ``{"prompt", "response"}`` or ``{"prompt", "error"}``
+        """
+        return self._fan_out_prompts(prompts, prompts.__getitem__, concurrency, toolset, timeout, priority)
     
-    def health_check(self) -> Dict[str, Any]:
+    def _fan_out_prompts(
+        self,
+        labels: Sequence[str],
+        prompt_for: Callable[[int], str],
+        concurrency: int,
+        toolset: Optional[str] = None,
+        timeout: Optional[float] = None,
+        priority: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Build and process fan-out prompts on worker threads.
+        
+        A prompt that cannot be built fails on its own, reported under its label.
+        """
+        def failed(prompt: str, error: Exception) -> Dict[str, Any]:
+            logger.warning(f"Prompt failed: {error}")
+            return {"prompt": prompt, "error": str(error)}
+        
+        def run(index: int, token: CancellationToken) -> Dict[str, Any]:
+            try:
+                prompt = prompt_for(index)
+            except Exception as e:
+                return failed(labels[index], e)
+            try:
+                response = self._process_fan_out(prompt, token, toolset=toolset, timeout=timeout, priority=priority)
+            except Exception as e:
+                return failed(prompt, e)
+            return {"prompt": prompt, "response": response}
+        
+        workers = max(1, min(concurrency, len(labels)))
+        with self._fan_out_batch(len(labels)) as tokens:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fan-out") as executor:
+                futures = [executor.submit(run, index, token) for index, token in enumerate(tokens)]
+        return [future.result() for future in futures]
+    
+    def map_prompt(self, template: str, items: Sequence[Any], concurrency: int = 4, **kwargs: Any) -> List[Dict[str, Any]]:
+        """Ask the same question about many items concurrently.
+        
+        Mapping items fill the template's named fields, e.g.
+        ``"Summarize {entity_id} in {segment}"``; other items fill ``{item}``.
+        
+        Args:
+            template: Prompt template
+            items: Items to ask about
+            concurrency: Maximum number of prompts in flight
+            **kwargs: ``toolset``, ``timeout`` and ``priority``, as for ``process_prompts``
+            
+        Returns:
+            One result per item, in order, as for ``process_prompts`` plus the ``item``;
+            an item that does not fit the template gets an ``error`` with the template as ``prompt``
+        """
+        def prompt_for(index: int) -> str:
+            item = items[index]
+            try:
+                return template.format(**item) if isinstance(item, Mapping) else template.format(item=item)
+            except (KeyError, IndexError, AttributeError, TypeError, ValueError) as e:
+                raise ValueError(f"Cannot fill the template with {item!r}: {e!r}") from e
+        
+        results = self._fan_out_prompts([template] * len(items), prompt_for, concurrency, **kwargs)
+        return [dict(result, item=item) for item, result in zip(items, results, strict=True)]
+    
+    def reduce_results(
+        self,
+        results: Sequence[Dict[str, Any]],
+        instruction: str,
+        timeout: Optional[float] = None,
+        max_chars: int = 100_000,
+    ) -> str:
+        """Ask the model to aggregate the results of ``process_prompts`` or ``map_prompt``.
+        
+        The aggregation runs on a separate agent without tools; failed items
+        are listed as failures.
+        
+        Args:
+            results: Results to aggregate
+            instruction: What to produce, e.g. "Rank the entities by data quality"
+            timeout: Deadline of the aggregation in seconds (optional, defaults to PROMPT_TIMEOUT)
+            max_chars: Size budget of the answers, shared evenly; longer answers are truncated (0 keeps them whole)
+            
+        Returns:
+            Aggregated answer
+        """
+        answer_chars = max_chars // len(results) if max_chars and results else 0
+        sections = []
+        for index, result in enumerate(results, start=1):
+            answer = result["response"] if "response" in result else f"[failed: {result.get('error')}]"
+            if answer_chars and len(answer) > answer_chars:
+                answer = answer[:max(0, answer_chars - len(_TRUNCATED))] + _TRUNCATED
+            sections.append(f"### {index}. {result['prompt']}\n{answer}")
+        prompt = f"{instruction}\n\nBase your answer only on the following {len(sections)} answers.\n\n"
+        prompt += "\n\n".join(sections)
+        with self._fan_out_batch(1) as tokens:
+            return self._process_fan_out(prompt, tokens[0], with_tools=False, timeout=timeout)
+    
+    @contextmanager
+    def _fan_out_batch(self, size: int) -> Iterator[List[CancellationToken]]:
+        """Tokens of a batch of fan-out prompts, cancelled by ``cancel`` while the batch runs."""
+        tokens = [CancellationToken() for _ in range(size)]
+        with self._session_lock:
+            self._fan_out_tokens = (self._fan_out_tokens or []) + tokens
+        try:
+            yield tokens
+        finally:
+            batch = {id(token) for token in tokens}
+            with self._session_lock:
+                self._fan_out_tokens = [
+                    token for token in self._fan_out_tokens or [] if id(token) not in batch
+                ] or None
+    
+    def _process_fan_out(self, prompt: str, token: CancellationToken, with_tools: bool = True, **kwargs: Any) -> str:
+        """Process one fan-out prompt on a sibling client.
+        
+        Raises:
+            PromptCancelledError: If the prompt was cancelled, also before it started
+        """
+        if token.cancelled:
+            raise PromptCancelledError(f"Prompt {token.reason}")
+        sibling = self._fan_out_client(with_tools)
+        try:
+            return sibling.process_prompt(prompt, cancel_token=token, **kwargs)
+        finally:
+            self._release_fan_out_client(sibling)
+    
+    def _fan_out_client(self, with_tools: bool = True) -> "StrandsReltioClient":
+        """Sibling client for one fan-out prompt.
+        
+        Shares the MCP session, model and client-side components, with its own
+        agent, turn state and tool wrappers (which are bound to the sibling).
+        Its conversation is not persisted. Release it with
+        ``_release_fan_out_client``; until then the session it uses is kept
+        open even if the watchdog replaces it.
+        """
+        agent = self._current_agent()
+        with self._session_lock:
+            # Taken under the lock so the session and its tools belong together
+            sibling = copy.copy(self)
+            self._fan_out_siblings = (self._fan_out_siblings or []) + [sibling]
+        sibling._fan_out_siblings = None
+        sibling._fan_out_tokens = None
+        sibling._cancel_token = None
+        sibling._prefetch_batch = None
+        sibling._wrapped_tools = None
+        sibling._bulk_tool_cache = None
+        sibling._session_store = None
+        sibling.session_id = None
+        sibling._memory_profiler = None
+        sibling._watchdog = None
+        sibling._standby_pending = False
+        tools = sibling._select_tools() if with_tools else []
+        if not with_tools:
+            sibling._tool_selection_top_k = 0
+        sibling._agent = Agent(
+            tools=sibling._agent_tools(tools) if with_tools else [],
+            model=agent.model,
+            system_prompt=agent.system_prompt,
+            # Concurrent agents must not interleave streamed output on stdout
+            callback_handler=None,
+        )
+        sibling._agent_tool_names = [tool.tool_name for tool in tools or []]
+        sibling._agent_toolset = None
+        return sibling
+    
+    def _release_fan_out_client(self, sibling: "StrandsReltioClient") -> None:
+        """Forget a finished sibling and stop the retired sessions nothing uses any more."""
+        with self._session_lock:
+            self._fan_out_siblings = [other for other in self._fan_out_siblings or [] if other is not sibling] or None
+            # The agent keeps using the retired sessions until it adopts the standby one
+            idle = [] if self._standby_pending else self._take_idle_retired_sessions()
+        if idle:
+            threading.Thread(target=self._stop_sessions, args=(idle,), daemon=True).start()
+    
+    def _current_agent(self) -> Agent:
+        """The client's agent.
+        
+        Raises:
+            ConfigurationError: If no agent was created yet
+        """
+        if self._agent is None:
+            raise ConfigurationError("No agent created yet; call create_agent() first")
+        return self._agent
+    
+    def reset_conversation(self) -> None:
+        """Start a new conversation, keeping the agent's model, tools and connections.
+        
+        With session persistence enabled the new conversation gets a new session ID,
+        so the previous one stays resumable.
+        """
+        self._current_agent().messages.clear()
+        if self._session_store:
+            self.session_id = uuid.uuid4().hex
+    
+    def _save_session(self) -> None:
+        """Persist the conversation when a session store is configured."""
+        if not self._session_store or not self.session_id or self._agent is None:
+            return
+        try:
+            with span("session_save"):
+                self._session_store.save(self.session_id, cast(List[Dict[str, Any]], self._agent.messages))
+        except Exception as e:
+            # Persistence must never fail the turn itself
+            logger.warning(f"Failed to save session {self.session_id}: {e}")
+    
+    def resume_session(self, session_id: str) -> bool:
+        """Resume a persisted conversation.
+        
+        The agent is rehydrated with the stored message history, so the
+        conversation continues without replaying any tool calls.
+        
+        Args:
+            session_id: ID of the session to resume
+            
+        Returns:
+            True if the session was found and resumed, False otherwise
+            
+        Raises:
+            ConfigurationError: If no session store is configured
+        """
+        if not self._session_store:
+            raise ConfigurationError("Session persistence is disabled. Set SESSION_STORE to 'file' or 'sqlite'.")
+        agent = self._current_agent()
+        with span("session_resume"):
+            messages = self._session_store.load(session_id)
+            if messages is None:
+                logger.info(f"Session {session_id} not found")
+                return False
+            tools = self._select_tools()
+            self._agent = Agent(
+                tools=self._agent_tools(tools),
+                model=agent.model,
+                system_prompt=agent.system_prompt,
+                messages=cast(Messages, messages),
+                callback_handler=agent.callback_handler,
+            )
+            self._agent_tool_names = [tool.tool_name for tool in tools or []]
+            self._agent_toolset = None
+        self.session_id = session_id
+        logger.info(f"Resumed session {session_id} with {len(messages)} messages")
+        return True
+    
+    def health_check(self, live: bool = False) -> Dict[str, Any]:
         """Perform health check of the integration.
         
+        With the health watchdog running, the health published by its last
+        probe is returned without an MCP call.
+        
+        Args:
+            live: Probe the MCP session even when the watchdog has published health
+        
         Returns:
             Health status information
         """
+        if self._watchdog and not live:
+            health = self._watchdog.last_health
+            if health["status"] != UNKNOWN:
+                return health
+        return self._probe_mcp(self._mcp_client)
+    
+    def _probe_mcp(self, mcp_client: Optional[MCPClient], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Call the ``health_check`` tool on an MCP session (unhealthy when there is none)."""
+        if mcp_client is None:
+            return {"status": "unhealthy"}
         try:
-            result = self._mcp_client.call_tool_sync(f"health-check-{uuid.uuid4()}", "health_check", {})
+            result = mcp_client.call_tool_sync(
+                f"health-check-{uuid.uuid4()}",
+                "health_check",
+                {},
+                read_timeout_seconds=timedelta(seconds=timeout) if timeout else None,
+            )
             health_data = json.loads(result.get('content', [{}])[0].get('text', '{}'))
             return {"status": "healthy" if health_data.get('status') == 'ok' else "unhealthy"}
         except Exception:
             return {"status": "unhealthy"}
- 
\ No newline at end of file
+    
+    def _start_watchdog(self) -> None:
+        """Start background health probing of the client's own MCP session."""
+        if self._shared_connection_key or self._replay:
+            # Shared sessions belong to several clients; replayed ones cannot degrade
+            logger.info("Health watchdog skipped for shared or replayed MCP sessions")
+            return
+        self._session_token_refresh_at = self._token_refresh_at()
+        self._watchdog = HealthWatchdog(
+            probe=lambda: self._probe_mcp(self._mcp_client, config.health_watchdog_probe_timeout),
+            reconnect=self._swap_in_standby,
+            token_expires_in=self._session_token_expires_in,
+            interval=config.health_watchdog_interval,
+            failure_threshold=config.health_watchdog_failure_threshold,
+        )
+        self._watchdog.start()
+    
+    def _token_refresh_at(self) -> Optional[float]:
+        """Wall-clock time the cached OAuth token is due for refresh."""
+        expires_in = self.oauth_client.token_expires_in()
+        return time.time() + expires_in if expires_in is not None else None
+    
+    def _session_token_expires_in(self) -> Optional[float]:
+        """Seconds until the token of the live MCP session is due for refresh."""
+        if self._session_token_refresh_at is None:
+            return None
+        return self._session_token_refresh_at - time.time()
+    
+    def _swap_in_standby(self) -> None:
+        """Open and probe a standby MCP session, then swap it in for the live one.
+        
+        Runs on the watchdog thread. Direct and prefetched tool calls use the
+        new session at once; the agent moves to it at the start of its next
+        turn, and the old session is stopped after that.
+        
+        Raises:
+            ConnectionError: If the standby session is unhealthy
+        """
+        with span("mcp_standby"):
+            standby, tools = self._connect_mcp()
+            if self._probe_mcp(standby, config.health_watchdog_probe_timeout)["status"] != "healthy":
+                standby.stop(None, None, None)
+                raise ConnectionError("standby MCP session is unhealthy")
+        with self._session_lock:
+            retired = self._mcp_client
+            self._mcp_client, self._tools = standby, tools
+            self._tool_names = [tool.tool_name for tool in tools]
+            self._tool_selectors = {}
+            self._tool_namespace = None
+            if retired is not None:
+                self._retired_mcp_clients = (self._retired_mcp_clients or []) + [retired]
+            self._session_token_refresh_at = self._token_refresh_at()
+            self._standby_pending = True
+        logger.info(f"Swapped in standby MCP session with {len(tools)} tools")
+    
+    def _adopt_standby(self) -> None:
+        """Move the agent onto the session swapped in by the watchdog."""
+        with self._session_lock:
+            self._standby_pending = False
+            agent = self._current_agent()
+            tools = self._select_tools()
+            self._agent = Agent(
+                tools=self._agent_tools(tools),
+                model=agent.model,
+                system_prompt=agent.system_prompt,
+                messages=agent.messages,
+                callback_handler=agent.callback_handler,
+            )
+            self._agent_tool_names = [tool.tool_name for tool in tools or []]
+            self._agent_toolset = None
+            retired = self._take_idle_retired_sessions()
+        # Stop the old sessions off the request path; fan-out siblings still using one release it later
+        if retired:
+            threading.Thread(target=self._stop_sessions, args=(retired,), daemon=True).start()
+    
+    def _take_idle_retired_sessions(self) -> List[MCPClient]:
+        """Remove and return the retired sessions no fan-out sibling uses; call with the session lock held."""
+        in_use = {id(sibling._mcp_client) for sibling in self._fan_out_siblings or []}
+        retired = self._retired_mcp_clients or []
+        self._retired_mcp_clients = [session for session in retired if id(session) in in_use] or None
+        return [session for session in retired if id(session) not in in_use]
+    
+    def _stop_retired_sessions(self) -> None:
+        """Stop all MCP sessions replaced by standby sessions."""
+        with self._session_lock:
+            retired, self._retired_mcp_clients = self._retired_mcp_clients or [], None
+        self._stop_sessions(retired)
+    
+    @staticmethod
+    def _stop_sessions(sessions: List[MCPClient]) -> None:
+        for mcp_client in sessions:
+            try:
+                mcp_client.stop(None, None, None)
+            except Exception as e:
+                logger.debug(f"Failed to stop retired MCP session: {e}")
@@ -0,0 +1,179 @@
+"""
+Single-flight coalescing of identical MCP read calls for the Reltio MCP Strands Client.
+
+When many users ask about the same hot entities at once, their agents issue
+the same read calls at the same moment. ``SingleFlight`` lets the first of
+several concurrent identical calls (same endpoint, credentials, tenant, tool
+and normalized arguments) go to the server while the others wait for it and
+receive a copy of its result. Nothing is cached: a call arriving after the
+first one finished goes to the server again.
+
+Only read-only tools are coalesced. The single flight is process-wide, so
+calls are shared across all clients and agents of a process.
+"""
+
+import copy
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from config import PromptCancelledError
+
+from .toolsets import WRITE_TOOL_PATTERNS, Toolset
+
+logger = logging.getLogger(__name__)
+
+# Coalesced calls must never modify tenant data
+_READ_ONLY = Toolset("coalesce", exclude=tuple(WRITE_TOOL_PATTERNS))
+
+
+def is_coalescable(tool: str) -> bool:
+    """Whether calls of a tool may share one in-flight request."""
+    return _READ_ONLY.matches(tool)
+
+
+def call_key(
+    scope: Tuple[str, ...], tool: str, arguments: Dict[str, Any]
+) -> Tuple[str, ...]:
+    """Key of a call: its scope (endpoint, credentials, tenant), tool and normalized arguments."""
+    return (
+        *scope,
+        tool,
+        json.dumps(arguments, sort_keys=True, separators=(",", ":"), default=str),
+    )
+
+
+class _Flight:
+    """A call in flight and the callers waiting for it."""
+
+    __slots__ = ("done", "result", "error", "shareable")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.shareable = True
+
+
+class SingleFlight:
+    """Shares one in-flight call between concurrent callers with the same key."""
+
+    def __init__(self, poll_interval: float = 0.05) -> None:
+        """Initialize the single flight.
+
+        Args:
+            poll_interval: Seconds between cancellation checks of waiting callers
+        """
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._calls = 0
+        self._coalesced = 0
+        self._fallbacks = 0
+        self._coalesced_by_tool: Dict[str, int] = {}
+
+    def call(
+        self,
+        key: Hashable,
+        fn: Callable[[], Any],
+        shareable: Callable[[], bool] = lambda: True,
+        cancel_event: Optional[threading.Event] = None,
+        tool: str = "",
+        cancelled: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        """Run ``fn``, or wait for an identical call already in flight.
+
+        Args:
+            key: Call key, see ``call_key``
+            fn: Performs the call
+            shareable: Asked after the first caller's call; False keeps its outcome to
+                itself (e.g. a call aborted by that caller's cancellation)
+            cancel_event: Event that stops a waiting caller from waiting
+            tool: Tool name for the per-tool counters
+            cancelled: Outcome of a waiting caller whose ``cancel_event`` fired (optional;
+                raises PromptCancelledError by default)
+
+        Returns:
+            Result of the call; waiting callers get a deep copy
+
+        Raises:
+            PromptCancelledError: If a waiting caller was cancelled and ``cancelled`` is not given
+            Exception: The error raised by the shared call
+        """
+        with self._lock:
+            existing = self._flights.get(key)
+            if existing is None:
+                flight = self._flights[key] = _Flight()
+                self._calls += 1
+            else:
+                flight = existing
+                self._coalesced += 1
+                self._coalesced_by_tool[tool] = self._coalesced_by_tool.get(tool, 0) + 1
+
+        if existing is None:
+            try:
+                flight.result = fn()
+                return flight.result
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                flight.shareable = shareable()
+                with self._lock:
+                    del self._flights[key]
+                flight.done.set()
+
+        while not flight.done.wait(self.poll_interval if cancel_event else None):
+            if cancel_event is not None and cancel_event.is_set():
+                # A cancelled caller must not start a call of its own
+                if cancelled is None:
+                    raise PromptCancelledError(
+                        f"Coalesced call of {tool or key} cancelled"
+                    )
+                return cancelled()
+        if not flight.shareable:
+            # Run the call on our own terms rather than inherit an outcome meant for another caller
+            with self._lock:
+                self._fallbacks += 1
+            logger.debug(f"Coalesced call of {tool or key} runs on its own")
+            return fn()
+        if flight.error is not None:
+            raise flight.error
+        return copy.deepcopy(flight.result)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Calls sent, calls coalesced onto them and calls that had to run on their own."""
+        with self._lock:
+            return {
+                "calls": self._calls,
+                "coalesced": self._coalesced,
+                "fallbacks": self._fallbacks,
+                "in_flight": len(self._flights),
+                "coalesced_by_tool": dict(self._coalesced_by_tool),
+            }
+
+
+_shared_single_flight: Optional[SingleFlight] = None
+_shared_lock = threading.Lock()
+
+
+def shared_single_flight() -> SingleFlight:
+    """The process-wide single flight, created on first use."""
+    global _shared_single_flight
+    with _shared_lock:
+        if _shared_single_flight is None:
+            _shared_single_flight = SingleFlight()
+        return _shared_single_flight
+
+
+def _reset_shared_single_flight() -> None:
+    global _shared_single_flight, _shared_lock
+    _shared_single_flight = None
+    _shared_lock = threading.Lock()
+
+
+# In-flight calls belong to the process that started them
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_shared_single_flight)
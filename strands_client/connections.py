@@ -0,0 +1,255 @@
+"""
+HTTP connection tuning and reuse for the Reltio MCP streamable-HTTP transport.
+
+``streamablehttp_client`` builds a fresh ``httpx.AsyncClient`` with default
+pool settings for every MCP session: idle connections expire after a few
+seconds and each new session pays for its own TLS handshake. This module
+provides:
+
+- an httpx client factory with configurable pool size, keep-alive, timeouts
+  and optional HTTP/2, which also counts new connections vs. reused ones;
+- a process-wide registry that lets clients pointing at the same MCP endpoint
+  with the same OAuth client share one MCP session (and therefore its warm
+  connections). The tenant is passed as a tool argument, so tenants on the
+  same environment host can safely share a session.
+"""
+
+import importlib.util
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HTTPSettings:
+    """Connection pool and timeout settings for MCP HTTP clients."""
+
+    http2: bool = False
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 10.0
+    read_timeout: float = 300.0
+
+    @classmethod
+    def from_config(cls, config: Any) -> "HTTPSettings":
+        """Build settings from the MCP HTTP options of a Config."""
+        return cls(
+            http2=config.mcp_http2,
+            max_connections=config.mcp_pool_max_connections,
+            max_keepalive_connections=config.mcp_pool_max_keepalive,
+            keepalive_expiry=config.mcp_keepalive_expiry,
+            connect_timeout=config.mcp_connect_timeout,
+            read_timeout=config.mcp_read_timeout,
+        )
+
+
+class ConnectionStats:
+    """Counts HTTP requests, new TCP connections and TLS handshakes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+
+    async def trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """httpcore trace callback recording connection events."""
+        if event_name.endswith("send_request_headers.started"):
+            self._increment("requests")
+        elif event_name == "connection.connect_tcp.complete":
+            self._increment("connections")
+        elif event_name == "connection.start_tls.complete":
+            self._increment("tls_handshakes")
+
+    def reset(self) -> None:
+        """Zero the counters (used in forked worker processes)."""
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+
+    def _increment(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of connection reuse metrics."""
+        with self._lock:
+            reused = max(0, self.requests - self.connections)
+            return {
+                "requests": self.requests,
+                "new_connections": self.connections,
+                "tls_handshakes": self.tls_handshakes,
+                "reused_requests": reused,
+                "reuse_ratio": (
+                    round(reused / self.requests, 4) if self.requests else 0.0
+                ),
+            }
+
+
+def http2_available() -> bool:
+    """Check whether the optional ``h2`` package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_http_client_factory(
+    settings: HTTPSettings, stats: Optional[ConnectionStats] = None
+) -> Callable[..., httpx.AsyncClient]:
+    """Create an ``httpx_client_factory`` for ``streamablehttp_client``.
+
+    Args:
+        settings: Pool and timeout settings
+        stats: Optional collector for connection reuse metrics
+
+    Returns:
+        Factory with the signature expected by the MCP streamable-HTTP transport
+    """
+    http2 = settings.http2
+    if http2 and not http2_available():
+        logger.warning(
+            "MCP_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1"
+        )
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=settings.max_connections,
+        max_keepalive_connections=settings.max_keepalive_connections,
+        keepalive_expiry=settings.keepalive_expiry,
+    )
+
+    async def add_trace(request: httpx.Request) -> None:
+        if stats is not None:
+            request.extensions["trace"] = stats.trace
+
+    def factory(
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        auth: Optional[httpx.Auth] = None,
+    ) -> httpx.AsyncClient:
+        # The transport passes the timeouts it was opened with; the settings are the fallback
+        return httpx.AsyncClient(
+            headers=headers,
+            timeout=timeout
+            or httpx.Timeout(settings.connect_timeout, read=settings.read_timeout),
+            auth=auth,
+            limits=limits,
+            http2=http2,
+            event_hooks={"request": [add_trace]} if stats else None,
+        )
+
+    return factory
+
+
+@dataclass
+class _SharedSession:
+    """A shared MCP session, its tools and the number of clients attached to it."""
+
+    mcp_client: Any = None
+    tools: List[Any] = field(default_factory=list)
+    refs: int = 0
+    ready: threading.Event = field(default_factory=threading.Event)
+    error: Optional[BaseException] = None
+
+
+class SharedMCPConnections:
+    """Process-wide registry of MCP sessions shared by several clients.
+
+    Entries are keyed by (MCP endpoint, OAuth client ID) and reference counted;
+    the MCP session is stopped when the last client releases it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], _SharedSession] = {}
+
+    def acquire(
+        self, key: Tuple[str, str], connect: Callable[[], Tuple[Any, List]]
+    ) -> Tuple[Any, List]:
+        """Return the shared (MCPClient, tools) for a key, connecting on first use.
+
+        The first caller for a key connects outside the registry lock; callers
+        for the same key wait for that connection, callers for other keys do not.
+
+        Args:
+            key: (MCP endpoint, OAuth client ID)
+            connect: Callable that starts a new MCP session and lists its tools
+
+        Returns:
+            Tuple of the shared MCPClient and its tool list
+
+        Raises:
+            Exception: The error raised by ``connect``, also for callers that waited for it
+        """
+        with self._lock:
+            existing = self._entries.get(key)
+            entry = existing or _SharedSession()
+            if existing is None:
+                self._entries[key] = entry
+            entry.refs += 1
+
+        if existing is None:
+            try:
+                entry.mcp_client, entry.tools = connect()
+                logger.info(f"Opened shared MCP session for {key[0]}")
+            except BaseException as e:
+                entry.error = e
+                with self._lock:
+                    if self._entries.get(key) is entry:
+                        del self._entries[key]
+                raise
+            finally:
+                entry.ready.set()
+        else:
+            entry.ready.wait()
+            if entry.error is not None:
+                raise entry.error
+            logger.info(f"Reusing shared MCP session for {key[0]}")
+        return entry.mcp_client, entry.tools
+
+    def release(self, key: Tuple[str, str]) -> None:
+        """Drop one reference to a shared session, stopping it when unused."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            del self._entries[key]
+        try:
+            entry.mcp_client.stop(None, None, None)
+        except Exception as e:
+            logger.warning(f"Failed to stop shared MCP session: {e}")
+
+    def reset(self) -> None:
+        """Forget all sessions without stopping them.
+
+        Used in forked worker processes: the parent's MCP sessions run on
+        threads that do not exist in the child and must not be shared.
+        """
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def metrics(self) -> Dict[str, int]:
+        """Number of clients attached to each shared session."""
+        with self._lock:
+            return {
+                endpoint: entry.refs for (endpoint, _), entry in self._entries.items()
+            }
+
+
+# Process-wide connection metrics and shared session registry
+connection_stats = ConnectionStats()
+shared_connections = SharedMCPConnections()
+
+# Sessions and counters belong to the process that opened them
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=connection_stats.reset)
+    os.register_at_fork(after_in_child=shared_connections.reset)
@@ -0,0 +1,172 @@
+"""
+Direct MCP tool calls without the agent loop.
+
+Scripted workloads that need a single deterministic tool invocation do not
+need a model round trip. ``StrandsReltioClient.call_tool`` validates the
+arguments against the tool's input schema, injects the configured tenant and
+calls the tool over the live MCP session. ``ToolNamespace`` exposes every
+discovered tool as a Python method with a signature generated from its schema::
+
+    client.tools.get_entity_tool(entity_id="123")
+"""
+
+import inspect
+import json
+import keyword
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from jsonschema import Draft202012Validator
+
+from config import ToolCallError
+
+_JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+
+def tool_input_schema(tool: Any) -> Dict[str, Any]:
+    """JSON schema of a tool's input."""
+    schema = tool.tool_spec.get("inputSchema", {})
+    return schema.get("json", schema) or {}
+
+
+class ArgumentValidator:
+    """Validates tool arguments against an input schema."""
+
+    def __init__(self, tool_name: str, schema: Dict[str, Any]):
+        self.tool_name = tool_name
+        self._validator = Draft202012Validator(schema)
+
+    def validate(self, arguments: Dict[str, Any]) -> None:
+        """Check arguments against the schema.
+
+        Raises:
+            ToolCallError: Listing every schema violation
+        """
+        errors = sorted(
+            self._validator.iter_errors(arguments), key=lambda error: list(error.path)
+        )
+        if errors:
+            details = "; ".join(
+                f"{'.'.join(str(part) for part in error.path) or 'arguments'}: {error.message}"
+                for error in errors
+            )
+            raise ToolCallError(f"Invalid arguments for {self.tool_name}: {details}")
+
+
+def parse_tool_result(tool_name: str, result: Dict[str, Any]) -> Any:
+    """Extract the value of an MCP tool result.
+
+    Text content holding JSON is decoded. A single content item is returned as
+    is; several items are returned as a list.
+
+    Raises:
+        ToolCallError: If the tool reported an error
+    """
+    items = [
+        item.get("text", item) if isinstance(item, dict) else item
+        for item in result.get("content") or []
+    ]
+    if result.get("status") == "error":
+        raise ToolCallError(
+            f"{tool_name} failed: {' '.join(str(item) for item in items)}"
+        )
+    values = []
+    for item in items:
+        if isinstance(item, str):
+            try:
+                item = json.loads(item)
+            except ValueError:
+                pass
+        values.append(item)
+    if not values:
+        return None
+    return values[0] if len(values) == 1 else values
+
+
+def method_name(tool_name: str) -> str:
+    """Python identifier for a tool name."""
+    name = re.sub(r"\W", "_", tool_name)
+    if not name or name[0].isdigit() or keyword.iskeyword(name):
+        name = f"_{name}"
+    return name
+
+
+def _signature(schema: Dict[str, Any], omit: List[str]) -> inspect.Signature:
+    required = set(schema.get("required") or [])
+    parameters = []
+    for name, prop in (schema.get("properties") or {}).items():
+        if name in omit or not name.isidentifier() or keyword.iskeyword(name):
+            continue
+        annotation = _JSON_TYPES.get(str((prop or {}).get("type")), Any)
+        default = inspect.Parameter.empty if name in required else None
+        parameters.append(
+            inspect.Parameter(
+                name,
+                inspect.Parameter.KEYWORD_ONLY,
+                default=default,
+                annotation=annotation,
+            )
+        )
+    # Required parameters first, as Python signatures expect
+    parameters.sort(
+        key=lambda parameter: parameter.default is not inspect.Parameter.empty
+    )
+    return inspect.Signature(parameters)
+
+
+class ToolNamespace:
+    """Discovered MCP tools exposed as Python methods."""
+
+    def __init__(
+        self,
+        tools: List[Any],
+        call: Callable[..., Any],
+        injected: Optional[List[str]] = None,
+    ):
+        """Generate a method per tool.
+
+        Args:
+            tools: MCP tools of the client
+            call: Function called as ``call(tool_name, arguments)``
+            injected: Arguments filled in by the client (omitted from signatures)
+        """
+        omit = injected or []
+        self._names: Dict[str, str] = {}
+        for tool in tools:
+            name = method_name(tool.tool_name)
+            schema = tool_input_schema(tool)
+            setattr(self, name, self._make_method(tool, schema, omit, call))
+            self._names[name] = tool.tool_name
+
+    @staticmethod
+    def _make_method(
+        tool: Any, schema: Dict[str, Any], omit: List[str], call: Callable[..., Any]
+    ) -> Callable[..., Any]:
+        tool_name = tool.tool_name
+
+        def method(**kwargs: Any) -> Any:
+            arguments = {
+                key: value for key, value in kwargs.items() if value is not None
+            }
+            return call(tool_name, arguments)
+
+        method.__name__ = method_name(tool_name)
+        method.__qualname__ = f"ToolNamespace.{method.__name__}"
+        method.__doc__ = (
+            tool.tool_spec.get("description") or f"Call the {tool_name} MCP tool."
+        )
+        method.__signature__ = _signature(schema, omit)  # type: ignore[attr-defined]
+        return method
+
+    def __dir__(self) -> List[str]:
+        return sorted(self._names)
+
+    def __repr__(self) -> str:
+        return f"ToolNamespace({', '.join(sorted(self._names))})"
@@ -11,6 +11,8 @@ import logging
 import os
 import sys
 
+from strands_client.profiling import add_profile_arguments, profile_run, span
+
 def setup_logging(debug: bool = False) -> None:
     """Setup simple logging."""
     level = logging.INFO if debug else logging.WARNING
@@ -21,7 +23,8 @@ def run_health_check() -> bool:
     """Run health check and display results."""
     try:
         # Import here to avoid issues if environment is not set up
-        from strands_client.client import StrandsReltioClient
+        with span("import"):
+            from strands_client.client import StrandsReltioClient
         
         print("🔍 Running Reltio MCP Strands Client health check...")
         print("=" * 50)
@@ -30,7 +33,8 @@ def run_health_check() -> bool:
         client = StrandsReltioClient()
         
         # Run health check
-        status = client.health_check()
+        with span("health_check"):
+            status = client.health_check()
         
         print("\n=== Health Check Results ===")
         for key, value in status.items():
@@ -58,6 +62,7 @@ def main() -> int:
 Examples:
   %(prog)s                    # Run basic health check
   %(prog)s --debug            # Run with debug logging
+  %(prog)s --profile          # Print a timing breakdown of the check
         """
     )
     parser.add_argument(
@@ -65,6 +70,7 @@ Examples:
         action="store_true",
         help="Enable debug logging"
     )
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
     
@@ -72,7 +78,8 @@ Examples:
     setup_logging(args.debug)
     
     # Run health check
-    return 0 if run_health_check() else 1
+    with profile_run(args):
+        return 0 if run_health_check() else 1
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,655 @@
+#!/usr/bin/env python3
+"""
+Load testing for the Reltio MCP Strands Client.
+
+Replays a prompt corpus against ``StrandsReltioClient`` instances to find how
+many concurrent prompts one node sustains. Each stage runs either closed loop
+(a fixed number of clients sending prompts back to back) or open loop (prompts
+arriving at a target rate and queueing for a free client), against the live
+MCP server and model or against local stand-ins (``--mock``).
+
+Every request is timed end to end and split into phases from the client's
+profiler spans: model calls, MCP tool calls and OAuth token requests. The
+report gives throughput, p50/p95/p99 latencies per phase, error rates and the
+stage where the node saturates, as a terminal table and as JSON.
+
+Programmatic use::
+
+    test = LoadTest(prompts, lambda: StrandsReltioClient(traffic=SyntheticTraffic()), requests=100)
+    report = test.run(concurrency_levels=[1, 2, 4, 8])
+    print(format_report(report))
+"""
+
+import argparse
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from mcp.types import LATEST_PROTOCOL_VERSION
+
+from .profiling import Profiler
+from .recording import TrafficRecording
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("model", "tool")
+_SPAN_PHASES = {"model_call": "model", "tool_call": "tool"}
+
+# A stage is saturated when adding load no longer adds throughput but adds latency,
+# when too many requests fail, or when an open-loop stage falls behind its target rate
+SATURATION_MIN_THROUGHPUT_GAIN = 0.10
+SATURATION_MIN_LATENCY_GROWTH = 0.25
+SATURATION_MAX_ERROR_RATE = 0.05
+SATURATION_MIN_RATE_ACHIEVED = 0.90
+
+_current_request: "contextvars.ContextVar[Optional[_RequestTiming]]" = (
+    contextvars.ContextVar("loadtest_request", default=None)
+)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Percentile with linear interpolation between closest ranks."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    """p50, p95, p99 and max of durations in seconds."""
+    return {
+        "p50": round(percentile(values, 50), 4),
+        "p95": round(percentile(values, 95), 4),
+        "p99": round(percentile(values, 99), 4),
+        "max": round(max(values), 4) if values else 0.0,
+    }
+
+
+class SyntheticTraffic(TrafficRecording):
+    """Local MCP server and model stand-ins with fixed latencies.
+
+    The MCP side answers ``initialize``, ``tools/list`` and ``tools/call``; the
+    model asks for ``tool_calls`` read tool calls per prompt and then answers.
+    """
+
+    def __init__(
+        self,
+        model_latency: float = 0.5,
+        tool_latency: float = 0.1,
+        tool_calls: int = 1,
+        result_chars: int = 2000,
+        tools: Sequence[str] = ("get_entity_tool", "search_entities_tool"),
+    ):
+        """Initialize the stand-ins.
+
+        Args:
+            model_latency: Seconds before a model call's first event
+            tool_latency: Seconds per MCP tool call
+            tool_calls: Tool calls the model makes per prompt
+            result_chars: Approximate size of each tool result
+            tools: Names of the read tools served by the MCP stand-in
+        """
+        super().__init__([], latency_scale=1.0)
+        self.model_latency = model_latency
+        self.tool_latency = tool_latency
+        self.tool_calls = tool_calls
+        self.result_chars = result_chars
+        self.tools = list(tools)
+
+    def next_mcp(self, method: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Synthetic response to an MCP request."""
+        latency = 0.0
+        if method == "initialize":
+            result: Dict[str, Any] = {
+                "protocolVersion": LATEST_PROTOCOL_VERSION,
+                "capabilities": {"tools": {"listChanged": False}},
+                "serverInfo": {"name": "reltio-mcp-mock", "version": "0"},
+            }
+        elif method == "tools/list":
+            result = {"tools": [self._tool_definition(name) for name in self.tools]}
+        elif method == "tools/call":
+            latency = self.tool_latency
+            arguments = (params or {}).get("arguments") or {}
+            payload = {
+                "entity_id": arguments.get("entity_id", "mock"),
+                "attributes": "x" * self.result_chars,
+            }
+            result = {
+                "content": [{"type": "text", "text": json.dumps(payload)}],
+                "isError": False,
+            }
+        else:
+            result = {}
+        return {"latency": latency, "response": {"jsonrpc": "2.0", "result": result}}
+
+    @staticmethod
+    def _tool_definition(name: str) -> Dict[str, Any]:
+        return {
+            "name": name,
+            "description": f"Mock {name.replace('_', ' ')}",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "entity_id": {"type": "string"},
+                    "tenant_id": {"type": "string"},
+                },
+                "required": ["entity_id"],
+            },
+        }
+
+    def model_call(
+        self, messages: Any, system_prompt: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Synthetic model call: a tool use until ``tool_calls`` results are in, then an answer."""
+        results = 0
+        for message in reversed(messages):
+            blocks = message.get("content") or []
+            if message.get("role") == "user" and any(
+                "text" in block for block in blocks
+            ):
+                break
+            results += sum(1 for block in blocks if "toolResult" in block)
+
+        if results < self.tool_calls:
+            tool = self.tools[results % len(self.tools)]
+            events = [
+                {"messageStart": {"role": "assistant"}},
+                {
+                    "contentBlockStart": {
+                        "start": {
+                            "toolUse": {
+                                "toolUseId": f"mock-{uuid.uuid4().hex[:12]}",
+                                "name": tool,
+                            }
+                        }
+                    }
+                },
+                {
+                    "contentBlockDelta": {
+                        "delta": {
+                            "toolUse": {
+                                "input": json.dumps({"entity_id": f"mock-{results}"})
+                            }
+                        }
+                    }
+                },
+                {"contentBlockStop": {}},
+                {"messageStop": {"stopReason": "tool_use"}},
+            ]
+        else:
+            events = [
+                {"messageStart": {"role": "assistant"}},
+                {"contentBlockDelta": {"delta": {"text": "Mock answer."}}},
+                {"contentBlockStop": {}},
+                {"messageStop": {"stopReason": "end_turn"}},
+            ]
+        # The whole response arrives after the model latency
+        return {"events": [[self.model_latency, event] for event in events]}
+
+
+class _RequestTiming:
+    """Phase durations of one request, reported from several threads."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.phases = {phase: 0.0 for phase in PHASES}
+
+    def add(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[phase] += seconds
+
+
+class LoadTest:
+    """Runs load stages against a pool of clients."""
+
+    def __init__(
+        self,
+        prompts: Sequence[str],
+        client_factory: Callable[[], Any],
+        duration: float = 30.0,
+        requests: int = 0,
+        keep_history: bool = False,
+    ):
+        """Initialize the load test.
+
+        Args:
+            prompts: Prompt corpus, replayed in order and cycled
+            client_factory: Creates a ``StrandsReltioClient``
+            duration: Seconds per stage (ignored when ``requests`` is set)
+            requests: Requests per stage (0 runs each stage for ``duration``)
+            keep_history: Keep each client's conversation between prompts instead of starting fresh
+        """
+        if not prompts:
+            raise ValueError("The prompt corpus is empty")
+        self.prompts = list(prompts)
+        self.client_factory = client_factory
+        self.duration = duration
+        self.requests = requests
+        self.keep_history = keep_history
+        self.profiler = Profiler()
+        self.profiler.add_listener(self._on_span)
+        self._clients: List[Any] = []
+        self._startup_seconds: List[float] = []
+        self._startup_auth: List[float] = []
+        self._stop = threading.Event()
+
+    def _on_span(self, span: Dict[str, Any]) -> None:
+        if span["name"] == "oauth_token":
+            # The token is fetched when a client connects (or replaces its MCP session), never per request
+            self._startup_auth.append(span["duration"])
+            return
+        phase = _SPAN_PHASES.get(span["name"])
+        timing = _current_request.get()
+        if phase is not None and timing is not None:
+            timing.add(phase, span["duration"])
+
+    def _ensure_clients(self, count: int) -> None:
+        while len(self._clients) < count:
+            started = time.perf_counter()
+            self._clients.append(self.client_factory())
+            self._startup_seconds.append(time.perf_counter() - started)
+
+    def stop(self) -> None:
+        """Stop the running stage after the requests in flight."""
+        self._stop.set()
+
+    def run(
+        self, concurrency_levels: Sequence[int] = (1,), rps_levels: Sequence[float] = ()
+    ) -> Dict[str, Any]:
+        """Run one stage per load level.
+
+        Args:
+            concurrency_levels: Clients per closed-loop stage; with ``rps_levels`` the largest is the pool size
+            rps_levels: Target arrival rates of open-loop stages (optional)
+
+        Returns:
+            Report with startup times, per-stage statistics and the saturation point
+        """
+        stages = []
+        with self.profiler.activate():
+            if rps_levels:
+                pool = max(concurrency_levels)
+                self._ensure_clients(pool)
+                for rps in rps_levels:
+                    if self._stop.is_set():
+                        break
+                    stages.append(self._run_stage(pool, rps))
+            else:
+                for concurrency in concurrency_levels:
+                    if self._stop.is_set():
+                        break
+                    self._ensure_clients(concurrency)
+                    stages.append(self._run_stage(concurrency, None))
+        return {
+            "startup": {
+                "clients": len(self._clients),
+                "client_seconds": summarize(self._startup_seconds),
+                "auth_seconds": summarize(self._startup_auth),
+            },
+            "stages": stages,
+            "saturation": find_saturation(stages),
+        }
+
+    def _run_stage(self, concurrency: int, rps: Optional[float]) -> Dict[str, Any]:
+        label = f"rps={rps:g}" if rps else f"concurrency={concurrency}"
+        logger.info(f"Stage {label}")
+        results: List[Dict[str, Any]] = []
+        lock = threading.Lock()
+        issued = [0]
+        started = time.monotonic()
+        deadline = None if self.requests else started + self.duration
+
+        def next_index() -> Optional[int]:
+            with lock:
+                if self._stop.is_set() or (
+                    self.requests and issued[0] >= self.requests
+                ):
+                    return None
+                if deadline is not None and time.monotonic() >= deadline:
+                    return None
+                issued[0] += 1
+                return issued[0] - 1
+
+        def execute(client: Any, index: int, scheduled: float) -> None:
+            result = self._execute(client, index, scheduled, started)
+            with lock:
+                results.append(result)
+
+        if rps:
+            arrivals: "queue.Queue[Optional[tuple]]" = queue.Queue()
+
+            def worker(client: Any) -> None:
+                while True:
+                    item = arrivals.get()
+                    if item is None:
+                        return
+                    execute(client, *item)
+
+            threads = [
+                threading.Thread(target=worker, args=(client,), daemon=True)
+                for client in self._clients[:concurrency]
+            ]
+            for thread in threads:
+                thread.start()
+            while True:
+                index = next_index()
+                if index is None:
+                    break
+                scheduled = started + index / rps
+                delay = scheduled - time.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    break
+                arrivals.put((index, scheduled))
+            for _ in threads:
+                arrivals.put(None)
+        else:
+
+            def loop(client: Any) -> None:
+                while True:
+                    index = next_index()
+                    if index is None:
+                        return
+                    execute(client, index, time.monotonic())
+
+            threads = [
+                threading.Thread(target=loop, args=(client,), daemon=True)
+                for client in self._clients[:concurrency]
+            ]
+            for thread in threads:
+                thread.start()
+        for thread in threads:
+            thread.join()
+
+        return self._stage_report(
+            label, concurrency, rps, results, time.monotonic() - started
+        )
+
+    def _execute(
+        self, client: Any, index: int, scheduled: float, stage_started: float
+    ) -> Dict[str, Any]:
+        timing = _RequestTiming()
+        context_token = _current_request.set(timing)
+        started = time.monotonic()
+        error = None
+        try:
+            if not self.keep_history:
+                client.reset_conversation()
+            client.process_prompt(self.prompts[index % len(self.prompts)])
+        except Exception as e:
+            error = type(e).__name__
+            logger.info(f"Request {index} failed: {e}")
+        finally:
+            _current_request.reset(context_token)
+        latency = time.monotonic() - started
+        phases = dict(timing.phases)
+        phases["other"] = max(0.0, latency - sum(phases.values()))
+        return {
+            "offset": started - stage_started,
+            "queue_wait": max(0.0, started - scheduled),
+            "latency": latency,
+            "phases": phases,
+            "error": error,
+        }
+
+    @staticmethod
+    def _stage_report(
+        label: str,
+        concurrency: int,
+        rps: Optional[float],
+        results: List[Dict[str, Any]],
+        elapsed: float,
+    ) -> Dict[str, Any]:
+        succeeded = [result for result in results if result["error"] is None]
+        errors: Dict[str, int] = {}
+        for result in results:
+            if result["error"]:
+                errors[result["error"]] = errors.get(result["error"], 0) + 1
+        latencies = [result["latency"] for result in succeeded]
+        return {
+            "stage": label,
+            "concurrency": concurrency,
+            "target_rps": rps,
+            "requests": len(results),
+            "errors": sum(errors.values()),
+            "error_rate": (
+                round(sum(errors.values()) / len(results), 4) if results else 0.0
+            ),
+            "errors_by_type": errors,
+            "duration_s": round(elapsed, 3),
+            "throughput_rps": round(len(succeeded) / elapsed, 3) if elapsed else 0.0,
+            "latency": summarize(latencies),
+            "phases": {
+                phase: summarize([result["phases"][phase] for result in succeeded])
+                for phase in PHASES + ("other",)
+            },
+            "queue_wait": summarize([result["queue_wait"] for result in results]),
+        }
+
+    def close(self) -> None:
+        """Close the clients."""
+        for client in self._clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close client: {e}")
+        self._clients.clear()
+
+
+def find_saturation(stages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """First stage where the node stops keeping up with the added load.
+
+    Returns:
+        The stage label and reason, or None if no stage saturated
+    """
+    previous = None
+    for stage in stages:
+        reason = None
+        if stage["error_rate"] > SATURATION_MAX_ERROR_RATE:
+            reason = f"error rate {stage['error_rate']:.1%}"
+        elif (
+            stage["target_rps"]
+            and stage["throughput_rps"]
+            < stage["target_rps"] * SATURATION_MIN_RATE_ACHIEVED
+        ):
+            reason = f"throughput {stage['throughput_rps']:g} rps below target {stage['target_rps']:g} rps"
+        elif previous and previous["throughput_rps"] and previous["latency"]["p95"]:
+            gain = stage["throughput_rps"] / previous["throughput_rps"] - 1
+            growth = stage["latency"]["p95"] / previous["latency"]["p95"] - 1
+            if (
+                gain < SATURATION_MIN_THROUGHPUT_GAIN
+                and growth > SATURATION_MIN_LATENCY_GROWTH
+            ):
+                reason = f"throughput +{gain:.0%} while p95 latency +{growth:.0%}"
+        if reason:
+            return {"stage": stage["stage"], "reason": reason}
+        previous = stage
+    return None
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Terminal table of a load test report."""
+    header = (
+        f"{'stage':<16} {'reqs':>6} {'err%':>6} {'rps':>8} {'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8} "
+        f"{'model p95':>10} {'tool p95':>9} {'queue p95':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for stage in report["stages"]:
+        phases = stage["phases"]
+        lines.append(
+            f"{stage['stage']:<16} {stage['requests']:>6} {stage['error_rate'] * 100:>6.1f} {stage['throughput_rps']:>8.2f} "
+            f"{stage['latency']['p50']:>8.3f} {stage['latency']['p95']:>8.3f} {stage['latency']['p99']:>8.3f} "
+            f"{phases['model']['p95']:>10.3f} {phases['tool']['p95']:>9.3f} "
+            f"{stage['queue_wait']['p95']:>10.3f}"
+        )
+    startup = report["startup"]
+    lines.append("")
+    lines.append(
+        f"Startup: {startup['clients']} clients, p50 {startup['client_seconds']['p50']:.3f}s per client, "
+        f"auth p50 {startup['auth_seconds']['p50']:.3f}s"
+    )
+    saturation = report["saturation"]
+    lines.append(
+        f"Saturation: {saturation['stage']} ({saturation['reason']})"
+        if saturation
+        else "Saturation: not reached"
+    )
+    return "\n".join(lines)
+
+
+def _levels(value: str, kind: Callable[[str], Any]) -> List[Any]:
+    try:
+        levels = [kind(level) for level in value.split(",") if level.strip()]
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"Invalid load levels: {value}") from e
+    if not levels or any(level <= 0 for level in levels):
+        raise argparse.ArgumentTypeError(f"Load levels must be positive: {value}")
+    return levels
+
+
+def main() -> int:
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description="Load test the Reltio MCP Strands Client with a prompt corpus",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Prompts are read one per line and cycled. Each load level runs as one stage.
+
+Examples:
+  %(prog)s prompts.txt --concurrency 1,2,4,8             # Closed loop, 30s per stage
+  %(prog)s prompts.txt --rps 1,2,5 --concurrency 16       # Open loop, up to 16 clients
+  %(prog)s prompts.txt --mock --concurrency 1,4,16 --requests 200
+        """,
+    )
+    parser.add_argument(
+        "prompts_file", nargs="?", help="File with one prompt per line (default: stdin)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=lambda v: _levels(v, int),
+        default=[1],
+        help="Comma-separated client counts, one stage each (default: 1)",
+    )
+    parser.add_argument(
+        "--rps",
+        type=lambda v: _levels(v, float),
+        default=[],
+        help="Comma-separated target request rates for open-loop stages",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=30.0, help="Seconds per stage (default: 30)"
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=0,
+        help="Requests per stage instead of a duration",
+    )
+    parser.add_argument(
+        "--keep-history",
+        action="store_true",
+        help="Keep each client's conversation between prompts",
+    )
+    parser.add_argument(
+        "--mock",
+        action="store_true",
+        help="Use local MCP and model stand-ins instead of live services",
+    )
+    parser.add_argument(
+        "--mock-model-latency",
+        type=float,
+        default=0.5,
+        help="Stand-in model latency in seconds",
+    )
+    parser.add_argument(
+        "--mock-tool-latency",
+        type=float,
+        default=0.1,
+        help="Stand-in MCP tool latency in seconds",
+    )
+    parser.add_argument(
+        "--mock-tool-calls",
+        type=int,
+        default=1,
+        help="Tool calls per prompt of the stand-in model",
+    )
+    parser.add_argument(
+        "--output",
+        default="loadtest.json",
+        help="JSON report file (default: loadtest.json)",
+    )
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO if args.debug else logging.WARNING, format="%(message)s"
+    )
+
+    source = (
+        open(args.prompts_file, "r", encoding="utf-8")
+        if args.prompts_file
+        else sys.stdin
+    )
+    with source:
+        prompts = [line.strip() for line in source if line.strip()]
+
+    from config import config
+    from .client import StrandsReltioClient
+
+    traffic = None
+    if args.mock:
+        traffic = SyntheticTraffic(
+            args.mock_model_latency, args.mock_tool_latency, args.mock_tool_calls
+        )
+        # The stand-ins need no endpoint or tenant, but the client validates them
+        config.mcp_endpoint = config.mcp_endpoint or "http://localhost/mcp-mock"
+        config.reltio_tenant_id = config.reltio_tenant_id or "mock-tenant"
+
+    try:
+        test = LoadTest(
+            prompts,
+            lambda: StrandsReltioClient(traffic=traffic),
+            duration=args.duration,
+            requests=args.requests,
+            keep_history=args.keep_history,
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    try:
+        # Agents stream their answers to stdout; keep the terminal for the report
+        with (
+            open(os.devnull, "w") as devnull,
+            contextlib.redirect_stdout(sys.stdout if args.debug else devnull),
+        ):
+            report = test.run(args.concurrency, args.rps)
+    except KeyboardInterrupt:
+        test.stop()
+        print("Interrupted", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        test.close()
+
+    print(format_report(report))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nJSON report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
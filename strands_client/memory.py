@@ -0,0 +1,214 @@
+"""
+Memory measurement and footprint reduction for long-running chat workers.
+
+``MemoryProfiler`` takes ``tracemalloc`` snapshots at turn boundaries and
+attributes the allocated memory to components (client, agent SDK, MCP,
+transport, model SDKs, ...) with the growth since the previous turn.
+
+``slim_history`` compacts an agent after each turn: JSON tool results are
+re-serialized without whitespace, tool results of earlier turns can be
+truncated, and the per-cycle metrics Strands keeps for every invocation are
+trimmed to the most recent ones.
+"""
+
+import json
+import logging
+import threading
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# (path fragment, component), first match wins
+_COMPONENTS = [
+    ("strands_client", "client"),
+    ("/strands/", "strands"),
+    ("/mcp/", "mcp"),
+    ("/httpx/", "transport"),
+    ("/httpcore/", "transport"),
+    ("/anyio/", "transport"),
+    ("/h2/", "transport"),
+    ("/openai/", "model_sdk"),
+    ("/anthropic/", "model_sdk"),
+    ("/pydantic", "pydantic"),
+    ("/json/", "json"),
+]
+
+# Per-cycle Strands metrics kept after slimming
+_METRICS_KEPT = 2
+
+_TRUNCATED = "... [truncated]"
+
+
+def component_of(filename: str) -> str:
+    """Component owning allocations made in a source file."""
+    path = filename.replace("\\", "/")
+    for fragment, component in _COMPONENTS:
+        if fragment in path:
+            return component
+    return "other"
+
+
+def history_size(messages: List[Dict[str, Any]]) -> int:
+    """Serialized size of a message history in characters."""
+    return len(json.dumps(messages, separators=(",", ":"), default=str))
+
+
+class MemoryProfiler:
+    """Takes tracemalloc snapshots at turn boundaries, grouped by component."""
+
+    def __init__(self, frames: int = 1):
+        """Start tracing allocations if needed.
+
+        Args:
+            frames: Stack frames recorded per allocation (1 keeps overhead low)
+        """
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start(frames)
+        self._lock = threading.Lock()
+        self._previous: Dict[str, int] = {}
+        self.snapshots: List[Dict[str, Any]] = []
+
+    def snapshot(
+        self, label: str, messages: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Record the current memory use by component.
+
+        Args:
+            label: Snapshot label (e.g. "turn 3")
+            messages: Agent message history, to report its size
+
+        Returns:
+            The recorded snapshot
+        """
+        snapshot = tracemalloc.take_snapshot()
+        by_component: Dict[str, int] = {}
+        for stat in snapshot.statistics("filename"):
+            component = component_of(stat.traceback[0].filename)
+            by_component[component] = by_component.get(component, 0) + stat.size
+        current, peak = tracemalloc.get_traced_memory()
+
+        with self._lock:
+            entry: Dict[str, Any] = {
+                "label": label,
+                "current_bytes": current,
+                "peak_bytes": peak,
+                "by_component": dict(
+                    sorted(by_component.items(), key=lambda item: -item[1])
+                ),
+                "growth_by_component": {
+                    component: size - self._previous.get(component, 0)
+                    for component, size in by_component.items()
+                    if size != self._previous.get(component, 0)
+                },
+            }
+            if messages is not None:
+                entry["history_messages"] = len(messages)
+                entry["history_chars"] = history_size(messages)
+            self._previous = by_component
+            self.snapshots.append(entry)
+        logger.info(
+            f"Memory at {label}: {current / 1024:.0f} KiB traced, peak {peak / 1024:.0f} KiB"
+        )
+        return entry
+
+    def report(self) -> Dict[str, Any]:
+        """Latest snapshot and the growth since the first one."""
+        with self._lock:
+            if not self.snapshots:
+                return {"snapshots": 0}
+            first, last = self.snapshots[0], self.snapshots[-1]
+            return {
+                "snapshots": len(self.snapshots),
+                "current_bytes": last["current_bytes"],
+                "peak_bytes": last["peak_bytes"],
+                "growth_bytes": last["current_bytes"] - first["current_bytes"],
+                "by_component": last["by_component"],
+                "history_chars": last.get("history_chars"),
+            }
+
+    def write(self, path: str) -> None:
+        """Write all snapshots as JSON."""
+        with self._lock:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"snapshots": self.snapshots}, f, indent=2)
+
+    def stop(self) -> None:
+        """Stop tracing if this profiler started it."""
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def _minify(text: str) -> str:
+    stripped = text.strip()
+    if not stripped or stripped[0] not in "[{":
+        return text
+    try:
+        return json.dumps(
+            json.loads(stripped), separators=(",", ":"), ensure_ascii=False
+        )
+    except ValueError:
+        return text
+
+
+def find_turn_start(messages: List[Any], last_before_turn: Optional[Any]) -> int:
+    """Index of the first message of the turn that just ended.
+
+    The conversation manager may trim the front of the history during the
+    turn, so an index taken before the turn can point at the wrong message.
+    The turn starts after the message that was last before it; when that one
+    was trimmed away, everything left belongs to the turn.
+
+    Args:
+        messages: Agent history after the turn
+        last_before_turn: Last message before the turn (None if the history was empty)
+    """
+    if last_before_turn is not None:
+        for index in range(len(messages) - 1, -1, -1):
+            if messages[index] is last_before_turn:
+                return index + 1
+    return 0
+
+
+def slim_history(agent: Any, turn_start: int, max_old_result_chars: int = 0) -> int:
+    """Compact an agent's history and metrics after a turn.
+
+    Args:
+        agent: Strands agent
+        turn_start: Index of the first message of the turn that just ended, see ``find_turn_start``
+        max_old_result_chars: Truncate tool results of earlier turns to this size (0 keeps them)
+
+    Returns:
+        Number of characters removed from tool results
+    """
+    saved = 0
+    # Earlier turns were minified already; only revisit them to truncate
+    first = 0 if max_old_result_chars else turn_start
+    for index, message in enumerate(agent.messages[first:], start=first):
+        old = index < turn_start
+        for block in message.get("content", []):
+            result = block.get("toolResult") if isinstance(block, dict) else None
+            if not result:
+                continue
+            for item in result.get("content") or []:
+                text = item.get("text") if isinstance(item, dict) else None
+                if not isinstance(text, str):
+                    continue
+                slimmed = text if old else _minify(text)
+                if old and max_old_result_chars and len(slimmed) > max_old_result_chars:
+                    # Truncated text fits the limit, so later passes leave it alone
+                    slimmed = (
+                        slimmed[: max(0, max_old_result_chars - len(_TRUNCATED))]
+                        + _TRUNCATED
+                    )
+                if len(slimmed) < len(text):
+                    saved += len(text) - len(slimmed)
+                    item["text"] = slimmed
+
+    metrics = getattr(agent, "event_loop_metrics", None)
+    for name in ("traces", "cycle_durations", "agent_invocations"):
+        values = getattr(metrics, name, None)
+        if isinstance(values, list) and len(values) > _METRICS_KEPT:
+            del values[:-_METRICS_KEPT]
+    return saved
@@ -0,0 +1,232 @@
+"""
+Model wrappers for the Reltio MCP Strands Client.
+
+The wrappers delegate to a Strands model (OpenAIModel, AnthropicModel, ...)
+and add client-side behaviour around each model call, so ``_create_model`` can
+stack them without the agent noticing.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncGenerator, Dict, Optional
+
+from strands.models.model import Model
+
+from .cancellation import CancellationStats
+from .profiling import Profiler
+from .rate_limit import RateLimiter, is_rate_limited, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class DelegatingModel(Model):
+    """Model that forwards every call to a wrapped model."""
+
+    def __init__(self, model: Model):
+        """Initialize the wrapper.
+
+        Args:
+            model: Strands model to delegate to
+        """
+        self._model = model
+
+    @property
+    def wrapped(self) -> Model:
+        """The model this wrapper delegates to."""
+        return self._model
+
+    def update_config(self, **model_config: Any) -> None:
+        """Update the wrapped model configuration."""
+        self._model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        """Return the wrapped model configuration."""
+        return self._model.get_config()
+
+    def structured_output(
+        self,
+        output_model: Any,
+        prompt: Any,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Delegate structured output to the wrapped model."""
+        return self._model.structured_output(
+            output_model, prompt, system_prompt=system_prompt, **kwargs
+        )
+
+    def stream(
+        self,
+        messages: Any,
+        tool_specs: Any = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Delegate streaming to the wrapped model."""
+        return self._model.stream(messages, tool_specs, system_prompt, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes not defined on the wrapper itself
+        if name == "_model":
+            raise AttributeError(name)
+        return getattr(self._model, name)
+
+
+class RateLimitedModel(DelegatingModel):
+    """Model whose calls are shaped by a per-provider RateLimiter."""
+
+    def __init__(self, model: Model, limiter: RateLimiter):
+        """Initialize the wrapper.
+
+        Args:
+            model: Strands model to delegate to
+            limiter: Limiter shared by all models of the same provider
+        """
+        super().__init__(model)
+        self.limiter = limiter
+
+    async def stream(
+        self,
+        messages: Any,
+        tool_specs: Any = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[Any, None]:
+        """Stream from the wrapped model once the limiter admits the call."""
+        await self.limiter.acquire_async()
+        throttled = False
+        retry_after = None
+        try:
+            async for event in self._model.stream(
+                messages, tool_specs, system_prompt, **kwargs
+            ):
+                yield event
+        except Exception as e:
+            throttled = is_rate_limited(e)
+            retry_after = retry_after_seconds(e)
+            raise
+        finally:
+            self.limiter.release(throttled, retry_after)
+
+
+class ProfiledModel(DelegatingModel):
+    """Model reporting each call as a "model_call" span with time to first event."""
+
+    def __init__(self, model: Model, profiler: Profiler, model_id: str = ""):
+        """Initialize the wrapper.
+
+        Args:
+            model: Strands model to delegate to
+            profiler: Profiler receiving the spans
+            model_id: Model ID added to the span attributes
+        """
+        super().__init__(model)
+        self.profiler = profiler
+        self.model_id = model_id
+
+    async def stream(
+        self,
+        messages: Any,
+        tool_specs: Any = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[Any, None]:
+        """Stream from the wrapped model, timing the call."""
+        started = time.perf_counter()
+        first_event = None
+        try:
+            async for event in self._model.stream(
+                messages, tool_specs, system_prompt, **kwargs
+            ):
+                if first_event is None:
+                    first_event = time.perf_counter()
+                yield event
+        finally:
+            attrs: Dict[str, Any] = {"model_id": self.model_id}
+            if first_event is not None:
+                attrs["time_to_first_event_s"] = round(first_event - started, 6)
+            self.profiler.record("model_call", started, time.perf_counter(), attrs)
+
+
+class CancellableModel(DelegatingModel):
+    """Model whose in-flight stream is aborted as soon as the invocation is cancelled.
+
+    Strands only checks its ``cancel_signal`` between stream events, so a call
+    still waiting for the provider's first token would run to completion. The
+    wrapped stream is consumed in its own task, which is cancelled (closing the
+    HTTP request) when the signal is set; the stream then ends early and the
+    agent reports the turn as cancelled.
+    """
+
+    def __init__(
+        self,
+        model: Model,
+        stats: Optional[CancellationStats] = None,
+        poll_interval: float = 0.05,
+    ):
+        """Initialize the wrapper.
+
+        Args:
+            model: Strands model to delegate to
+            stats: Counters receiving cancelled streams (optional)
+            poll_interval: Seconds between checks of the cancel signal
+        """
+        super().__init__(model)
+        self.stats = stats
+        self.poll_interval = poll_interval
+
+    async def stream(
+        self,
+        messages: Any,
+        tool_specs: Any = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[Any, None]:
+        """Stream from the wrapped model until it ends or the invocation is cancelled."""
+        cancel_signal = kwargs.get("cancel_signal")
+        if cancel_signal is None:
+            async for event in self._model.stream(
+                messages, tool_specs, system_prompt, **kwargs
+            ):
+                yield event
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def produce() -> None:
+            try:
+                async for event in self._model.stream(
+                    messages, tool_specs, system_prompt, **kwargs
+                ):
+                    queue.put_nowait((event, None))
+                queue.put_nowait((_END, None))
+            except Exception as e:
+                queue.put_nowait((_END, e))
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                if queue.empty():
+                    getter = asyncio.ensure_future(queue.get())
+                    while not getter.done() and not cancel_signal.is_set():
+                        await asyncio.wait({getter}, timeout=self.poll_interval)
+                    if not getter.done():
+                        getter.cancel()
+                        if self.stats:
+                            self.stats.count("model_streams")
+                        logger.info("Model stream cancelled")
+                        return
+                    event, error = getter.result()
+                else:
+                    event, error = queue.get_nowait()
+                if error is not None:
+                    raise error
+                if event is _END:
+                    return
+                yield event
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
@@ -0,0 +1,275 @@
+"""
+Speculative prefetch of read-only MCP calls for the Reltio MCP Strands Client.
+
+For common prompt shapes ("entity summary for entity ID 123") the first model
+round only decides to call the same read tool. Prefetch rules match prompts
+with regular expressions and launch the likely MCP calls in parallel with that
+first model call. When the agent then calls the tool with the same arguments
+it receives the prefetched result instead of waiting for a new MCP round trip.
+
+Rules are loaded from a YAML file; named groups fill the argument templates::
+
+    entity-summary:
+      pattern: "entity (?:id )?(?P<entity_id>[A-Za-z0-9]+)"
+      tool: get_entity_tool
+      arguments:
+        entity_id: "{entity_id}"
+
+Hit rate and wasted calls are tracked per rule so the rules can be tuned.
+"""
+
+import json
+import logging
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Pattern, Sequence, Set, Tuple
+
+import yaml
+
+from config import ConfigurationError
+from .cancellation import CancellationToken
+from .toolsets import WRITE_TOOL_PATTERNS, Toolset
+
+logger = logging.getLogger(__name__)
+
+# Prefetched calls must never modify tenant data
+_READ_ONLY = Toolset("prefetch", exclude=tuple(WRITE_TOOL_PATTERNS))
+
+PrefetchCallFn = Callable[
+    [str, Dict[str, Any], Optional[CancellationToken]], Dict[str, Any]
+]
+
+
+@dataclass(frozen=True)
+class PrefetchRule:
+    """Prompt pattern mapped to a read-only MCP call."""
+
+    name: str
+    pattern: Pattern[str]
+    tool: str
+    arguments: Dict[str, Any] = field(default_factory=dict)
+
+    def calls(self, prompt: str) -> List[Dict[str, Any]]:
+        """Arguments of the calls suggested by a prompt, one per match."""
+        calls = []
+        for match in self.pattern.finditer(prompt):
+            groups = {
+                key: value
+                for key, value in match.groupdict().items()
+                if value is not None
+            }
+            try:
+                calls.append(
+                    {
+                        key: value.format(**groups) if isinstance(value, str) else value
+                        for key, value in self.arguments.items()
+                    }
+                )
+            except (KeyError, IndexError):
+                continue
+        return calls
+
+
+def load_prefetch_rules(path: str) -> List[PrefetchRule]:
+    """Load prefetch rules from a YAML file.
+
+    Args:
+        path: YAML file mapping rule names to ``pattern``, ``tool`` and ``arguments``
+
+    Returns:
+        Prefetch rules in file order
+
+    Raises:
+        ConfigurationError: If the file cannot be read, is malformed or targets a write tool
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            definitions = yaml.safe_load(f) or {}
+        rules = [
+            PrefetchRule(
+                name,
+                re.compile(definition["pattern"], re.IGNORECASE),
+                definition["tool"],
+                dict(definition.get("arguments") or {}),
+            )
+            for name, definition in definitions.items()
+        ]
+    except (
+        OSError,
+        yaml.YAMLError,
+        AttributeError,
+        KeyError,
+        TypeError,
+        re.error,
+    ) as e:
+        raise ConfigurationError(f"Invalid prefetch rules file {path}: {e}") from e
+
+    for rule in rules:
+        if not _READ_ONLY.matches(rule.tool):
+            raise ConfigurationError(
+                f"Prefetch rule '{rule.name}' targets write tool '{rule.tool}'"
+            )
+    return rules
+
+
+def _call_key(tool: str, arguments: Dict[str, Any]) -> Tuple[str, str]:
+    return tool, json.dumps(arguments, sort_keys=True, default=str)
+
+
+class PrefetchBatch:
+    """Prefetched calls of one prompt, consumed by the agent's tool calls."""
+
+    def __init__(self, prefetcher: "Prefetcher"):
+        self._prefetcher = prefetcher
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[str, str], Tuple[str, "Future[Dict[str, Any]]"]] = {}
+
+    def add(
+        self, rule: str, tool: str, arguments: Dict[str, Any], future: Future
+    ) -> None:
+        with self._lock:
+            self._calls[_call_key(tool, arguments)] = (rule, future)
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def take(self, tool: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the prefetched result of a call, or None if it was not prefetched.
+
+        Waits for the prefetch to complete; failed prefetches return None so the
+        caller falls back to a regular MCP call.
+        """
+        with self._lock:
+            entry = self._calls.pop(_call_key(tool, arguments), None)
+        if entry is None:
+            return None
+        rule, future = entry
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.info(f"Prefetch of {tool} failed, calling again: {e}")
+            self._prefetcher._count(rule, "failed")
+            return None
+        self._prefetcher._count(rule, "hits")
+        return result
+
+    def finish(self) -> None:
+        """Count unused prefetches as wasted at the end of the turn."""
+        with self._lock:
+            unused = list(self._calls.values())
+            self._calls.clear()
+        for rule, future in unused:
+            future.cancel()
+            self._prefetcher._count(rule, "wasted")
+
+
+class Prefetcher:
+    """Launches prefetch calls for prompts matching the rules."""
+
+    def __init__(
+        self,
+        rules: Sequence[PrefetchRule],
+        tools: Sequence[Any],
+        call: PrefetchCallFn,
+        tenant_id: str,
+        max_concurrency: int = 4,
+        max_calls: int = 5,
+    ):
+        """Initialize the prefetcher.
+
+        Args:
+            rules: Prefetch rules
+            tools: MCP tools of the client; rules for unknown tools are skipped
+            call: Function performing an MCP call given the tool name, arguments and cancellation token
+            tenant_id: Tenant injected into tools whose schema has a ``tenant_id`` argument
+            max_concurrency: Maximum number of prefetch calls in flight
+            max_calls: Maximum number of calls launched per prompt
+        """
+        tools_by_name = {tool.tool_name: tool for tool in tools}
+        self.rules: List[PrefetchRule] = []
+        self._takes_tenant: Dict[str, bool] = {}
+        for rule in rules:
+            tool = tools_by_name.get(rule.tool)
+            if tool is None:
+                logger.warning(
+                    f"Prefetch rule '{rule.name}' skipped: tool '{rule.tool}' is not available"
+                )
+                continue
+            schema = tool.tool_spec.get("inputSchema", {})
+            schema = schema.get("json", schema)
+            self._takes_tenant[rule.tool] = "tenant_id" in (
+                schema.get("properties") or {}
+            )
+            self.rules.append(rule)
+
+        self._call = call
+        self.tenant_id = tenant_id
+        self.max_calls = max_calls
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_concurrency), thread_name_prefix="prefetch"
+        )
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {
+            rule.name: {"launched": 0, "hits": 0, "wasted": 0, "failed": 0}
+            for rule in self.rules
+        }
+
+    def _count(self, rule: str, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[rule][counter] += amount
+
+    def start(
+        self, prompt: str, token: Optional[CancellationToken] = None
+    ) -> PrefetchBatch:
+        """Launch the calls suggested by a prompt.
+
+        Args:
+            prompt: User prompt
+            token: Cancellation token of the prompt's turn, passed on to every call
+
+        Returns:
+            Batch of in-flight prefetches (possibly empty)
+        """
+        batch = PrefetchBatch(self)
+        seen: Set[Tuple[str, str]] = set()
+        for rule in self.rules:
+            for arguments in rule.calls(prompt):
+                if len(seen) >= self.max_calls:
+                    return batch
+                if self._takes_tenant.get(rule.tool):
+                    arguments.setdefault("tenant_id", self.tenant_id)
+                key = _call_key(rule.tool, arguments)
+                if key in seen:
+                    continue
+                seen.add(key)
+                batch.add(
+                    rule.name,
+                    rule.tool,
+                    arguments,
+                    self._executor.submit(self._call, rule.tool, arguments, token),
+                )
+                self._count(rule.name, "launched")
+        if seen:
+            logger.info(f"Prefetching {len(seen)} MCP calls")
+        return batch
+
+    def metrics(self) -> Dict[str, Any]:
+        """Prefetch totals, hit rate and per-rule counters."""
+        with self._lock:
+            rules = {name: dict(stats) for name, stats in self._stats.items()}
+        launched = sum(stats["launched"] for stats in rules.values())
+        hits = sum(stats["hits"] for stats in rules.values())
+        return {
+            "launched": launched,
+            "hits": hits,
+            "wasted": sum(stats["wasted"] for stats in rules.values()),
+            "failed": sum(stats["failed"] for stats in rules.values()),
+            "hit_rate": round(hits / launched, 4) if launched else 0.0,
+            "rules": rules,
+        }
+
+    def close(self) -> None:
+        """Stop the prefetch threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,250 @@
+"""
+Run profiling for the Reltio MCP Strands Client.
+
+A ``Profiler`` records a wall-clock timeline of the phases of a run: imports,
+config load, OAuth, MCP connect, tool listing, agent creation, each model call
+and each tool call. The client reports spans to the active profiler only, so
+profiling costs nothing when it is off.
+
+``StackSampler`` optionally samples the stacks of all threads and writes them
+in the folded format understood by flamegraph.pl and speedscope.
+
+Programmatic use::
+
+    profiler = Profiler()
+    with profiler.activate():
+        client = StrandsReltioClient()
+        client.process_prompt("...")
+    print(profiler.format_summary())
+"""
+
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from types import FrameType
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from config.config import set_load_timer
+
+logger = logging.getLogger(__name__)
+
+SpanListener = Callable[[Dict[str, Any]], None]
+
+_active_profiler: Optional["Profiler"] = None
+
+
+class Profiler:
+    """Collects timeline spans from any thread."""
+
+    def __init__(self) -> None:
+        self._origin = time.perf_counter()
+        self._spans: List[Dict[str, Any]] = []
+        self._listeners: List[SpanListener] = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: SpanListener) -> None:
+        """Register a callback receiving each span as soon as it completes."""
+        self._listeners.append(listener)
+
+    def record(
+        self,
+        name: str,
+        started: float,
+        ended: float,
+        attrs: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Record a completed span.
+
+        Args:
+            name: Phase name (e.g. "oauth_token", "model_call")
+            started: ``time.perf_counter()`` value at the start of the span
+            ended: ``time.perf_counter()`` value at the end of the span
+            attrs: Optional span attributes (tool name, model ID, ...)
+        """
+        entry = {
+            "name": name,
+            "start": round(started - self._origin, 6),
+            "duration": round(ended - started, 6),
+            "thread": threading.current_thread().name,
+        }
+        if attrs:
+            entry["attrs"] = attrs
+        with self._lock:
+            self._spans.append(entry)
+        for listener in self._listeners:
+            try:
+                listener(entry)
+            except Exception as e:
+                logger.warning(f"Profiler listener failed: {e}")
+
+    @contextmanager
+    def activate(self) -> Iterator["Profiler"]:
+        """Make this the profiler receiving client spans for the block."""
+        global _active_profiler
+        previous = _active_profiler
+        _active_profiler = self
+        try:
+            yield self
+        finally:
+            _active_profiler = previous
+
+    def timeline(self) -> List[Dict[str, Any]]:
+        """Recorded spans ordered by start time."""
+        with self._lock:
+            return sorted(self._spans, key=lambda span: span["start"])
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count, total and max duration per phase."""
+        summary: Dict[str, Dict[str, float]] = {}
+        for span in self.timeline():
+            phase = summary.setdefault(
+                span["name"], {"count": 0, "total_s": 0.0, "max_s": 0.0}
+            )
+            phase["count"] += 1
+            phase["total_s"] = round(phase["total_s"] + span["duration"], 6)
+            phase["max_s"] = max(phase["max_s"], span["duration"])
+        return summary
+
+    def format_summary(self) -> str:
+        """Human-readable summary table."""
+        lines = [f"{'phase':<20} {'count':>6} {'total (s)':>10} {'max (s)':>10}"]
+        for name, phase in self.summary().items():
+            lines.append(
+                f"{name:<20} {phase['count']:>6} {phase['total_s']:>10.3f} {phase['max_s']:>10.3f}"
+            )
+        return "\n".join(lines)
+
+    def write(self, path: str) -> None:
+        """Write the timeline and summary as JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"timeline": self.timeline(), "summary": self.summary()},
+                f,
+                indent=2,
+                default=str,
+            )
+
+
+def get_profiler() -> Optional[Profiler]:
+    """The active profiler, or None when profiling is off."""
+    return _active_profiler
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[None]:
+    """Time a block as a span of the active profiler (no-op when profiling is off)."""
+    profiler = _active_profiler
+    if profiler is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.record(name, started, time.perf_counter(), attrs)
+
+
+# The config package knows nothing of the profiler; time its first load from here
+set_load_timer(lambda: span("config_load"))
+
+
+class StackSampler:
+    """Periodically samples the stacks of all threads into folded stack counts."""
+
+    def __init__(self, interval: float = 0.005):
+        """Initialize the sampler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling in a daemon thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                current: Optional[FrameType] = frame
+                while current is not None:
+                    code = current.f_code
+                    stack.append(
+                        f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})"
+                    )
+                    current = current.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self._stacks[";".join(reversed(stack))] += 1
+
+    def write_folded(self, path: str) -> None:
+        """Write samples in the folded stack format used by flame graph tools."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the ``--profile`` options shared by the CLIs."""
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a timing breakdown of the run and write it as JSON",
+    )
+    parser.add_argument(
+        "--profile-output",
+        default="profile.json",
+        help="Timeline output file for --profile (default: profile.json)",
+    )
+    parser.add_argument(
+        "--profile-stacks",
+        action="store_true",
+        help="With --profile, also sample stacks and write <output>.folded for flame graphs",
+    )
+
+
+@contextmanager
+def profile_run(args: argparse.Namespace) -> Iterator[Optional[Profiler]]:
+    """Profile a CLI run when ``--profile`` was given, reporting on exit."""
+    if not getattr(args, "profile", False):
+        yield None
+        return
+
+    profiler = Profiler()
+    sampler = StackSampler() if args.profile_stacks else None
+    if sampler:
+        sampler.start()
+    try:
+        with profiler.activate():
+            yield profiler
+    finally:
+        if sampler:
+            sampler.stop()
+            sampler.write_folded(f"{args.profile_output}.folded")
+        profiler.write(args.profile_output)
+        print(f"\n⏱️  Profile ({args.profile_output})", file=sys.stderr)
+        print(profiler.format_summary(), file=sys.stderr)
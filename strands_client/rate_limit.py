@@ -0,0 +1,403 @@
+"""
+Client-side rate limiting for Reltio MCP tool calls and LLM model calls.
+
+Each limiter combines a token bucket (steady request rate with bursts) and an
+AIMD adaptive concurrency limit: the number of in-flight calls grows slowly
+while calls succeed and is cut multiplicatively when the server answers with
+HTTP 429, honoring any Retry-After header it sends.
+"""
+
+import asyncio
+import email.utils
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Pause applied when a 429 arrives without a usable Retry-After header
+DEFAULT_BACKOFF_SECONDS = 1.0
+
+# Structured fields of an MCP tool result that carry an HTTP status or error code
+_STATUS_FIELDS = ("status", "statusCode", "status_code", "httpStatus", "http_status")
+_CODE_FIELDS = ("code", "errorCode", "error_code")
+_RATE_LIMIT_CODES = {
+    "429",
+    "rate_limited",
+    "rate_limit_exceeded",
+    "too_many_requests",
+    "throttled",
+    "throttling",
+}
+_RETRY_AFTER_FIELDS = (
+    "retryAfter",
+    "retry_after",
+    "retryAfterSeconds",
+    "retry_after_seconds",
+)
+
+
+class TokenBucket:
+    """Thread-safe token bucket with an optional pause window."""
+
+    def __init__(
+        self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic
+    ):
+        """Initialize the bucket.
+
+        Args:
+            rate: Tokens added per second (0 or less means unlimited)
+            burst: Maximum number of tokens the bucket can hold
+            clock: Monotonic clock, overridable for tests
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token, going into debt if none is available.
+
+        Returns:
+            Seconds the caller must wait before using the reserved token
+        """
+        with self._lock:
+            now = self._clock()
+            if self.rate <= 0:
+                return max(0.0, self._paused_until - now)
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for the given number of seconds."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+class AdaptiveConcurrencyLimiter:
+    """Concurrency limit tuned with additive-increase / multiplicative-decrease."""
+
+    def __init__(
+        self,
+        max_limit: int,
+        initial_limit: Optional[int] = None,
+        min_limit: int = 1,
+        decrease_factor: float = 0.5,
+    ):
+        """Initialize the limiter.
+
+        Args:
+            max_limit: Upper bound on concurrent calls
+            initial_limit: Starting limit (defaults to max_limit)
+            min_limit: Lower bound the limit never drops below
+            decrease_factor: Multiplier applied to the limit on overload
+        """
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.decrease_factor = decrease_factor
+        self._limit = float(initial_limit or self.max_limit)
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current whole-number concurrency limit."""
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently holding a slot."""
+        return self._in_flight
+
+    def try_acquire(self) -> bool:
+        """Take a slot without blocking.
+
+        Returns:
+            True if a slot was taken
+        """
+        with self._condition:
+            if self._in_flight < self.limit:
+                self._in_flight += 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        """Block until a slot is available and take it."""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, overloaded: bool = False) -> None:
+        """Return a slot and adjust the limit from the call outcome.
+
+        Args:
+            overloaded: True if the call was rejected with a rate-limit error
+        """
+        with self._condition:
+            self._in_flight = max(0, self._in_flight - 1)
+            if overloaded:
+                self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+            else:
+                self._limit = min(self.max_limit, self._limit + 1 / max(self._limit, 1))
+            self._condition.notify_all()
+
+
+class RateLimiter:
+    """Token bucket plus adaptive concurrency for one tenant or provider."""
+
+    def __init__(self, name: str, rate: float, burst: int, max_concurrency: int):
+        """Initialize the limiter.
+
+        Args:
+            name: Key used in logs and metrics (e.g. "mcp:tenant" or "model:openai")
+            rate: Sustained calls per second
+            burst: Calls allowed back-to-back before the rate applies
+            max_concurrency: Upper bound for the adaptive concurrency limit
+        """
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = AdaptiveConcurrencyLimiter(max_concurrency)
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._throttled = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def acquire(self) -> float:
+        """Block until the call may proceed.
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        started = time.monotonic()
+        self.concurrency.acquire()
+        delay = self.bucket.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return self._record_wait(time.monotonic() - started)
+
+    async def acquire_async(self, poll_interval: float = 0.01) -> float:
+        """Wait without blocking the event loop until the call may proceed.
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        started = time.monotonic()
+        while not self.concurrency.try_acquire():
+            await asyncio.sleep(poll_interval)
+            poll_interval = min(poll_interval * 2, 0.25)
+        delay = self.bucket.reserve()
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                # A cancelled model call must not keep its slot
+                self.concurrency.release()
+                raise
+        return self._record_wait(time.monotonic() - started)
+
+    def release(
+        self, throttled: bool = False, retry_after: Optional[float] = None
+    ) -> None:
+        """Release the call slot and feed the outcome back into the limiter.
+
+        Args:
+            throttled: True if the server rejected the call with a rate-limit error
+            retry_after: Seconds requested by the server before the next call
+        """
+        if throttled:
+            pause = retry_after if retry_after is not None else DEFAULT_BACKOFF_SECONDS
+            self.bucket.pause(pause)
+            with self._lock:
+                self._throttled += 1
+            logger.warning(f"Rate limited on {self.name}; backing off for {pause:.1f}s")
+        self.concurrency.release(overloaded=throttled)
+
+    def _record_wait(self, waited: float) -> float:
+        with self._lock:
+            self._calls += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        return waited
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of queue-wait and throttling metrics."""
+        with self._lock:
+            calls = self._calls
+            return {
+                "calls": calls,
+                "throttled": self._throttled,
+                "queue_wait_total_s": round(self._total_wait, 4),
+                "queue_wait_avg_s": (
+                    round(self._total_wait / calls, 4) if calls else 0.0
+                ),
+                "queue_wait_max_s": round(self._max_wait, 4),
+                "concurrency_limit": self.concurrency.limit,
+                "in_flight": self.concurrency.in_flight,
+            }
+
+
+class RateLimiterRegistry:
+    """Lazily creates one RateLimiter per key (MCP tenant or model provider)."""
+
+    def __init__(
+        self,
+        mcp_rate: float,
+        mcp_burst: int,
+        model_rate: float,
+        model_burst: int,
+        max_concurrency: int,
+    ):
+        """Initialize the registry with the limits applied to new keys."""
+        self._limits = {
+            "mcp": (mcp_rate, mcp_burst),
+            "model": (model_rate, model_burst),
+        }
+        self._max_concurrency = max_concurrency
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Any) -> "RateLimiterRegistry":
+        """Build a registry from the rate-limit settings of a Config."""
+        return cls(
+            mcp_rate=config.mcp_rate_limit_rps,
+            mcp_burst=config.mcp_rate_limit_burst,
+            model_rate=config.model_rate_limit_rps,
+            model_burst=config.model_rate_limit_burst,
+            max_concurrency=config.rate_limit_max_concurrency,
+        )
+
+    def for_tenant(self, tenant_id: str) -> RateLimiter:
+        """Limiter shared by all MCP tool calls against a tenant."""
+        return self._get("mcp", tenant_id)
+
+    def for_provider(self, provider: str) -> RateLimiter:
+        """Limiter shared by all model calls to a provider."""
+        return self._get("model", provider)
+
+    def _get(self, kind: str, key: str) -> RateLimiter:
+        name = f"{kind}:{key}"
+        with self._lock:
+            if name not in self._limiters:
+                rate, burst = self._limits[kind]
+                self._limiters[name] = RateLimiter(
+                    name, rate, burst, self._max_concurrency
+                )
+            return self._limiters[name]
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Metrics for every limiter created so far, keyed by limiter name."""
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return {limiter.name: limiter.metrics() for limiter in limiters}
+
+
+def _iter_error_chain(error: BaseException) -> Iterator[BaseException]:
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        yield current
+        current = current.__cause__ or current.__context__
+
+
+def _structured_errors(result: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Structured payloads of an MCP tool result: structuredContent and JSON content blocks."""
+    payloads = [result.get("structuredContent")]
+    payloads += [
+        item.get("json")
+        for item in result.get("content") or []
+        if isinstance(item, dict)
+    ]
+    for payload in payloads:
+        if isinstance(payload, dict):
+            yield payload
+            if isinstance(payload.get("error"), dict):
+                yield payload["error"]
+
+
+def is_rate_limited(outcome: Any) -> bool:
+    """Check whether an exception or MCP tool result signals a rate limit.
+
+    Only structured signals count: an HTTP 429 status on the exception chain,
+    or a 429 status or rate-limit error code in the structured payload of a
+    failed MCP result. Free text is ignored, so a tool error that merely
+    mentions "429" or "rate limit" is not mistaken for throttling.
+
+    Args:
+        outcome: Exception raised by a call, or the MCP tool result dict
+
+    Returns:
+        True if the outcome is an HTTP 429 / throttling response
+    """
+    if isinstance(outcome, BaseException):
+        for error in _iter_error_chain(outcome):
+            status = getattr(error, "status_code", None)
+            response = getattr(error, "response", None)
+            if status is None and response is not None:
+                status = getattr(response, "status_code", None)
+            if status == 429 or type(error).__name__ == "ModelThrottledException":
+                return True
+        return False
+
+    if isinstance(outcome, dict) and outcome.get("status") == "error":
+        for payload in _structured_errors(outcome):
+            if any(str(payload.get(field)) == "429" for field in _STATUS_FIELDS):
+                return True
+            if any(
+                str(payload.get(field)).lower() in _RATE_LIMIT_CODES
+                for field in _CODE_FIELDS
+            ):
+                return True
+    return False
+
+
+def retry_after_seconds(outcome: Any) -> Optional[float]:
+    """Extract the Retry-After delay from an HTTP error or MCP tool result, if present.
+
+    Args:
+        outcome: Exception raised by an HTTP-backed SDK call, or the MCP tool result dict
+
+    Returns:
+        Delay in seconds, or None if the server did not send one
+    """
+    if isinstance(outcome, dict):
+        for payload in _structured_errors(outcome):
+            for field in _RETRY_AFTER_FIELDS:
+                if payload.get(field) is not None:
+                    return _parse_retry_after(payload[field])
+        return None
+    for current in _iter_error_chain(outcome):
+        response = getattr(current, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            continue
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        if value is None:
+            continue
+        return _parse_retry_after(value)
+    return None
+
+
+def _parse_retry_after(value: Any) -> Optional[float]:
+    """Seconds from a Retry-After value: delta seconds or an HTTP date."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
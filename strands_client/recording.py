@@ -0,0 +1,419 @@
+"""
+Record and replay of MCP and model traffic for offline performance testing.
+
+Recording captures every MCP JSON-RPC request/response pair at the transport
+level and every model call as its stream of events, each with timings, into a
+compact JSON Lines file (gzip-compressed when the path ends in ``.gz``).
+
+Replay serves the recorded traffic back through a local MCP transport and a
+replay model, sleeping for the original latencies multiplied by a scale factor
+(``0`` replays as fast as possible), so benchmarks and regression tests run on
+real traffic shapes without Reltio or LLM access.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import (
+    IO,
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+
+import anyio
+from mcp.shared.message import SessionMessage
+from mcp.types import JSONRPCError, JSONRPCMessage, JSONRPCRequest, JSONRPCResponse
+from strands.models.model import Model
+
+from config import ConfigurationError, ReplayError
+from .models import DelegatingModel
+
+logger = logging.getLogger(__name__)
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return cast(IO[str], gzip.open(path, mode + "t", encoding="utf-8"))
+    return open(path, mode, encoding="utf-8")
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def messages_digest(messages: Any, system_prompt: Optional[str] = None) -> str:
+    """Stable digest of a model request used to match replayed calls."""
+    return hashlib.sha1(
+        _canonical([system_prompt, messages]).encode("utf-8")
+    ).hexdigest()
+
+
+def _mcp_keys(method: str, params: Optional[Dict[str, Any]]) -> List[Tuple[str, ...]]:
+    """Match keys from most to least specific for an MCP request."""
+    params = {k: v for k, v in (params or {}).items() if k != "_meta"}
+    keys: List[Tuple[str, ...]] = [(method, _canonical(params))]
+    if method == "tools/call":
+        keys.append((method, str(params.get("name"))))
+    else:
+        keys.append((method,))
+    return keys
+
+
+class TrafficRecorder:
+    """Appends MCP and model traffic entries to a recording file."""
+
+    def __init__(self, path: str):
+        """Open the recording file for writing.
+
+        Args:
+            path: Output path (``.jsonl`` or ``.jsonl.gz``)
+        """
+        self.path = path
+        self._file = _open(path, "w")
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        logger.info(f"Recording MCP and model traffic to {path}")
+
+    def offset(self) -> float:
+        """Seconds since the recording started."""
+        return time.monotonic() - self._started
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        """Append one entry to the recording."""
+        line = json.dumps(entry, separators=(",", ":"), default=str)
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + "\n")
+                self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the recording file."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class TrafficRecording:
+    """Recorded traffic loaded for replay."""
+
+    def __init__(self, entries: List[Dict[str, Any]], latency_scale: float = 1.0):
+        """Index recorded entries.
+
+        Args:
+            entries: Entries produced by TrafficRecorder
+            latency_scale: Multiplier applied to recorded latencies (0 disables delays)
+        """
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._mcp: Dict[Tuple[str, ...], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._mcp_last: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        self._model_by_digest: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._model_sequence: Deque[Dict[str, Any]] = deque()
+
+        for entry in entries:
+            if entry.get("kind") == "mcp":
+                for key in _mcp_keys(entry["method"], entry.get("params")):
+                    self._mcp[key].append(entry)
+            elif entry.get("kind") == "model":
+                self._model_by_digest[entry.get("digest", "")].append(entry)
+                self._model_sequence.append(entry)
+
+    @classmethod
+    def load(cls, path: str, latency_scale: float = 1.0) -> "TrafficRecording":
+        """Load a recording file.
+
+        Raises:
+            ConfigurationError: If the file cannot be read
+        """
+        try:
+            with _open(path, "r") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError) as e:
+            raise ConfigurationError(f"Cannot load recording {path}: {e}") from e
+        logger.info(f"Loaded {len(entries)} recorded calls from {path}")
+        return cls(entries, latency_scale)
+
+    def delay(self, seconds: float) -> float:
+        """Scaled replay delay for a recorded latency."""
+        return max(0.0, seconds * self.latency_scale)
+
+    def next_mcp(self, method: str, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Take the recorded response for an MCP request.
+
+        Exact matches are served first, then calls to the same tool (or, for
+        methods other than ``tools/call``, any call of the same method). When
+        all matches are used up the last one is served again.
+
+        Raises:
+            ReplayError: If nothing was recorded for the request
+        """
+        with self._lock:
+            for key in _mcp_keys(method, params):
+                queue = self._mcp.get(key)
+                while queue:
+                    entry = queue.popleft()
+                    if entry.get("_served"):
+                        continue
+                    entry["_served"] = True
+                    for served_key in _mcp_keys(entry["method"], entry.get("params")):
+                        self._mcp_last[served_key] = entry
+                    return entry
+            for key in _mcp_keys(method, params):
+                if key in self._mcp_last:
+                    return self._mcp_last[key]
+        raise ReplayError(f"No recorded MCP response for {method}")
+
+    def model_call(
+        self, messages: Any, system_prompt: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Take the recorded model call answering a request.
+
+        Raises:
+            ReplayError: If all recorded model calls have been served
+        """
+        return self.next_model(messages_digest(messages, system_prompt))
+
+    def next_model(self, digest: str) -> Dict[str, Any]:
+        """Take the recorded model call for a request digest, or the next one in order.
+
+        Raises:
+            ReplayError: If all recorded model calls have been served
+        """
+        with self._lock:
+            candidates = self._model_by_digest.get(digest)
+            while candidates:
+                entry = candidates.popleft()
+                if not entry.get("_served"):
+                    entry["_served"] = True
+                    return entry
+            while self._model_sequence:
+                entry = self._model_sequence.popleft()
+                if not entry.get("_served"):
+                    entry["_served"] = True
+                    return entry
+        raise ReplayError("No recorded model call left to replay")
+
+
+def _dump(message: JSONRPCMessage) -> Dict[str, Any]:
+    return cast(
+        Dict[str, Any],
+        message.model_dump(by_alias=True, mode="json", exclude_none=True),
+    )
+
+
+@asynccontextmanager
+async def recording_transport(
+    transport: Any, recorder: TrafficRecorder
+) -> AsyncIterator[Tuple[Any, ...]]:
+    """Wrap an MCP transport so every request/response pair is recorded.
+
+    Args:
+        transport: Async context manager returned by ``streamablehttp_client``
+        recorder: Recorder receiving the entries
+    """
+    async with transport as streams:
+        read_stream, write_stream = streams[0], streams[1]
+        to_client_send, to_client_recv = anyio.create_memory_object_stream[
+            Union[SessionMessage, Exception]
+        ](100)
+        to_server_send, to_server_recv = anyio.create_memory_object_stream[
+            SessionMessage
+        ](100)
+        pending: Dict[Any, Dict[str, Any]] = {}
+
+        async def forward_requests() -> None:
+            async for session_message in to_server_recv:
+                root = session_message.message.root
+                if isinstance(root, JSONRPCRequest):
+                    pending[root.id] = {
+                        "method": root.method,
+                        "params": root.params,
+                        "t": recorder.offset(),
+                        "started": time.monotonic(),
+                    }
+                await write_stream.send(session_message)
+
+        async def forward_responses() -> None:
+            async for item in read_stream:
+                if isinstance(item, SessionMessage):
+                    root = item.message.root
+                    request = pending.pop(getattr(root, "id", None), None)
+                    if request and isinstance(root, (JSONRPCResponse, JSONRPCError)):
+                        recorder.write(
+                            {
+                                "kind": "mcp",
+                                "t": round(request["t"], 4),
+                                "latency": round(
+                                    time.monotonic() - request["started"], 4
+                                ),
+                                "method": request["method"],
+                                "params": request["params"],
+                                "response": _dump(item.message),
+                            }
+                        )
+                await to_client_send.send(item)
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(forward_requests)
+            tg.start_soon(forward_responses)
+            try:
+                yield (to_client_recv, to_server_send, *streams[2:])
+            finally:
+                tg.cancel_scope.cancel()
+
+
+@asynccontextmanager
+async def replay_transport(
+    recording: TrafficRecording,
+) -> AsyncIterator[Tuple[Any, ...]]:
+    """Local MCP transport answering requests from a recording.
+
+    Args:
+        recording: Loaded traffic recording
+    """
+    to_client_send, to_client_recv = anyio.create_memory_object_stream[
+        Union[SessionMessage, Exception]
+    ](100)
+    to_server_send, to_server_recv = anyio.create_memory_object_stream[SessionMessage](
+        100
+    )
+
+    async def respond(request: JSONRPCRequest) -> None:
+        try:
+            entry = recording.next_mcp(request.method, request.params)
+            await anyio.sleep(recording.delay(entry.get("latency", 0.0)))
+            payload = dict(entry["response"], id=request.id)
+        except ReplayError as e:
+            payload = {
+                "jsonrpc": "2.0",
+                "id": request.id,
+                "error": {"code": -32601, "message": str(e)},
+            }
+        await to_client_send.send(
+            SessionMessage(JSONRPCMessage.model_validate(payload))
+        )
+
+    async def serve() -> None:
+        async with anyio.create_task_group() as requests_tg:
+            async for session_message in to_server_recv:
+                root = session_message.message.root
+                if isinstance(root, JSONRPCRequest):
+                    requests_tg.start_soon(respond, root)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(serve)
+        try:
+            yield (to_client_recv, to_server_send, lambda: None)
+        finally:
+            tg.cancel_scope.cancel()
+
+
+class RecordingModel(DelegatingModel):
+    """Model that records each call's request digest, events and timings."""
+
+    def __init__(self, model: Model, recorder: TrafficRecorder):
+        """Initialize the wrapper.
+
+        Args:
+            model: Strands model to delegate to
+            recorder: Recorder receiving the entries
+        """
+        super().__init__(model)
+        self.recorder = recorder
+
+    async def stream(
+        self,
+        messages: Any,
+        tool_specs: Any = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[Any, None]:
+        """Stream from the wrapped model, recording every event with its offset."""
+        offset = self.recorder.offset()
+        started = time.monotonic()
+        events: List[Tuple[float, Any]] = []
+        error = None
+        try:
+            async for event in self._model.stream(
+                messages, tool_specs, system_prompt, **kwargs
+            ):
+                events.append((round(time.monotonic() - started, 4), event))
+                yield event
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self.recorder.write(
+                {
+                    "kind": "model",
+                    "t": round(offset, 4),
+                    "latency": round(time.monotonic() - started, 4),
+                    "digest": messages_digest(messages, system_prompt),
+                    "tools": [spec.get("name") for spec in tool_specs or []],
+                    "events": events,
+                    "error": error,
+                }
+            )
+
+
+class ReplayModel(Model):
+    """Model serving recorded model calls with original or scaled timings."""
+
+    def __init__(self, recording: TrafficRecording, model_id: str = "replay"):
+        """Initialize the replay model.
+
+        Args:
+            recording: Loaded traffic recording
+            model_id: Model ID reported by ``get_config``
+        """
+        self.recording = recording
+        self.config: Dict[str, Any] = {"model_id": model_id}
+
+    def update_config(self, **model_config: Any) -> None:
+        """Update the replay model configuration."""
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        """Return the replay model configuration."""
+        return self.config
+
+    def structured_output(
+        self,
+        output_model: Any,
+        prompt: Any,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Structured output is not recorded."""
+        raise ReplayError("Structured output is not supported in replay mode")
+
+    async def stream(
+        self,
+        messages: Any,
+        tool_specs: Any = None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[Any, None]:
+        """Yield the recorded events of the matching model call."""
+        entry = self.recording.model_call(messages, system_prompt)
+        elapsed = 0.0
+        for event_offset, event in entry["events"]:
+            await asyncio.sleep(self.recording.delay(event_offset - elapsed))
+            elapsed = event_offset
+            yield event
+        if entry.get("error"):
+            raise ReplayError(f"Recorded model error: {entry['error']}")
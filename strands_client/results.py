@@ -0,0 +1,439 @@
+"""
+Large tool-result handling for the Reltio MCP Strands Client.
+
+Search exports and relationship graphs can be megabytes of JSON text. Handed
+to the agent as is, such a result is kept in the conversation history and
+resent to the model on every request. ``LargeResultHandler`` replaces
+oversize results with a compact summary and a handle: the payload is spilled
+to a temp-file ``ResultStore`` and the model reads it page by page with the
+``read_result`` tool.
+
+Top-level JSON arrays are decoded one item at a time (never materialized as a
+whole) and spilled as JSON lines, so pages are read from disk without loading
+the full payload again. Other payloads are paged by characters.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from strands.types.tools import ToolSpec, ToolUse
+
+from .tools import ClientTool
+
+logger = logging.getLogger(__name__)
+
+READ_RESULT_TOOL_NAME = "read_result"
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(text: str) -> Iterator[Any]:
+    """Decode the items of a top-level JSON array one at a time.
+
+    Raises:
+        ValueError: If the text is not a JSON array
+    """
+    index = len(text) - len(text.lstrip(_WHITESPACE))
+    if text[index : index + 1] != "[":
+        raise ValueError("Not a JSON array")
+    index += 1
+    while True:
+        while index < len(text) and text[index] in _WHITESPACE:
+            index += 1
+        if text[index : index + 1] == "]":
+            return
+        item, index = _decoder.raw_decode(text, index)
+        yield item
+        while index < len(text) and text[index] in _WHITESPACE:
+            index += 1
+        if text[index : index + 1] == ",":
+            index += 1
+        elif text[index : index + 1] != "]":
+            raise ValueError(f"Expected ',' or ']' at position {index}")
+
+
+def iter_json_object(text: str) -> Iterator[Tuple[str, Any]]:
+    """Decode the members of a top-level JSON object one at a time.
+
+    Raises:
+        ValueError: If the text is not a JSON object
+    """
+
+    def skip(index: int) -> int:
+        while index < len(text) and text[index] in _WHITESPACE:
+            index += 1
+        return index
+
+    index = skip(0)
+    if text[index : index + 1] != "{":
+        raise ValueError("Not a JSON object")
+    index = skip(index + 1)
+    while text[index : index + 1] != "}":
+        key, index = _decoder.raw_decode(text, index)
+        index = skip(index)
+        if text[index : index + 1] != ":":
+            raise ValueError(f"Expected ':' at position {index}")
+        value, index = _decoder.raw_decode(text, skip(index + 1))
+        yield key, value
+        index = skip(index)
+        if text[index : index + 1] == ",":
+            index = skip(index + 1)
+        elif text[index : index + 1] != "}":
+            raise ValueError(f"Expected ',' or '}}' at position {index}")
+
+
+def _preview(value: Any, max_chars: int) -> Any:
+    text = json.dumps(value, separators=(",", ":"), default=str)
+    if len(text) <= max_chars:
+        return value
+    return text[:max_chars] + "..."
+
+
+def _describe(value: Any) -> str:
+    if isinstance(value, list):
+        return f"array[{len(value)}]"
+    if isinstance(value, dict):
+        return f"object[{len(value)} keys]"
+    return type(value).__name__
+
+
+class ResultStore:
+    """Temp-file store of spilled tool results, bounded in total size."""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = 500_000_000):
+        """Initialize the store.
+
+        Args:
+            directory: Storage directory (a new temp directory when omitted)
+            max_bytes: Total size above which the oldest results are deleted
+        """
+        self._owns_directory = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix="reltio-results-")
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._size = 0
+
+    def _path(self, handle: str) -> str:
+        return os.path.join(self.directory, f"{handle}.txt")
+
+    def spill(self, text: str) -> Tuple[str, Dict[str, Any]]:
+        """Write a payload to disk.
+
+        Args:
+            text: Result text
+
+        Returns:
+            Tuple of the handle and the payload description
+        """
+        handle = f"res-{uuid.uuid4().hex[:12]}"
+        path = self._path(handle)
+        try:
+            info = self._spill_array(text, path)
+        except ValueError:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            info = {"format": "text", "size_chars": len(text)}
+        size = os.path.getsize(path)
+        with self._lock:
+            self._entries[handle] = info
+            self._size += size
+            info["bytes"] = size
+            self._evict()
+        return handle, info
+
+    @staticmethod
+    def _spill_array(text: str, path: str) -> Dict[str, Any]:
+        count = 0
+        preview: List[Any] = []
+        with open(path, "w", encoding="utf-8") as f:
+            try:
+                for item in iter_json_array(text):
+                    f.write(json.dumps(item, separators=(",", ":"), default=str) + "\n")
+                    if count < 3:
+                        preview.append(item)
+                    count += 1
+            except ValueError:
+                f.close()
+                os.remove(path)
+                raise
+        return {
+            "format": "array",
+            "items": count,
+            "preview": preview,
+            "size_chars": len(text),
+        }
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            handle, info = self._entries.popitem(last=False)
+            self._size -= info["bytes"]
+            try:
+                os.remove(self._path(handle))
+            except FileNotFoundError:
+                pass
+            logger.info(f"Evicted spilled result {handle}")
+
+    def info(self, handle: str) -> Optional[Dict[str, Any]]:
+        """Description of a stored result, or None if unknown or evicted."""
+        with self._lock:
+            return self._entries.get(handle)
+
+    def read_page(
+        self,
+        handle: str,
+        page: int,
+        page_items: int,
+        page_chars: int,
+        first_item: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Read one page of a stored result.
+
+        Arrays are paged by items, other payloads by characters. No page is
+        longer than ``page_chars``: an array page ends early at the item that
+        would not fit, reported as ``next_item``, and a single item that is
+        too long on its own is cut.
+
+        Args:
+            handle: Result handle
+            page: Page number, starting at 0
+            page_items: Items per array page
+            page_chars: Maximum characters per page
+            first_item: Array item to start from instead of the start of ``page`` (optional)
+
+        Raises:
+            KeyError: If the handle is unknown or was evicted
+            ValueError: If the page number or first item is negative
+        """
+        if page < 0 or (first_item is not None and first_item < 0):
+            raise ValueError(f"Invalid page {page}")
+        info = self.info(handle)
+        if info is None:
+            raise KeyError(handle)
+        with open(self._path(handle), "r", encoding="utf-8") as f:
+            if info["format"] == "array":
+                start = page * page_items if first_item is None else first_item
+                items: List[Any] = []
+                size = 0
+                next_item = None
+                for index, line in enumerate(
+                    islice(f, start, start + page_items), start=start
+                ):
+                    line = line.rstrip("\n")
+                    if items and size + len(line) > page_chars:
+                        next_item = index
+                        break
+                    items.append(
+                        _preview(json.loads(line), page_chars)
+                        if len(line) > page_chars
+                        else json.loads(line)
+                    )
+                    size += len(line)
+                total = info["items"]
+                pages = max(1, -(-total // page_items))
+                result = {
+                    "handle": handle,
+                    "page": page,
+                    "pages": pages,
+                    "first_item": start,
+                    "items": items,
+                }
+                if next_item is not None:
+                    result["next_item"] = next_item
+                return result
+            # Read in chunks to reach the page without loading the whole payload
+            skipped = 0
+            while skipped < page * page_chars:
+                chunk = f.read(min(page_chars, page * page_chars - skipped))
+                if not chunk:
+                    break
+                skipped += len(chunk)
+            pages = max(1, -(-info["size_chars"] // page_chars))
+            return {
+                "handle": handle,
+                "page": page,
+                "pages": pages,
+                "text": f.read(page_chars),
+            }
+
+    def close(self) -> None:
+        """Delete all stored results."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        if self._owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+        else:
+            for name in os.listdir(self.directory):
+                if name.startswith("res-"):
+                    os.remove(os.path.join(self.directory, name))
+
+
+class LargeResultHandler:
+    """Replaces oversize tool results by a summary and a result handle."""
+
+    def __init__(
+        self,
+        store: ResultStore,
+        threshold_chars: int,
+        page_items: int = 50,
+        page_chars: int = 20000,
+    ):
+        """Initialize the handler.
+
+        Args:
+            store: Store receiving the spilled payloads
+            threshold_chars: Results with a larger text item are spilled
+            page_items: Items per page for JSON arrays
+            page_chars: Characters per page, at most ``threshold_chars`` so a page is never oversize itself
+        """
+        self.store = store
+        self.threshold_chars = threshold_chars
+        self.page_items = page_items
+        self.page_chars = (
+            min(page_chars, threshold_chars) if threshold_chars > 0 else page_chars
+        )
+        self._lock = threading.Lock()
+        self._tool: Optional[ClientTool] = None
+        self.spilled = 0
+        self.spilled_chars = 0
+
+    def process(self, tool_name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the result with oversize text items replaced by summaries."""
+        content = result.get("content") or []
+        if not any(
+            isinstance(item, dict)
+            and len(item.get("text") or "") > self.threshold_chars
+            for item in content
+        ):
+            return result
+
+        replaced = []
+        for item in content:
+            text = item.get("text") if isinstance(item, dict) else None
+            if text is None or len(text) <= self.threshold_chars:
+                replaced.append(item)
+                continue
+            handle, info = self.store.spill(text)
+            replaced.append(
+                {
+                    "text": json.dumps(
+                        self._summary(tool_name, handle, text, info), default=str
+                    )
+                }
+            )
+            with self._lock:
+                self.spilled += 1
+                self.spilled_chars += len(text)
+            logger.info(f"Spilled {len(text)} chars from {tool_name} to {handle}")
+        return dict(result, content=replaced)
+
+    def _summary(
+        self, tool_name: str, handle: str, text: str, info: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {
+            "result_handle": handle,
+            "tool": tool_name,
+            "size_chars": info["size_chars"],
+        }
+        if info["format"] == "array":
+            summary["items"] = info["items"]
+            summary["pages"] = max(1, -(-info["items"] // self.page_items))
+            summary["preview"] = [_preview(item, 500) for item in info["preview"]]
+        else:
+            summary["pages"] = max(1, -(-info["size_chars"] // self.page_chars))
+            summary["structure"] = self._structure(text)
+            summary["preview"] = text[:1000]
+        summary["note"] = (
+            f"Result too large to return at once. Call {READ_RESULT_TOOL_NAME} with result_handle and page to read it."
+        )
+        return summary
+
+    @staticmethod
+    def _structure(text: str) -> Optional[Dict[str, str]]:
+        """Top-level keys of a JSON object with the shape of their values."""
+        try:
+            return {
+                key: _describe(value)
+                for key, value in islice(iter_json_object(text), 50)
+            }
+        except ValueError:
+            return None
+
+    def metrics(self) -> Dict[str, int]:
+        """Number and total size of spilled results."""
+        with self._lock:
+            return {"spilled": self.spilled, "spilled_chars": self.spilled_chars}
+
+    def create_tool(self) -> ClientTool:
+        """Create the ``read_result`` paging tool (one instance shared by all agents)."""
+        if self._tool is not None:
+            return self._tool
+
+        def run(tool_use: ToolUse) -> Dict[str, Any]:
+            params = tool_use.get("input") or {}
+            handle = str(params.get("result_handle", ""))
+            first_item = params.get("first_item")
+            try:
+                page = self.store.read_page(
+                    handle,
+                    int(params.get("page", 0)),
+                    self.page_items,
+                    self.page_chars,
+                    first_item=int(first_item) if first_item is not None else None,
+                )
+            except (KeyError, ValueError, OSError):
+                return {
+                    "toolUseId": tool_use["toolUseId"],
+                    "status": "error",
+                    "content": [
+                        {"text": f"Unknown or expired result handle: {handle}"}
+                    ],
+                }
+            return {
+                "toolUseId": tool_use["toolUseId"],
+                "status": "success",
+                "content": [
+                    {"text": json.dumps(page, separators=(",", ":"), default=str)}
+                ],
+            }
+
+        tool_spec: ToolSpec = {
+            "name": READ_RESULT_TOOL_NAME,
+            "description": (
+                "Read one page of a large tool result that was returned as a summary with a result_handle. "
+                "Pages are numbered from 0. A page that ends early gives next_item to continue from."
+            ),
+            "inputSchema": {
+                "json": {
+                    "type": "object",
+                    "properties": {
+                        "result_handle": {
+                            "type": "string",
+                            "description": "Handle from the result summary",
+                        },
+                        "page": {
+                            "type": "integer",
+                            "description": "Page number, starting at 0",
+                        },
+                        "first_item": {
+                            "type": "integer",
+                            "description": "Array item to start from, from next_item",
+                        },
+                    },
+                    "required": ["result_handle"],
+                }
+            },
+        }
+        self._tool = ClientTool(READ_RESULT_TOOL_NAME, tool_spec, run)
+        return self._tool
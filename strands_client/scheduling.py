@@ -0,0 +1,298 @@
+"""
+Priority and fair scheduling of agent turns for the Reltio MCP Strands Client.
+
+Without a scheduler every thread calling ``process_prompt`` runs its turn at
+once, so a bulk job sharing a deployment with interactive chats takes all the
+model and MCP capacity. ``FairScheduler`` admits turns into a bounded number
+of slots:
+
+- priority classes are served in order (``interactive`` before ``batch``),
+  each with its own concurrency limit so batch work never holds every slot;
+- within a class, tenants share slots by start-time fair queuing, in
+  proportion to their weights, so one tenant's backlog cannot starve another.
+
+Queue time, admissions and cancellations are tracked per class. The scheduler
+is process-wide: all clients of a process share it.
+"""
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from config import ConfigurationError
+from .cancellation import CancellationToken
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+# Served in this order
+PRIORITY_CLASSES = (INTERACTIVE, BATCH)
+
+# Queue waits kept per class for percentiles
+_WAIT_SAMPLES = 1000
+
+
+def parse_tenant_weights(value: str) -> Dict[str, float]:
+    """Parse ``tenant:weight`` pairs separated by commas.
+
+    Raises:
+        ConfigurationError: If a pair is malformed or a weight is not positive
+    """
+    weights: Dict[str, float] = {}
+    for pair in value.split(","):
+        if not pair.strip():
+            continue
+        tenant, _, weight = pair.rpartition(":")
+        try:
+            weights[tenant.strip()] = float(weight)
+        except ValueError as e:
+            raise ConfigurationError(
+                f"Invalid tenant weight '{pair.strip()}', expected tenant:weight"
+            ) from e
+        if not tenant.strip() or weights[tenant.strip()] <= 0:
+            raise ConfigurationError(
+                f"Invalid tenant weight '{pair.strip()}', expected tenant:weight"
+            )
+    return weights
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class _Ticket:
+    """A turn waiting for or holding a slot."""
+
+    __slots__ = ("priority", "tenant", "start_tag", "enqueued", "granted", "abandoned")
+
+    def __init__(self, priority: str, tenant: str, start_tag: float):
+        self.priority = priority
+        self.tenant = tenant
+        self.start_tag = start_tag
+        self.enqueued = time.monotonic()
+        self.granted = False
+        self.abandoned = False
+
+
+class FairScheduler:
+    """Admits agent turns by priority class, fairly across tenants."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        class_limits: Optional[Dict[str, int]] = None,
+        tenant_weights: Optional[Dict[str, float]] = None,
+        poll_interval: float = 0.05,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrency: Turns running at once across all classes
+            class_limits: Turns running at once per priority class (defaults to max_concurrency)
+            tenant_weights: Relative share of each tenant within a class (default weight 1)
+            poll_interval: Seconds between cancellation checks of waiting turns
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.class_limits = {
+            priority: max(
+                1,
+                min(
+                    self.max_concurrency,
+                    (class_limits or {}).get(priority, self.max_concurrency),
+                ),
+            )
+            for priority in PRIORITY_CLASSES
+        }
+        self.tenant_weights = dict(tenant_weights or {})
+        self.poll_interval = poll_interval
+        self._condition = threading.Condition()
+        self._sequence = itertools.count()
+        self._queues: Dict[str, List[Tuple[float, int, _Ticket]]] = {
+            priority: [] for priority in PRIORITY_CLASSES
+        }
+        self._running: Dict[str, int] = {priority: 0 for priority in PRIORITY_CLASSES}
+        # Start-time fair queuing state per class: virtual time and each tenant's last finish tag
+        self._virtual_time: Dict[str, float] = {
+            priority: 0.0 for priority in PRIORITY_CLASSES
+        }
+        self._finish_tags: Dict[Tuple[str, str], float] = {}
+        self._stats: Dict[str, Dict[str, int]] = {
+            priority: {"admitted": 0, "cancelled": 0} for priority in PRIORITY_CLASSES
+        }
+        self._waits: Dict[str, Deque[float]] = {
+            priority: deque(maxlen=_WAIT_SAMPLES) for priority in PRIORITY_CLASSES
+        }
+        self._tenant_admitted: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config: Any) -> "FairScheduler":
+        """Build a scheduler from the scheduler settings of a Config."""
+        return cls(
+            max_concurrency=config.scheduler_max_concurrency,
+            class_limits={
+                INTERACTIVE: config.scheduler_interactive_max_concurrency,
+                BATCH: config.scheduler_batch_max_concurrency,
+            },
+            tenant_weights=parse_tenant_weights(config.scheduler_tenant_weights),
+        )
+
+    def acquire(
+        self,
+        priority: str = INTERACTIVE,
+        tenant: str = "",
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> Optional[_Ticket]:
+        """Wait for a slot.
+
+        Args:
+            priority: Priority class of the turn
+            tenant: Tenant the turn runs for
+            cancel_token: Token whose cancellation (or deadline) abandons the wait
+
+        Returns:
+            Ticket to pass to ``release``, or None if the token was cancelled while waiting
+
+        Raises:
+            ValueError: If the priority class is unknown
+        """
+        if priority not in self._queues:
+            raise ValueError(
+                f"Unknown priority class '{priority}'. Use one of: {', '.join(PRIORITY_CLASSES)}"
+            )
+        weight = self.tenant_weights.get(tenant, 1.0)
+        with self._condition:
+            start_tag = max(
+                self._virtual_time[priority],
+                self._finish_tags.get((priority, tenant), 0.0),
+            )
+            self._finish_tags[(priority, tenant)] = start_tag + 1 / weight
+            ticket = _Ticket(priority, tenant, start_tag)
+            heapq.heappush(
+                self._queues[priority], (start_tag, next(self._sequence), ticket)
+            )
+            self._dispatch()
+            while not ticket.granted:
+                if cancel_token and cancel_token.cancelled:
+                    ticket.abandoned = True
+                    self._refund(ticket, 1 / weight)
+                    self._stats[priority]["cancelled"] += 1
+                    return None
+                self._condition.wait(self.poll_interval if cancel_token else None)
+        return ticket
+
+    def _refund(self, abandoned: _Ticket, share: float) -> None:
+        """Take back the share reserved by a ticket that never ran; called with the condition held.
+
+        The tenant's finish tag and its tickets queued after the abandoned one
+        move back by that share, so the tenant is only charged for turns it runs.
+        """
+        key = (abandoned.priority, abandoned.tenant)
+        self._finish_tags[key] -= share
+        queue = self._queues[abandoned.priority]
+        moved = False
+        for index, (start_tag, sequence, ticket) in enumerate(queue):
+            if (
+                ticket.tenant == abandoned.tenant
+                and not ticket.abandoned
+                and start_tag > abandoned.start_tag
+            ):
+                ticket.start_tag = start_tag - share
+                queue[index] = (ticket.start_tag, sequence, ticket)
+                moved = True
+        if moved:
+            heapq.heapify(queue)
+
+    def _dispatch(self) -> None:
+        """Grant free slots to queued turns; called with the condition held."""
+        granted = False
+        while sum(self._running.values()) < self.max_concurrency:
+            ticket = self._next_ticket()
+            if ticket is None:
+                break
+            ticket.granted = True
+            granted = True
+            self._running[ticket.priority] += 1
+            self._virtual_time[ticket.priority] = ticket.start_tag
+            self._stats[ticket.priority]["admitted"] += 1
+            self._tenant_admitted[ticket.tenant] = (
+                self._tenant_admitted.get(ticket.tenant, 0) + 1
+            )
+            self._waits[ticket.priority].append(time.monotonic() - ticket.enqueued)
+        if granted:
+            self._condition.notify_all()
+
+    def _next_ticket(self) -> Optional[_Ticket]:
+        for priority in PRIORITY_CLASSES:
+            queue = self._queues[priority]
+            if self._running[priority] >= self.class_limits[priority]:
+                continue
+            while queue and queue[0][2].abandoned:
+                heapq.heappop(queue)
+            if queue:
+                return heapq.heappop(queue)[2]
+        return None
+
+    def release(self, ticket: _Ticket) -> None:
+        """Free the slot of a finished turn."""
+        with self._condition:
+            self._running[ticket.priority] -= 1
+            self._dispatch()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue lengths, running turns, admissions and queue waits per class."""
+        with self._condition:
+            classes = {}
+            for priority in PRIORITY_CLASSES:
+                waits = list(self._waits[priority])
+                classes[priority] = {
+                    "queued": sum(
+                        1
+                        for _, _, ticket in self._queues[priority]
+                        if not ticket.abandoned
+                    ),
+                    "running": self._running[priority],
+                    "limit": self.class_limits[priority],
+                    **self._stats[priority],
+                    "queue_wait_p50_seconds": round(_percentile(waits, 50), 4),
+                    "queue_wait_p95_seconds": round(_percentile(waits, 95), 4),
+                    "queue_wait_max_seconds": round(max(waits), 4) if waits else 0.0,
+                }
+            return {
+                "max_concurrency": self.max_concurrency,
+                "classes": classes,
+                "admitted_by_tenant": dict(self._tenant_admitted),
+            }
+
+
+_shared_scheduler: Optional[FairScheduler] = None
+_shared_lock = threading.Lock()
+
+
+def shared_scheduler(config: Any) -> FairScheduler:
+    """The process-wide scheduler, created from config on first use."""
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = FairScheduler.from_config(config)
+        return _shared_scheduler
+
+
+def _reset_shared_scheduler() -> None:
+    global _shared_scheduler, _shared_lock
+    _shared_scheduler = None
+    _shared_lock = threading.Lock()
+
+
+# Slots and queues belong to the process that created them
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_shared_scheduler)
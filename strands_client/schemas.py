@@ -0,0 +1,241 @@
+"""
+Tool-schema compaction for the Reltio MCP Strands Client.
+
+The specification of every tool given to an agent is sent with each model
+request, and MCP servers tend to ship verbose schemas: long descriptions,
+titles and examples on every property, the same nested object repeated for
+several arguments and enums with dozens of values. On models with small
+context windows this block takes a large share of the input budget and adds
+to the time to first token of every turn.
+
+``compact_tool_spec`` produces a smaller equivalent specification:
+
+- tool and property descriptions are cut to their first sentence;
+- titles, examples, comments and vendor ``x-`` keys are dropped;
+- object schemas repeated within a tool are moved to ``$defs`` and referenced;
+- long enums are replaced by a short description of their values (the server
+  still validates the argument).
+
+``tool_block_tokens`` and ``context_window`` measure the footprint of the tool
+block against the input budget of a model.
+"""
+
+import copy
+import json
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, Mapping
+
+OFF = "off"
+WARN = "warn"
+AUTO = "auto"
+ALWAYS = "always"
+COMPACTION_MODES = (OFF, WARN, AUTO, ALWAYS)
+
+# Context windows by model ID prefix; the longest matching prefix wins
+_CONTEXT_WINDOWS = {
+    "gpt-5": 400_000,
+    "gpt-4.1": 1_047_576,
+    "gpt-4o": 128_000,
+    "gpt-4-turbo": 128_000,
+    "gpt-4": 8_192,
+    "gpt-3.5-turbo": 16_385,
+    "o1": 200_000,
+    "o3": 200_000,
+    "o4": 200_000,
+    "claude": 200_000,
+}
+DEFAULT_CONTEXT_WINDOW = 128_000
+
+# Approximate characters per token of JSON tool specs by provider
+_CHARS_PER_TOKEN = {"openai": 4.0, "anthropic": 3.5}
+_DEFAULT_CHARS_PER_TOKEN = 4.0
+
+_DROPPED_KEYS = ("title", "examples", "example", "$comment")
+_SUBSCHEMA_LISTS = ("anyOf", "oneOf", "allOf", "prefixItems")
+# Keywords whose values map names (data, not schema keywords) to subschemas
+_SUBSCHEMA_MAPS = (
+    "properties",
+    "$defs",
+    "definitions",
+    "patternProperties",
+    "dependentSchemas",
+)
+# Repeated object schemas smaller than this are cheaper inline than as a reference
+_MIN_DEF_CHARS = 120
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def context_window(model_id: str, override: int = 0) -> int:
+    """Context window of a model in tokens.
+
+    Args:
+        model_id: Model ID, e.g. "gpt-4.1" or "claude-3-5-sonnet-20241022"
+        override: Context window to use instead of the built-in table (0 uses the table)
+    """
+    if override:
+        return override
+    model = (model_id or "").lower().split("/")[-1]
+    matches = [prefix for prefix in _CONTEXT_WINDOWS if model.startswith(prefix)]
+    return (
+        _CONTEXT_WINDOWS[max(matches, key=len)] if matches else DEFAULT_CONTEXT_WINDOW
+    )
+
+
+def tool_block_tokens(specs: Iterable[Mapping[str, Any]], provider: str = "") -> int:
+    """Approximate tokens taken by tool specifications in a request to a provider."""
+    chars = sum(
+        len(json.dumps(spec, separators=(",", ":"), default=str)) for spec in specs
+    )
+    return math.ceil(chars / _CHARS_PER_TOKEN.get(provider, _DEFAULT_CHARS_PER_TOKEN))
+
+
+def shorten_description(text: str, max_chars: int) -> str:
+    """First sentence of a description, cut at a word boundary to at most ``max_chars``."""
+    text = " ".join(str(text).split())
+    text = _SENTENCE_END.split(text, 1)[0]
+    if max_chars and len(text) > max_chars:
+        text = text[:max_chars].rsplit(" ", 1)[0].rstrip(",;:") + "…"
+    return text
+
+
+def compact_tool_spec(
+    spec: Dict[str, Any], description_chars: int = 160, max_enum: int = 10
+) -> Dict[str, Any]:
+    """Smaller equivalent of a Strands tool specification.
+
+    Args:
+        spec: Tool specification with ``name``, ``description`` and ``inputSchema``
+        description_chars: Maximum length of each description (0 keeps whole first sentences)
+        max_enum: Enums with more values are replaced by a description (0 keeps all enums)
+
+    Returns:
+        New specification; the input is not modified
+    """
+    compacted = dict(spec)
+    if spec.get("description"):
+        compacted["description"] = shorten_description(
+            spec["description"], description_chars
+        )
+    input_schema = spec.get("inputSchema")
+    if isinstance(input_schema, dict):
+        wrapped = "json" in input_schema
+        schema = input_schema["json"] if wrapped else input_schema
+        schema = compact_schema(schema, description_chars, max_enum)
+        compacted["inputSchema"] = {"json": schema} if wrapped else schema
+    return compacted
+
+
+def compact_schema(
+    schema: Any, description_chars: int = 160, max_enum: int = 10
+) -> Any:
+    """Strip, shorten and deduplicate a JSON schema; see the module docstring."""
+    schema = _strip(copy.deepcopy(schema), description_chars, max_enum)
+    if not isinstance(schema, dict):
+        return schema
+    return _deduplicate(schema)
+
+
+def _strip(node: Any, description_chars: int, max_enum: int) -> Any:
+    if isinstance(node, list):
+        return [_strip(item, description_chars, max_enum) for item in node]
+    if not isinstance(node, dict):
+        return node
+    result: Dict[str, Any] = {}
+    for key, value in node.items():
+        if key in _DROPPED_KEYS or key.startswith("x-"):
+            continue
+        if key in _SUBSCHEMA_MAPS and isinstance(value, dict):
+            # Property and definition names are data, not schema keywords
+            result[key] = {
+                name: _strip(sub, description_chars, max_enum)
+                for name, sub in value.items()
+            }
+        elif key == "description" and isinstance(value, str):
+            result[key] = shorten_description(value, description_chars)
+        else:
+            result[key] = _strip(value, description_chars, max_enum)
+    enum = result.get("enum")
+    if max_enum and isinstance(enum, list) and len(enum) > max_enum:
+        del result["enum"]
+        sample = ", ".join(str(value) for value in enum[:max_enum])
+        hint = f"One of {len(enum)} values, e.g. {sample}"
+        result["description"] = (
+            f"{result['description']} ({hint})" if result.get("description") else hint
+        )
+    return result
+
+
+def _subschemas(node: Dict[str, Any]) -> Iterable[Any]:
+    for value in (node.get("properties") or {}).values():
+        yield value
+    for key in ("items", "additionalProperties", "not"):
+        if isinstance(node.get(key), dict):
+            yield node[key]
+    for key in _SUBSCHEMA_LISTS:
+        for value in node.get(key) or []:
+            yield value
+
+
+def _canonical(node: Any) -> str:
+    return json.dumps(node, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _deduplicate(schema: Dict[str, Any]) -> Dict[str, Any]:
+    counts: Counter = Counter()
+
+    def count(node: Any) -> None:
+        if not isinstance(node, dict):
+            return
+        for child in _subschemas(node):
+            if isinstance(child, dict) and child.get("type") == "object":
+                text = _canonical(child)
+                if len(text) >= _MIN_DEF_CHARS:
+                    counts[text] += 1
+            count(child)
+
+    count(schema)
+    repeated = {text for text, seen in counts.items() if seen > 1}
+    if not repeated:
+        return schema
+
+    defs: Dict[str, Any] = dict(schema.get("$defs") or {})
+    names: Dict[str, str] = {}
+
+    def reference(child: Any, hint: str) -> Any:
+        if isinstance(child, dict):
+            text = _canonical(child)
+            if text in repeated:
+                if text not in names:
+                    name = _unique_name(hint, defs)
+                    names[text] = name
+                    defs[name] = child
+                return {"$ref": f"#/$defs/{names[text]}"}
+            replace(child)
+        return child
+
+    def replace(node: Dict[str, Any]) -> None:
+        if isinstance(node.get("properties"), dict):
+            node["properties"] = {
+                name: reference(value, name)
+                for name, value in node["properties"].items()
+            }
+        for key in ("items", "additionalProperties", "not"):
+            if isinstance(node.get(key), dict):
+                node[key] = reference(node[key], key)
+        for key in _SUBSCHEMA_LISTS:
+            if isinstance(node.get(key), list):
+                node[key] = [reference(value, key) for value in node[key]]
+
+    replace(schema)
+    schema["$defs"] = defs
+    return schema
+
+
+def _unique_name(hint: str, taken: Dict[str, Any]) -> str:
+    base = re.sub(r"[^A-Za-z0-9_]", "_", hint) or "def"
+    name, suffix = base, 2
+    while name in taken:
+        name, suffix = f"{base}_{suffix}", suffix + 1
+    return name
@@ -0,0 +1,405 @@
+"""
+Chat session persistence for the Reltio MCP Strands Client.
+
+Conversations otherwise live only in the in-memory ``Agent``. A session store
+keeps a compact copy of each conversation's message history so another worker
+can rehydrate the agent with ``StrandsReltioClient.resume_session`` without
+replaying any tool calls.
+
+Large tool results are stored by reference: they are replaced in the history
+by their content hash and kept once in a blob area, so repeated results are
+deduplicated and SQLite saves only write new blobs. Each session is bounded in
+size (oldest turns are dropped first) and idle sessions are evicted when the
+store is opened and then periodically as sessions are saved.
+"""
+
+import abc
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+_REF_KEY = "$ref"
+
+# Seconds between idle-session evictions run by saves
+DEFAULT_EVICT_INTERVAL = 600.0
+
+
+def _validate_session_id(session_id: str) -> str:
+    if not _SESSION_ID.match(session_id or ""):
+        raise ValueError(f"Invalid session ID: {session_id!r}")
+    return session_id
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(bytes(value)).decode("ascii")}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode(value: Dict[str, Any]) -> Any:
+    if len(value) == 1 and "__bytes__" in value:
+        return base64.b64decode(value["__bytes__"])
+    return value
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), default=_encode).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    return json.loads(data.decode("utf-8"), object_hook=_decode)
+
+
+def pack_messages(
+    messages: List[Dict[str, Any]], ref_threshold: int
+) -> Tuple[List[Dict[str, Any]], Dict[str, bytes]]:
+    """Replace large tool results with references.
+
+    Args:
+        messages: Strands message history
+        ref_threshold: Serialized size in bytes above which a tool result's content is stored by reference
+
+    Returns:
+        Tuple of the packed messages and the referenced blobs keyed by hash
+    """
+    packed = []
+    blobs: Dict[str, bytes] = {}
+    for message in messages:
+        content = []
+        for block in message.get("content", []):
+            result = block.get("toolResult") if isinstance(block, dict) else None
+            if result and result.get("content"):
+                data = _dumps(result["content"])
+                if len(data) > ref_threshold:
+                    digest = hashlib.sha256(data).hexdigest()
+                    blobs[digest] = data
+                    block = {"toolResult": dict(result, content={_REF_KEY: digest})}
+            content.append(block)
+        packed.append(dict(message, content=content))
+    return packed, blobs
+
+
+def unpack_messages(
+    messages: List[Dict[str, Any]], blobs: Dict[str, bytes]
+) -> List[Dict[str, Any]]:
+    """Restore tool results stored by reference."""
+    for message in messages:
+        for block in message.get("content", []):
+            result = block.get("toolResult") if isinstance(block, dict) else None
+            if (
+                result
+                and isinstance(result.get("content"), dict)
+                and _REF_KEY in result["content"]
+            ):
+                result["content"] = _loads(blobs[result["content"][_REF_KEY]])
+    return messages
+
+
+def _message_size(message: Dict[str, Any]) -> int:
+    return len(_dumps(message))
+
+
+def trim_messages(
+    messages: List[Dict[str, Any]], max_bytes: int
+) -> List[Dict[str, Any]]:
+    """Drop the oldest turns until the history fits in ``max_bytes``.
+
+    The trimmed history always starts with a user message that is not a tool
+    result, so it remains a valid conversation for the model.
+    """
+    sizes = [_message_size(message) for message in messages]
+    total = sum(sizes)
+    start = 0
+    while start < len(messages) and total > max_bytes:
+        total -= sizes[start]
+        start += 1
+        # Skip to the next user turn so tool uses and results stay paired
+        while start < len(messages) and not _is_user_turn(messages[start]):
+            total -= sizes[start]
+            start += 1
+    if start:
+        logger.info(f"Trimmed {start} old messages from session history")
+    return messages[start:]
+
+
+def _is_user_turn(message: Dict[str, Any]) -> bool:
+    if message.get("role") != "user":
+        return False
+    return not any(
+        isinstance(block, dict) and "toolResult" in block
+        for block in message.get("content", [])
+    )
+
+
+class SessionStore(abc.ABC):
+    """Base class for session stores."""
+
+    def __init__(
+        self,
+        max_bytes: int = 1_000_000,
+        ref_threshold: int = 1024,
+        idle_ttl: float = 0,
+        evict_interval: float = DEFAULT_EVICT_INTERVAL,
+    ):
+        """Initialize the store.
+
+        Args:
+            max_bytes: Maximum serialized history size kept per session
+            ref_threshold: Tool results larger than this are stored by reference
+            idle_ttl: Sessions not saved for this many seconds are evicted (0 keeps them)
+            evict_interval: Minimum seconds between evictions run by saves
+        """
+        self.max_bytes = max_bytes
+        self.ref_threshold = ref_threshold
+        self.idle_ttl = idle_ttl
+        self.evict_interval = evict_interval
+        self._lock = threading.Lock()
+        self._evicted_at = time.monotonic()
+
+    def save(self, session_id: str, messages: List[Dict[str, Any]]) -> None:
+        """Persist the message history of a session, evicting idle sessions when due."""
+        _validate_session_id(session_id)
+        packed, blobs = pack_messages(
+            trim_messages(messages, self.max_bytes), self.ref_threshold
+        )
+        with self._lock:
+            self._write(session_id, packed, blobs)
+            due = (
+                bool(self.idle_ttl)
+                and time.monotonic() - self._evicted_at >= self.evict_interval
+            )
+        if due:
+            self.evict_idle(self.idle_ttl)
+
+    def load(self, session_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Load the message history of a session, or None if it does not exist."""
+        _validate_session_id(session_id)
+        with self._lock:
+            stored = self._read(session_id)
+        if stored is None:
+            return None
+        packed, blobs = stored
+        return unpack_messages(packed, blobs)
+
+    def delete(self, session_id: str) -> None:
+        """Delete a session."""
+        _validate_session_id(session_id)
+        with self._lock:
+            self._delete(session_id)
+
+    def evict_idle(self, max_idle_seconds: float) -> int:
+        """Delete sessions not saved for ``max_idle_seconds``.
+
+        Returns:
+            Number of evicted sessions
+        """
+        cutoff = time.time() - max_idle_seconds
+        with self._lock:
+            self._evicted_at = time.monotonic()
+            evicted = self._evict_before(cutoff)
+        if evicted:
+            logger.info(f"Evicted {evicted} idle sessions")
+        return evicted
+
+    @abc.abstractmethod
+    def _write(
+        self, session_id: str, messages: List[Dict[str, Any]], blobs: Dict[str, bytes]
+    ) -> None:
+        """Store packed messages and their blobs, replacing the session."""
+
+    @abc.abstractmethod
+    def _read(
+        self, session_id: str
+    ) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, bytes]]]:
+        """Packed messages and blobs of a session, or None if it does not exist."""
+
+    @abc.abstractmethod
+    def _delete(self, session_id: str) -> None:
+        """Delete a session if it exists."""
+
+    @abc.abstractmethod
+    def _evict_before(self, cutoff: float) -> int:
+        """Delete sessions last saved before ``cutoff`` (epoch seconds) and return their number."""
+
+
+class FileSessionStore(SessionStore):
+    """Stores each session as one gzip-compressed JSON file in a directory."""
+
+    def __init__(self, directory: str, **kwargs: Any):
+        """Initialize the store.
+
+        Args:
+            directory: Directory holding the session files (created if missing)
+        """
+        super().__init__(**kwargs)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.directory, f"{session_id}.json.gz")
+
+    def _write(
+        self, session_id: str, messages: List[Dict[str, Any]], blobs: Dict[str, bytes]
+    ) -> None:
+        document = {
+            "messages": messages,
+            "blobs": {digest: data.decode("utf-8") for digest, data in blobs.items()},
+        }
+        path = self._path(session_id)
+        temp_path = f"{path}.tmp"
+        with gzip.open(temp_path, "wb") as f:
+            f.write(_dumps(document))
+        os.replace(temp_path, path)
+
+    def _read(
+        self, session_id: str
+    ) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, bytes]]]:
+        try:
+            with gzip.open(self._path(session_id), "rb") as f:
+                document = _loads(f.read())
+        except FileNotFoundError:
+            return None
+        blobs = {
+            digest: data.encode("utf-8")
+            for digest, data in document.get("blobs", {}).items()
+        }
+        return document["messages"], blobs
+
+    def _delete(self, session_id: str) -> None:
+        try:
+            os.remove(self._path(session_id))
+        except FileNotFoundError:
+            pass
+
+    def _evict_before(self, cutoff: float) -> int:
+        evicted = 0
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".json.gz") and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                evicted += 1
+        return evicted
+
+
+class SQLiteSessionStore(SessionStore):
+    """Stores sessions in a SQLite database; tool result blobs are written once."""
+
+    def __init__(self, path: str, **kwargs: Any):
+        """Initialize the store.
+
+        Args:
+            path: SQLite database file
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL,
+                messages BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS blobs (
+                session_id TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                data BLOB NOT NULL,
+                PRIMARY KEY (session_id, digest)
+            );
+            """)
+
+    def _write(
+        self, session_id: str, messages: List[Dict[str, Any]], blobs: Dict[str, bytes]
+    ) -> None:
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (id, updated_at, messages) VALUES (?, ?, ?)",
+                (session_id, time.time(), gzip.compress(_dumps(messages))),
+            )
+            self._db.executemany(
+                "INSERT OR IGNORE INTO blobs (session_id, digest, data) VALUES (?, ?, ?)",
+                [
+                    (session_id, digest, gzip.compress(data))
+                    for digest, data in blobs.items()
+                ],
+            )
+            # Drop blobs no longer referenced after trimming
+            self._db.execute(
+                f"DELETE FROM blobs WHERE session_id = ? AND digest NOT IN ({','.join('?' * len(blobs)) or 'NULL'})",
+                (session_id, *blobs.keys()),
+            )
+
+    def _read(
+        self, session_id: str
+    ) -> Optional[Tuple[List[Dict[str, Any]], Dict[str, bytes]]]:
+        row = self._db.execute(
+            "SELECT messages FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        blobs = {
+            digest: gzip.decompress(data)
+            for digest, data in self._db.execute(
+                "SELECT digest, data FROM blobs WHERE session_id = ?", (session_id,)
+            )
+        }
+        return _loads(gzip.decompress(row[0])), blobs
+
+    def _delete(self, session_id: str) -> None:
+        with self._db:
+            self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            self._db.execute("DELETE FROM blobs WHERE session_id = ?", (session_id,))
+
+    def _evict_before(self, cutoff: float) -> int:
+        with self._db:
+            idle = [
+                row[0]
+                for row in self._db.execute(
+                    "SELECT id FROM sessions WHERE updated_at < ?", (cutoff,)
+                )
+            ]
+            for session_id in idle:
+                self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                self._db.execute(
+                    "DELETE FROM blobs WHERE session_id = ?", (session_id,)
+                )
+        return len(idle)
+
+
+def create_session_store(config: Any) -> Optional[SessionStore]:
+    """Create the session store selected by SESSION_STORE, or None if disabled."""
+    kind = config.session_store
+    if not kind:
+        return None
+    options = {
+        "max_bytes": config.session_max_bytes,
+        "ref_threshold": config.session_ref_threshold,
+        "idle_ttl": config.session_idle_ttl,
+    }
+    if kind == "file":
+        store: SessionStore = FileSessionStore(
+            config.session_store_path or ".sessions", **options
+        )
+    elif kind == "sqlite":
+        store = SQLiteSessionStore(
+            config.session_store_path or "sessions.db", **options
+        )
+    else:
+        raise ConfigurationError(
+            f"Unknown SESSION_STORE '{kind}' (expected 'file' or 'sqlite')"
+        )
+    if config.session_idle_ttl:
+        store.evict_idle(config.session_idle_ttl)
+    return store
@@ -6,8 +6,10 @@ This module provides a simple function to process a single prompt using
 Strands agents with access to Reltio AgentFlow MCP Server tools.
 """
 
+import argparse
 import sys
-from strands_client.client import StrandsReltioClient
+
+from strands_client.profiling import add_profile_arguments, profile_run, span
 
 def process_prompt(prompt: str) -> str:
     """
@@ -25,6 +27,9 @@ def process_prompt(prompt: str) -> str:
     Raises:
         Exception: If client initialization or prompt processing fails
     """
+    with span("import"):
+        from strands_client.client import StrandsReltioClient
+    
     # Initialize client (already handles system prompt and tenant_id enforcement)
     client = StrandsReltioClient()
     
@@ -34,15 +39,27 @@ def process_prompt(prompt: str) -> str:
 
 def main():
     """Command-line interface."""
-    if len(sys.argv) != 2:
-        print("Usage: python strands_client/task.py \"<your prompt>\"")
-        print("Example: python strands_client/task.py \"Get entity summary for entity ID 123\"")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Process a single prompt with the Reltio MCP Strands Client",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s "Get entity summary for entity ID 123"
+  %(prog)s --profile "Get entity summary for entity ID 123"
+        """
+    )
+    parser.add_argument("prompt", help="The prompt/task to process")
+    add_profile_arguments(parser)
     
-    prompt = sys.argv[1]
+    try:
+        args = parser.parse_args()
+    except SystemExit as e:
+        # Bad arguments exit with 1 as before argparse (which uses 2); --help still exits with 0
+        sys.exit(1 if e.code else 0)
     
     try:
-        response = process_prompt(prompt)
+        with profile_run(args):
+            response = process_prompt(args.prompt)
         print(response)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
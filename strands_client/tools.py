@@ -0,0 +1,81 @@
+"""
+Client-side agent tools for the Reltio MCP Strands Client.
+
+MCP tools returned by ``MCPClient.list_tools_sync`` call the MCP session
+directly. ``ClientTool`` lets the client put its own call path in between
+(rate limiting and the other client-side controls) while keeping the original
+tool name and specification the model sees.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Optional
+
+from strands.types.tools import AgentTool, ToolGenerator, ToolSpec, ToolUse
+
+# Synchronous callable invoked with (tool_use_id, mcp_tool_name, arguments)
+MCPCallFn = Callable[[str, str, Dict[str, Any]], Dict[str, Any]]
+
+
+class ClientTool(AgentTool):
+    """Agent tool backed by a synchronous Python callable."""
+
+    def __init__(
+        self,
+        tool_name: str,
+        tool_spec: ToolSpec,
+        func: Callable[[ToolUse], Dict[str, Any]],
+    ):
+        """Initialize the tool.
+
+        Args:
+            tool_name: Name the model uses to call the tool
+            tool_spec: Tool specification sent to the model
+            func: Callable receiving the tool use and returning a ToolResult dict
+        """
+        super().__init__()
+        self._tool_name = tool_name
+        self._tool_spec = tool_spec
+        self._func = func
+
+    @classmethod
+    def wrap_mcp_tool(
+        cls, tool: Any, call: MCPCallFn, tool_spec: Optional[ToolSpec] = None
+    ) -> "ClientTool":
+        """Wrap a Strands MCP tool so its invocations go through ``call``.
+
+        Args:
+            tool: MCPAgentTool returned by ``MCPClient.list_tools_sync``
+            call: Client call path used instead of the raw MCP session
+            tool_spec: Specification sent to the model instead of the tool's own (optional)
+
+        Returns:
+            ClientTool exposing the same name and the tool's (or the given) specification
+        """
+        mcp_tool = getattr(tool, "mcp_tool", None)
+        mcp_name = getattr(mcp_tool, "name", None) or tool.tool_name
+
+        def invoke(tool_use: ToolUse) -> Dict[str, Any]:
+            return call(tool_use["toolUseId"], mcp_name, tool_use.get("input") or {})
+
+        return cls(tool.tool_name, tool_spec or tool.tool_spec, invoke)
+
+    @property
+    def tool_name(self) -> str:
+        """Name of the tool."""
+        return self._tool_name
+
+    @property
+    def tool_spec(self) -> ToolSpec:
+        """Specification of the tool."""
+        return self._tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        """Type of the tool."""
+        return "python"
+
+    async def stream(
+        self, tool_use: ToolUse, invocation_state: Dict[str, Any], **kwargs: Any
+    ) -> ToolGenerator:
+        """Run the callable in a worker thread and yield its ToolResult."""
+        yield await asyncio.to_thread(self._func, tool_use)
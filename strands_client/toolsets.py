@@ -0,0 +1,210 @@
+"""
+Tool-catalog filtering for the Reltio MCP Strands Client.
+
+Every tool specification handed to an agent is sent to the model on each
+request. Toolsets restrict the catalog to the tools a use case needs, and the
+optional keyword selector narrows it further to the tools most relevant to a
+single prompt.
+
+Toolsets are defined by shell-style name patterns. Custom toolsets can be
+loaded from a YAML file::
+
+    entity-review:
+      include: ["*entity*", "*match*"]
+      exclude: ["*delete*"]
+"""
+
+import fnmatch
+import json
+import logging
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import yaml
+
+from config import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+# Verbs of tool names for operations that modify tenant data
+WRITE_TOOL_VERBS = (
+    "create",
+    "update",
+    "delete",
+    "merge",
+    "unmerge",
+    "reject",
+    "remove",
+    "write",
+    "set",
+)
+
+# Tool name patterns for those operations; verbs are matched as whole words of
+# snake_case names, so read tools such as get_dataset_info are not caught
+WRITE_TOOL_PATTERNS = [
+    pattern
+    for verb in WRITE_TOOL_VERBS
+    for pattern in (verb, f"{verb}_*", f"*_{verb}", f"*_{verb}_*")
+]
+
+
+@dataclass(frozen=True)
+class Toolset:
+    """Named selection of tools matched by name patterns."""
+
+    name: str
+    include: Sequence[str] = ("*",)
+    exclude: Sequence[str] = field(default_factory=tuple)
+
+    def matches(self, tool_name: str) -> bool:
+        """Check whether a tool belongs to this toolset."""
+        name = tool_name.lower()
+        if not any(fnmatch.fnmatch(name, pattern) for pattern in self.include):
+            return False
+        return not any(fnmatch.fnmatch(name, pattern) for pattern in self.exclude)
+
+
+BUILTIN_TOOLSETS: Dict[str, Toolset] = {
+    "all": Toolset("all"),
+    "read-only": Toolset("read-only", exclude=tuple(WRITE_TOOL_PATTERNS)),
+    "search": Toolset(
+        "search",
+        include=("*search*", "*find*", "*lookup*", "*get_entity*", "*health*"),
+        exclude=tuple(WRITE_TOOL_PATTERNS),
+    ),
+    "stewardship": Toolset(
+        "stewardship",
+        include=(
+            "*match*",
+            "*merge*",
+            "*entity*",
+            "*relation*",
+            "*search*",
+            "*health*",
+        ),
+    ),
+}
+
+
+def load_toolsets(path: Optional[str] = None) -> Dict[str, Toolset]:
+    """Return the built-in toolsets, extended with those defined in a YAML file.
+
+    Args:
+        path: Optional YAML file mapping toolset names to include/exclude patterns
+
+    Returns:
+        Toolsets keyed by name
+
+    Raises:
+        ConfigurationError: If the file cannot be read or is malformed
+    """
+    toolsets = dict(BUILTIN_TOOLSETS)
+    if not path:
+        return toolsets
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            definitions = yaml.safe_load(f) or {}
+        for name, definition in definitions.items():
+            definition = definition or {}
+            toolsets[name] = Toolset(
+                name,
+                include=tuple(definition.get("include", ["*"])),
+                exclude=tuple(definition.get("exclude", [])),
+            )
+    except (OSError, yaml.YAMLError, AttributeError) as e:
+        raise ConfigurationError(f"Invalid toolsets file {path}: {e}") from e
+    return toolsets
+
+
+def filter_tools(tools: Iterable[Any], toolset: Toolset) -> List[Any]:
+    """Keep only the tools that belong to a toolset."""
+    return [tool for tool in tools if toolset.matches(tool.tool_name)]
+
+
+def estimate_tokens(tools: Iterable[Any]) -> int:
+    """Rough token count of the tool specifications sent to the model.
+
+    Uses the common ~4 characters per token approximation on the JSON specs.
+    """
+    chars = sum(len(json.dumps(tool.tool_spec, default=str)) for tool in tools)
+    return math.ceil(chars / 4)
+
+
+def _terms(text: str) -> List[str]:
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return [w[:-1] if len(w) > 3 and w.endswith("s") else w for w in words]
+
+
+class KeywordToolSelector:
+    """Ranks tools against a prompt by TF-IDF cosine similarity.
+
+    Tool documents are built from the tool name (weighted twice) and its
+    description, so selection runs locally without an embedding model.
+    """
+
+    def __init__(self, tools: Sequence[Any]):
+        """Index the given tools.
+
+        Args:
+            tools: Agent tools with ``tool_name`` and ``tool_spec``
+        """
+        self._tools = list(tools)
+        documents = []
+        for tool in self._tools:
+            name_terms = _terms(tool.tool_name)
+            description = str(tool.tool_spec.get("description", ""))
+            documents.append(Counter(name_terms * 2 + _terms(description)))
+
+        doc_freq: Counter = Counter()
+        for document in documents:
+            doc_freq.update(document.keys())
+        total = len(documents)
+        self._idf = {
+            term: math.log((1 + total) / (1 + df)) + 1 for term, df in doc_freq.items()
+        }
+        self._vectors = [self._weigh(document) for document in documents]
+
+    def _weigh(self, counts: Counter) -> Dict[str, float]:
+        vector = {
+            term: count * self._idf.get(term, 0.0) for term, count in counts.items()
+        }
+        norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+        return {term: value / norm for term, value in vector.items()}
+
+    def select(self, prompt: str, top_k: int) -> List[Any]:
+        """Return the ``top_k`` tools most relevant to a prompt.
+
+        Falls back to all indexed tools when no tool shares a term with the prompt.
+        """
+        query = self._weigh(Counter(_terms(prompt)))
+        scored = []
+        for index, vector in enumerate(self._vectors):
+            score = sum(
+                weight * vector.get(term, 0.0) for term, weight in query.items()
+            )
+            if score > 0:
+                scored.append((score, index))
+        if not scored:
+            return list(self._tools)
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [self._tools[index] for _, index in scored[:top_k]]
+
+
+def savings_report(
+    all_tools: Sequence[Any], selected: Sequence[Any], toolset: str
+) -> Dict[str, Any]:
+    """Summarize the tool-context reduction achieved by a selection."""
+    tokens_total = estimate_tokens(all_tools)
+    tokens_selected = estimate_tokens(selected)
+    return {
+        "toolset": toolset,
+        "tools_total": len(all_tools),
+        "tools_selected": len(selected),
+        "tokens_total": tokens_total,
+        "tokens_selected": tokens_selected,
+        "tokens_saved": tokens_total - tokens_selected,
+    }
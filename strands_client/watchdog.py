@@ -0,0 +1,177 @@
+"""
+Background health watchdog for the Reltio MCP Strands Client.
+
+Without a watchdog a dead MCP session or an expired OAuth token is only
+noticed when a user prompt fails, and the reconnect happens on the request
+path. ``HealthWatchdog`` probes the session on a background thread instead:
+
+- after ``failure_threshold`` failed probes in a row, or when the token baked
+  into the session is due for refresh, it asks the client for a warm standby
+  session, which the client probes and swaps in atomically;
+- the outcome of the last probe is published, so health checks answer from
+  memory instead of making an MCP call.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEALTHY = "healthy"
+UNHEALTHY = "unhealthy"
+UNKNOWN = "unknown"
+
+
+class HealthWatchdog:
+    """Periodically probes an MCP session and replaces it when it degrades."""
+
+    def __init__(
+        self,
+        probe: Callable[[], Dict[str, Any]],
+        reconnect: Callable[[], None],
+        token_expires_in: Callable[[], Optional[float]],
+        interval: float = 30.0,
+        failure_threshold: int = 2,
+    ):
+        """Initialize the watchdog.
+
+        Args:
+            probe: Runs one live health check and returns a dict with a "status" key
+            reconnect: Opens, probes and swaps in a standby session; raises on failure
+            token_expires_in: Seconds until the session token is due for refresh (None if unknown)
+            interval: Seconds between probes
+            failure_threshold: Failed probes in a row before the session is replaced
+        """
+        self._probe = probe
+        self._reconnect = reconnect
+        self._token_expires_in = token_expires_in
+        self.interval = interval
+        self.failure_threshold = max(1, failure_threshold)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._probes = 0
+        self._failed_probes = 0
+        self._reconnects = 0
+        self._reconnect_failures = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self._last: Dict[str, Any] = {"status": UNKNOWN}
+
+    def start(self) -> None:
+        """Start probing on a daemon thread; the first probe runs immediately."""
+        if self._thread:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="mcp-health-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Stop the probing thread."""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.check()
+            except Exception as e:
+                # The watchdog must outlive any single bad cycle
+                logger.warning(f"Health watchdog cycle failed: {e}")
+            self._stop.wait(self.interval)
+
+    def check(self) -> Dict[str, Any]:
+        """Run one probe cycle, replacing the session if needed.
+
+        Returns:
+            The published health
+        """
+        status, latency = self._timed_probe()
+        with self._lock:
+            self._consecutive_failures = (
+                0 if status == HEALTHY else self._consecutive_failures + 1
+            )
+            failures = self._consecutive_failures
+
+        expires_in = self._token_expires_in()
+        reason = None
+        if failures >= self.failure_threshold:
+            reason = f"{failures} failed probes"
+        elif expires_in is not None and expires_in <= 0:
+            reason = "token due for refresh"
+
+        if reason and not self._stop.is_set():
+            logger.info(f"Replacing MCP session: {reason}")
+            try:
+                self._reconnect()
+            except Exception as e:
+                logger.warning(f"Standby MCP session failed: {e}")
+                with self._lock:
+                    self._reconnect_failures += 1
+            else:
+                status = HEALTHY
+                expires_in = self._token_expires_in()
+                with self._lock:
+                    self._reconnects += 1
+                    self._consecutive_failures = 0
+
+        with self._lock:
+            self._last = {
+                "status": status,
+                "checked_at": time.time(),
+                "probe_latency_seconds": round(latency, 4),
+                "consecutive_failures": self._consecutive_failures,
+                "token_expires_in_seconds": (
+                    round(expires_in, 1) if expires_in is not None else None
+                ),
+                "reconnects": self._reconnects,
+            }
+            return dict(self._last)
+
+    def _timed_probe(self) -> Tuple[str, float]:
+        started = time.monotonic()
+        try:
+            status = self._probe().get("status", UNHEALTHY)
+        except Exception as e:
+            logger.debug(f"Health probe failed: {e}")
+            status = UNHEALTHY
+        latency = time.monotonic() - started
+        with self._lock:
+            self._probes += 1
+            if status != HEALTHY:
+                self._failed_probes += 1
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+        return status, latency
+
+    @property
+    def last_health(self) -> Dict[str, Any]:
+        """Health published by the last probe, with its age in seconds."""
+        with self._lock:
+            health = dict(self._last)
+        if "checked_at" in health:
+            health["age_seconds"] = round(time.time() - health["checked_at"], 1)
+        return health
+
+    def metrics(self) -> Dict[str, Any]:
+        """Probe counts and latencies, reconnects and the last published status."""
+        with self._lock:
+            return {
+                "status": self._last["status"],
+                "probes": self._probes,
+                "failed_probes": self._failed_probes,
+                "probe_latency_avg_seconds": (
+                    round(self._latency_total / self._probes, 4)
+                    if self._probes
+                    else 0.0
+                ),
+                "probe_latency_max_seconds": round(self._latency_max, 4),
+                "reconnects": self._reconnects,
+                "reconnect_failures": self._reconnect_failures,
+            }
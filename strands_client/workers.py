@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Pre-fork worker pool for the Reltio MCP Strands Client.
+
+Building a ``StrandsReltioClient`` loads config, imports the agent and model
+SDKs, fetches an OAuth token and lists the MCP tools. ``WorkerPool`` does this
+once in the supervisor process, closes its MCP session and then forks the
+workers, which inherit the warmed state. Each worker opens only its own MCP
+session, reusing the cached tool schemas instead of listing them again.
+
+The supervisor keeps the prompts in a local queue and hands each one to an
+idle worker over that worker's pipe, collects the results in order and
+restarts workers that crash, retrying the prompt they were processing. With a
+task timeout, a worker still busy with a prompt after the timeout (plus a
+grace period for the turn's own deadline to stop it) is killed and replaced.
+
+Programmatic use::
+
+    with WorkerPool(workers=4) as pool:
+        results = pool.map(prompts)
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from typing import Any, Dict, List, Optional, Sequence, cast
+
+from config import ConfigurationError
+
+logger = logging.getLogger(__name__)
+
+# Seconds a worker gets past the task timeout to stop the turn itself before it is killed
+TASK_KILL_GRACE_SECONDS = 5.0
+
+
+def _worker_record_file(record_file: str, index: int) -> str:
+    directory, name = os.path.split(record_file)
+    return os.path.join(directory, f"worker{index}-{name}")
+
+
+def _worker_main(
+    index: int,
+    oauth_client: Any,
+    toolset: Optional[str],
+    mcp_tools: List[Any],
+    conn: Connection,
+) -> None:
+    """Worker process loop: open an MCP session, then process prompts sent by the supervisor."""
+    from config import config
+    from .client import StrandsReltioClient
+
+    started = time.perf_counter()
+    try:
+        record_file = (
+            _worker_record_file(config.record_file, index)
+            if config.record_file
+            else None
+        )
+        client = StrandsReltioClient(
+            oauth_client=oauth_client,
+            toolset=toolset,
+            record_file=record_file,
+            mcp_tools=mcp_tools,
+        )
+    except Exception as e:
+        conn.send(("failed", None, str(e)))
+        sys.exit(1)
+    conn.send(("ready", None, time.perf_counter() - started))
+
+    try:
+        while True:
+            task = conn.recv()
+            if task is None:
+                break
+            task_id, prompt, task_toolset, timeout = task
+            try:
+                response = client.process_prompt(
+                    prompt, toolset=task_toolset, timeout=timeout
+                )
+                conn.send(("done", task_id, response))
+            except Exception as e:
+                conn.send(("error", task_id, f"{type(e).__name__}: {e}"))
+    except EOFError:
+        # Supervisor went away
+        pass
+    finally:
+        client.close()
+
+
+class WorkerPool:
+    """Supervisor forking pre-warmed client workers."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        toolset: Optional[str] = None,
+        max_task_retries: int = 1,
+        task_timeout: Optional[float] = None,
+    ):
+        """Initialize the pool.
+
+        Args:
+            workers: Number of worker processes (defaults to the CPU count)
+            toolset: Default toolset of the worker clients
+            max_task_retries: Times a prompt is retried after its worker crashed
+            task_timeout: Deadline of each prompt in seconds; a worker that does not
+                answer within it plus TASK_KILL_GRACE_SECONDS is killed and replaced
+                (optional, the workers' PROMPT_TIMEOUT applies otherwise)
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.toolset = toolset
+        self.max_task_retries = max_task_retries
+        self.task_timeout = task_timeout
+        self._context = multiprocessing.get_context("fork")
+        self._processes: Dict[int, Any] = {}
+        self._connections: Dict[int, Connection] = {}
+        self._oauth_client: Any = None
+        self._mcp_tools: List[Any] = []
+        self._started = False
+        self._warm_seconds = 0.0
+        self._startup_seconds: List[float] = []
+        self._restarts = 0
+        self._timeouts = 0
+        self._completed = 0
+        self._failed = 0
+
+    def start(self) -> None:
+        """Warm shared state in this process and fork the workers.
+
+        Raises:
+            ConfigurationError: If warm-up or a worker's startup fails
+        """
+        if self._started:
+            return
+        from .client import StrandsReltioClient
+
+        started = time.perf_counter()
+        client = StrandsReltioClient(toolset=self.toolset)
+        self._oauth_client = client.oauth_client
+        self._mcp_tools = [tool.mcp_tool for tool in client._tools or []]
+        # The supervisor's MCP session must not be inherited by the workers
+        client.close()
+        self._warm_seconds = time.perf_counter() - started
+        logger.info(
+            f"Warmed {len(self._mcp_tools)} tool schemas in {self._warm_seconds:.2f}s"
+        )
+
+        for index in range(self.workers):
+            self._spawn(index)
+        for index in range(self.workers):
+            self._await_ready(index)
+        self._started = True
+        logger.info(f"Started {self.workers} workers")
+
+    def _spawn(self, index: int) -> None:
+        supervisor_end, worker_end = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(index, self._oauth_client, self.toolset, self._mcp_tools, worker_end),
+            name=f"strands-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        worker_end.close()
+        self._processes[index] = process
+        self._connections[index] = supervisor_end
+
+    def _await_ready(self, index: int) -> None:
+        try:
+            status, _, value = self._connections[index].recv()
+        except EOFError:
+            status, value = "failed", "worker exited during startup"
+        if status != "ready":
+            self.close()
+            raise ConfigurationError(f"Worker {index} failed to start: {value}")
+        self._startup_seconds.append(value)
+
+    def _restart(self, index: int) -> None:
+        process = self._processes[index]
+        process.join()
+        self._connections.pop(index).close()
+        self._restarts += 1
+        logger.warning(
+            f"Worker {index} exited with code {process.exitcode}; restarting"
+        )
+        self._spawn(index)
+        self._await_ready(index)
+
+    def _recycle(self, index: int) -> None:
+        """Kill a hung worker and start a fresh one in its place."""
+        logger.warning(f"Worker {index} exceeded the task timeout; killing it")
+        self._processes[index].kill()
+        self._restart(index)
+
+    def map(
+        self, prompts: Sequence[str], toolset: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Process prompts on the workers.
+
+        Args:
+            prompts: Prompts to process
+            toolset: Optional toolset for these prompts
+
+        Returns:
+            One result per prompt, in order: ``{"prompt", "response"}`` or ``{"prompt", "error"}``
+        """
+        self.start()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(prompts)
+        attempts = [0] * len(prompts)
+        pending = deque(range(len(prompts)))
+        running: Dict[int, int] = {}
+        deadlines: Dict[int, float] = {}
+        idle = set(self._connections)
+
+        def finish(task_id: int, key: str, value: Any) -> None:
+            results[task_id] = {"prompt": prompts[task_id], key: value}
+            if key == "response":
+                self._completed += 1
+            else:
+                self._failed += 1
+
+        def worker_exited(index: int) -> None:
+            deadlines.pop(index, None)
+            task_id = running.pop(index, None)
+            if task_id is not None:
+                attempts[task_id] += 1
+                if attempts[task_id] <= self.max_task_retries:
+                    pending.appendleft(task_id)
+                else:
+                    finish(task_id, "error", "Worker crashed")
+            self._restart(index)
+            idle.add(index)
+
+        while pending or running:
+            while pending and idle:
+                index = idle.pop()
+                task_id = pending.popleft()
+                running[index] = task_id
+                if self.task_timeout:
+                    deadlines[index] = (
+                        time.monotonic() + self.task_timeout + TASK_KILL_GRACE_SECONDS
+                    )
+                try:
+                    self._connections[index].send(
+                        (task_id, prompts[task_id], toolset, self.task_timeout)
+                    )
+                except OSError:
+                    worker_exited(index)
+
+            watched: Dict[Any, int] = {}
+            for index in running:
+                watched[self._connections[index]] = index
+                watched[self._processes[index].sentinel] = index
+            timeout = (
+                max(0.0, min(deadlines.values()) - time.monotonic())
+                if deadlines
+                else None
+            )
+            for index in {watched[ready] for ready in wait(list(watched), timeout)}:
+                conn = self._connections[index]
+                try:
+                    while conn.poll():
+                        status, task_id, value = conn.recv()
+                        running.pop(index, None)
+                        deadlines.pop(index, None)
+                        idle.add(index)
+                        finish(
+                            task_id, "response" if status == "done" else "error", value
+                        )
+                except (EOFError, OSError):
+                    pass
+                if not self._processes[index].is_alive():
+                    idle.discard(index)
+                    worker_exited(index)
+
+            now = time.monotonic()
+            for index in [
+                index for index, deadline in deadlines.items() if deadline <= now
+            ]:
+                # A hung prompt would hang again, so it fails instead of being retried
+                del deadlines[index]
+                finish(
+                    running.pop(index), "error", f"Timed out after {self.task_timeout}s"
+                )
+                self._timeouts += 1
+                self._recycle(index)
+                idle.add(index)
+
+        # Every prompt has a result once nothing is pending or running
+        return cast(List[Dict[str, Any]], results)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Pool metrics: warm-up and per-worker startup times, restarts and task counts."""
+        startup = self._startup_seconds
+        return {
+            "workers": self.workers,
+            "warm_seconds": round(self._warm_seconds, 4),
+            "worker_startup_avg_seconds": (
+                round(sum(startup) / len(startup), 4) if startup else 0.0
+            ),
+            "restarts": self._restarts,
+            "timeouts": self._timeouts,
+            "completed": self._completed,
+            "failed": self._failed,
+        }
+
+    def close(self) -> None:
+        """Stop the workers."""
+        for conn in self._connections.values():
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+        for process in self._processes.values():
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._connections.values():
+            conn.close()
+        self._processes.clear()
+        self._connections.clear()
+        self._started = False
+
+    def __enter__(self) -> "WorkerPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def main() -> int:
+    """Command-line interface."""
+    parser = argparse.ArgumentParser(
+        description="Process prompts on pre-forked Reltio MCP Strands Client workers",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Prompts are read one per line; results are written as JSON lines in input order.
+
+Examples:
+  %(prog)s prompts.txt                  # One worker per CPU
+  %(prog)s --workers 4 prompts.txt      # Four workers
+  cat prompts.txt | %(prog)s            # Read prompts from stdin
+        """,
+    )
+    parser.add_argument(
+        "prompts_file", nargs="?", help="File with one prompt per line (default: stdin)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--toolset", default=None, help="Toolset for the workers (default: TOOLSET)"
+    )
+    parser.add_argument(
+        "--task-timeout",
+        type=float,
+        default=None,
+        help="Seconds per prompt before its worker is killed and replaced (default: none)",
+    )
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO if args.debug else logging.WARNING, format="%(message)s"
+    )
+
+    source = (
+        open(args.prompts_file, "r", encoding="utf-8")
+        if args.prompts_file
+        else sys.stdin
+    )
+    with source:
+        prompts = [line.strip() for line in source if line.strip()]
+
+    try:
+        with WorkerPool(
+            workers=args.workers, toolset=args.toolset, task_timeout=args.task_timeout
+        ) as pool:
+            for result in pool.map(prompts):
+                print(json.dumps(result, default=str))
+            print(json.dumps(pool.metrics()), file=sys.stderr)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@ Simple tests for configuration and authentication.
 """
 
 import os
+import time
 import pytest
 from unittest.mock import patch
 
@@ -53,6 +54,19 @@ def test_preferred_model_provider_anthropic():
     assert config.get_preferred_model_provider() == "anthropic"
 
 
+@patch.dict(os.environ, {
+    'MODEL_PROVIDER': 'local',
+    'LOCAL_MODEL_BASE_URL': 'http://127.0.0.1:8000/v1',
+    'OPENAI_API_KEY': 'openai_key',
+}, clear=True)
+def test_local_model_provider_selected_explicitly():
+    """Test that MODEL_PROVIDER overrides key-based selection and sets the local defaults."""
+    config = Config()
+    assert config.get_preferred_model_provider() == "local"
+    assert config.local_model_base_url == 'http://127.0.0.1:8000/v1'
+    assert config.model_id == 'local-model'
+
+
 # Authentication Tests
 
 def test_oauth_client_creation():
@@ -125,3 +139,123 @@ def test_get_system_prompt_empty_file():
         prompt = config.get_system_prompt()
         assert "helpful AI assistant" in prompt
         assert "Reltio AgentFlow MCP Server tools" in prompt
+
+
+@patch.dict(os.environ, {
+    'RATE_LIMIT_ENABLED': 'true',
+    'MCP_RATE_LIMIT_RPS': '5',
+    'RATE_LIMIT_MAX_CONCURRENCY': '8'
+})
+def test_config_rate_limit_settings():
+    """Test that rate limit settings are read from the environment."""
+    config = Config()
+    
+    assert config.rate_limit_enabled is True
+    assert config.mcp_rate_limit_rps == 5.0
+    assert config.rate_limit_max_concurrency == 8
+    assert config.model_rate_limit_burst == 5
+
+
+@patch.dict(os.environ, {
+    'MCP_HTTP2': 'true',
+    'MCP_KEEPALIVE_EXPIRY': '90',
+    'MCP_SHARE_CONNECTIONS': 'true'
+})
+def test_config_mcp_http_settings():
+    """Test that MCP HTTP connection settings are read from the environment."""
+    config = Config()
+    
+    assert config.mcp_http2 is True
+    assert config.mcp_keepalive_expiry == 90.0
+    assert config.mcp_share_connections is True
+    assert config.mcp_pool_max_connections == 20
+
+
+def test_config_toolset_defaults():
+    """Test tool catalog filtering defaults."""
+    config = Config()
+    
+    assert config.toolset == 'all'
+    assert config.tool_selection_top_k == 0
+
+
+@patch.dict(os.environ, {'SESSION_STORE': 'SQLite', 'SESSION_MAX_BYTES': '5000'})
+def test_config_session_settings():
+    """Test that session persistence settings are read from the environment."""
+    config = Config()
+    
+    assert config.session_store == 'sqlite'
+    assert config.session_max_bytes == 5000
+    assert config.session_ref_threshold == 1024
+
+
+# Hot Reload Tests
+
+def test_get_system_prompt_cached_until_file_changes(tmp_path, monkeypatch):
+    """Test that the system prompt is read once and reloaded when the file changes."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('CONFIG_RELOAD_INTERVAL', '0')
+    prompt_file = tmp_path / 'system_prompt.txt'
+    prompt_file.write_text("First prompt")
+    config = Config()
+    
+    assert config.get_system_prompt() == "First prompt"
+    with patch('builtins.open') as mock_open:
+        assert config.get_system_prompt() == "First prompt"
+        mock_open.assert_not_called()
+    
+    prompt_file.write_text("Second prompt")
+    os.utime(prompt_file, (time.time() + 10, time.time() + 10))
+    assert config.get_system_prompt() == "Second prompt"
+
+
+def test_refresh_reloads_model_settings_from_env_file(tmp_path, monkeypatch):
+    """Test that edited .env model settings are applied without overriding exported variables."""
+    monkeypatch.setenv('CONFIG_RELOAD_INTERVAL', '0')
+    monkeypatch.setenv('MODEL_MAX_TOKENS', '1000')
+    monkeypatch.delenv('MODEL_TEMPERATURE', raising=False)
+    env_file = tmp_path / '.env'
+    env_file.write_text("MODEL_TEMPERATURE=0.2\n")
+    config = Config(env_file=str(env_file))
+    assert config.model_temperature == 0.2
+    assert config.refresh() is False
+    
+    env_file.write_text("MODEL_TEMPERATURE=0.9\nMODEL_MAX_TOKENS=5\n")
+    os.utime(env_file, (time.time() + 10, time.time() + 10))
+    assert config.refresh() is True
+    assert config.model_temperature == 0.9
+    assert config.model_max_tokens == 1000
+    
+    # A setting deleted from the file falls back to its default
+    env_file.write_text("MODEL_MAX_TOKENS=5\n")
+    os.utime(env_file, (time.time() + 20, time.time() + 20))
+    assert config.refresh() is True
+    assert 'MODEL_TEMPERATURE' not in os.environ
+    assert config.model_temperature == 0.7
+    assert config.model_max_tokens == 1000
+
+
+def test_global_config_is_created_lazily():
+    """Test that the global config proxy builds its Config on first access."""
+    from config.config import _LazyConfig
+    
+    with patch('config.config.Config') as mock_config_class:
+        lazy = _LazyConfig()
+        mock_config_class.assert_not_called()
+        mock_config_class.return_value.model_id = "gpt-4.1"
+        assert lazy.model_id == "gpt-4.1"
+        assert lazy.model_id == "gpt-4.1"
+        mock_config_class.assert_called_once()
+
+
+def test_global_config_first_load_is_profiled():
+    """Test that the first load of the global config is timed as a config_load span."""
+    from config.config import _LazyConfig
+    from strands_client.profiling import Profiler
+    
+    profiler = Profiler()
+    with patch('config.config.Config'), profiler.activate():
+        lazy = _LazyConfig()
+        assert lazy.model_id is lazy.model_id
+    
+    assert profiler.summary()["config_load"]["count"] == 1
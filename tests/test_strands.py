@@ -6,8 +6,9 @@ import pytest
 import os
 import logging
 import sys
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, ANY
 from strands_client.client import StrandsReltioClient
+from strands_client.models import CancellableModel
 from config.exceptions import ConfigurationError
 
 
@@ -47,6 +48,24 @@ def test_strands_client_init_success_openai(mock_openai_model, mock_agent, mock_
     mock_config.model_id = "gpt-4"
     mock_config.model_temperature = 0.7
     mock_config.model_max_tokens = 4096
+    mock_config.rate_limit_enabled = False
+    mock_config.mcp_share_connections = False
+    mock_config.toolset = "all"
+    mock_config.toolsets_file = ""
+    mock_config.tool_selection_top_k = 0
+    mock_config.record_file = ""
+    mock_config.replay_file = ""
+    mock_config.bulk_tools_enabled = False
+    mock_config.session_store = ""
+    mock_config.prefetch_rules_file = ""
+    mock_config.large_result_threshold = 0
+    mock_config.memory_profile = False
+    mock_config.history_slim = False
+    mock_config.scheduler_enabled = False
+    mock_config.default_priority = "interactive"
+    mock_config.health_watchdog_enabled = False
+    mock_config.mcp_coalesce_enabled = False
+    mock_config.tool_schema_compaction = "off"
     
     # Mock OAuth client
     mock_oauth_client = Mock()
@@ -83,6 +102,24 @@ def test_strands_client_init_success_anthropic(mock_anthropic_model, mock_agent,
     mock_config.model_id = "claude-3-5-sonnet"
     mock_config.model_temperature = 0.5
     mock_config.model_max_tokens = 2048
+    mock_config.rate_limit_enabled = False
+    mock_config.mcp_share_connections = False
+    mock_config.toolset = "all"
+    mock_config.toolsets_file = ""
+    mock_config.tool_selection_top_k = 0
+    mock_config.record_file = ""
+    mock_config.replay_file = ""
+    mock_config.bulk_tools_enabled = False
+    mock_config.session_store = ""
+    mock_config.prefetch_rules_file = ""
+    mock_config.large_result_threshold = 0
+    mock_config.memory_profile = False
+    mock_config.history_slim = False
+    mock_config.scheduler_enabled = False
+    mock_config.default_priority = "interactive"
+    mock_config.health_watchdog_enabled = False
+    mock_config.mcp_coalesce_enabled = False
+    mock_config.tool_schema_compaction = "off"
     
     # Mock OAuth client
     mock_oauth_client = Mock()
@@ -190,9 +227,13 @@ def test_create_agent_success(mock_agent_class, mock_openai_model):
         expected_prompt = "Custom prompt\n\n For all MCP tool executions, you must use test_tenant as the tenant_id of the tool input."
         mock_agent_class.assert_called_once_with(
             tools=client._tools,
-            model=mock_model,
+            model=ANY,
             system_prompt=expected_prompt
         )
+        # The provider model is wrapped so cancellation aborts in-flight streams
+        model = mock_agent_class.call_args.kwargs["model"]
+        assert isinstance(model, CancellableModel)
+        assert model.wrapped is mock_model
 
 
 def test_health_check_success():
@@ -250,7 +291,7 @@ def test_process_prompt_success():
     response = client.process_prompt("Test prompt")
     
     assert response == "Agent response to the prompt"
-    mock_agent.assert_called_once_with("Test prompt")
+    mock_agent.assert_called_once_with("Test prompt", cancel_signal=ANY)
 
 
 def test_process_prompt_failure():
@@ -365,7 +406,7 @@ def test_chat_run_interactive_chat_prompt(mock_input):
     with patch('strands_client.client.StrandsReltioClient', return_value=mock_client):
         result = run_interactive_chat()
         assert result == 0
-        mock_client.process_prompt.assert_called_once_with("test prompt")
+        mock_client.process_prompt.assert_called_once_with("test prompt", cancel_token=ANY)
 
 
 def test_chat_run_interactive_chat_init_failure():
@@ -376,3 +417,1905 @@ def test_chat_run_interactive_chat_init_failure():
     with patch('strands_client.client.StrandsReltioClient', side_effect=Exception("Init failed")):
         result = run_interactive_chat()
         assert result == 1
+
+
+# Rate Limiting Tests
+
+def test_token_bucket_allows_burst_then_waits():
+    """Test that the token bucket allows a burst and then asks callers to wait."""
+    from strands_client.rate_limit import TokenBucket
+    
+    bucket = TokenBucket(rate=10, burst=2, clock=lambda: 100.0)
+    
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.1)
+    
+    bucket.pause(5)
+    assert bucket.reserve() == pytest.approx(5.0)
+
+
+def test_adaptive_concurrency_aimd():
+    """Test that the concurrency limit halves on overload and grows back on success."""
+    from strands_client.rate_limit import AdaptiveConcurrencyLimiter
+    
+    limiter = AdaptiveConcurrencyLimiter(max_limit=8)
+    assert limiter.try_acquire()
+    limiter.release(overloaded=True)
+    assert limiter.limit == 4
+    
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release()
+    assert limiter.limit > 4
+
+
+def test_rate_limit_detection_and_retry_after():
+    """Test 429 detection on exceptions and MCP results, and Retry-After parsing."""
+    from strands_client.rate_limit import is_rate_limited, retry_after_seconds
+    
+    error = Exception("Too many requests")
+    error.status_code = 429
+    error.response = Mock(headers={"retry-after": "3"})
+    
+    assert is_rate_limited(error)
+    assert retry_after_seconds(error) == 3.0
+    throttled = {"status": "error", "content": [], "structuredContent": {"error": {"code": 429, "retryAfter": 2}}}
+    assert is_rate_limited(throttled)
+    assert retry_after_seconds(throttled) == 2.0
+    assert is_rate_limited({"status": "error", "content": [{"json": {"code": "RATE_LIMITED"}}]})
+    # Free text is not a structured signal
+    assert not is_rate_limited({"status": "error", "content": [{"text": "HTTP 429 Too Many Requests"}]})
+    assert not is_rate_limited({"status": "success", "content": [{"text": "429 entities"}]})
+    assert not is_rate_limited(ValueError("boom"))
+
+
+def test_token_bucket_zero_rate_is_unlimited():
+    """Test that a rate of 0 never asks callers to wait instead of dividing by zero."""
+    from strands_client.rate_limit import TokenBucket
+    
+    bucket = TokenBucket(rate=0, burst=1, clock=lambda: 100.0)
+    
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    bucket.pause(2)
+    assert bucket.reserve() == pytest.approx(2.0)
+
+
+@patch('strands_client.client.config')
+def test_call_mcp_tool_retries_when_rate_limited(mock_config):
+    """Test that rate-limited MCP calls are retried through the tenant limiter."""
+    from strands_client.rate_limit import RateLimiter, RateLimiterRegistry
+    
+    mock_config.rate_limit_max_retries = 2
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client.tenant_id = "test_tenant"
+    client._rate_limiters = RateLimiterRegistry(1000, 10, 1000, 10, max_concurrency=4)
+    
+    throttled = {"status": "error", "content": [], "structuredContent": {"statusCode": 429, "retryAfter": 0}}
+    success = {"status": "success", "content": [{"text": "ok"}]}
+    client._mcp_client = Mock()
+    client._mcp_client.call_tool_sync.side_effect = [throttled, success]
+    
+    with patch.object(RateLimiter, 'release', autospec=True, side_effect=RateLimiter.release) as release:
+        result = client._call_mcp_tool("id-1", "get_entity", {"entity_id": "1"})
+    
+    assert result == success
+    # The Retry-After hint of the result reaches the limiter
+    assert release.call_args_list[0].args[1:] == (True, 0.0)
+    assert client._mcp_client.call_tool_sync.call_count == 2
+    metrics = client.get_metrics()["rate_limits"]["mcp:test_tenant"]
+    assert metrics["calls"] == 2
+    assert metrics["throttled"] == 1
+
+
+def test_agent_tools_wrapped_when_rate_limited():
+    """Test that MCP tools are wrapped only when client-side controls are enabled."""
+    from strands_client.rate_limit import RateLimiterRegistry
+    from strands_client.tools import ClientTool
+    
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._tools = [Mock(tool_name="tool1", tool_spec={"name": "tool1"})]
+    assert client._agent_tools(client._tools) is client._tools
+    
+    client._rate_limiters = RateLimiterRegistry(1, 1, 1, 1, max_concurrency=1)
+    tools = client._agent_tools(client._tools)
+    assert isinstance(tools[0], ClientTool)
+    assert tools[0].tool_name == "tool1"
+
+
+# Connection Reuse Tests
+
+def test_http_client_factory_applies_pool_settings():
+    """Test that the MCP httpx client factory applies pool and timeout settings."""
+    import asyncio
+    import httpx
+    from strands_client.connections import ConnectionStats, HTTPSettings, create_http_client_factory
+    
+    settings = HTTPSettings(max_connections=7, connect_timeout=3, read_timeout=30)
+    factory = create_http_client_factory(settings, ConnectionStats())
+    http_client = factory(headers={"Authorization": "Bearer token"})
+    
+    try:
+        assert http_client.timeout.connect == 3
+        assert http_client.timeout.read == 30
+        assert http_client.headers["Authorization"] == "Bearer token"
+    finally:
+        asyncio.run(http_client.aclose())
+    
+    # Timeouts passed by the transport take precedence over the settings
+    http_client = factory(timeout=httpx.Timeout(5, read=60))
+    try:
+        assert http_client.timeout.connect == 5
+        assert http_client.timeout.read == 60
+    finally:
+        asyncio.run(http_client.aclose())
+
+
+def test_connection_stats_reuse_ratio():
+    """Test connection reuse metrics computed from httpcore trace events."""
+    import asyncio
+    from strands_client.connections import ConnectionStats
+    
+    stats = ConnectionStats()
+    events = [
+        "connection.connect_tcp.complete",
+        "connection.start_tls.complete",
+        "http11.send_request_headers.started",
+        "http11.send_request_headers.started",
+        "http2.send_request_headers.started",
+        "http2.send_request_headers.started",
+    ]
+    for event in events:
+        asyncio.run(stats.trace(event, {}))
+    
+    metrics = stats.metrics()
+    assert metrics["requests"] == 4
+    assert metrics["tls_handshakes"] == 1
+    assert metrics["reuse_ratio"] == 0.75
+
+
+def test_shared_mcp_connections_refcount():
+    """Test that shared MCP sessions are opened once and stopped on last release."""
+    from strands_client.connections import SharedMCPConnections
+    
+    registry = SharedMCPConnections()
+    mcp_client = Mock()
+    connect = Mock(return_value=(mcp_client, ["tool1"]))
+    key = ("https://dev.reltio.com/ai/tools/mcp/", "client_id")
+    
+    assert registry.acquire(key, connect) == (mcp_client, ["tool1"])
+    assert registry.acquire(key, connect) == (mcp_client, ["tool1"])
+    connect.assert_called_once()
+    
+    registry.release(key)
+    mcp_client.stop.assert_not_called()
+    registry.release(key)
+    mcp_client.stop.assert_called_once()
+    assert registry.metrics() == {}
+
+
+def test_shared_mcp_connections_connect_outside_registry_lock():
+    """Test that a slow connect blocks callers for its key only."""
+    import threading
+    from strands_client.connections import SharedMCPConnections
+    
+    registry = SharedMCPConnections()
+    started, finish = threading.Event(), threading.Event()
+    slow_client = Mock()
+    
+    def slow_connect():
+        started.set()
+        finish.wait(5)
+        return slow_client, []
+    
+    slow_key = ("https://dev.reltio.com/ai/tools/mcp/", "slow")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.acquire(slow_key, slow_connect))) for _ in range(2)]
+    threads[0].start()
+    assert started.wait(5)
+    threads[1].start()
+    
+    # Another key connects while the slow one is still in progress
+    fast_client = Mock()
+    assert registry.acquire(("https://test.reltio.com/ai/tools/mcp/", "fast"), lambda: (fast_client, [])) == (fast_client, [])
+    
+    finish.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == [(slow_client, []), (slow_client, [])]
+    assert registry.metrics()["https://dev.reltio.com/ai/tools/mcp/"] == 2
+    
+    failing = Mock(side_effect=ConnectionError("refused"))
+    with pytest.raises(ConnectionError):
+        registry.acquire(("https://prod.reltio.com/ai/tools/mcp/", "x"), failing)
+    assert "https://prod.reltio.com/ai/tools/mcp/" not in registry.metrics()
+
+
+# Toolset Tests
+
+def _make_tool(name, description=""):
+    """Create a mock MCP tool with a name and description."""
+    return Mock(tool_name=name, tool_spec={"name": name, "description": description, "inputSchema": {}})
+
+
+def test_builtin_toolsets_filter_tools():
+    """Test that built-in toolsets keep only the matching tools."""
+    from strands_client.toolsets import BUILTIN_TOOLSETS, filter_tools
+    
+    tools = [
+        _make_tool("search_entities_tool"),
+        _make_tool("get_entity_tool"),
+        _make_tool("merge_entities_tool"),
+        _make_tool("update_entity_attributes_tool"),
+    ]
+    
+    read_only = [t.tool_name for t in filter_tools(tools, BUILTIN_TOOLSETS["read-only"])]
+    assert read_only == ["search_entities_tool", "get_entity_tool"]
+    # Write verbs match whole words only
+    assert BUILTIN_TOOLSETS["read-only"].matches("get_dataset_info")
+    assert not BUILTIN_TOOLSETS["read-only"].matches("bulk_set_attributes")
+    assert not BUILTIN_TOOLSETS["read-only"].matches("entity_unmerge")
+    assert len(filter_tools(tools, BUILTIN_TOOLSETS["all"])) == 4
+
+
+def test_load_toolsets_from_yaml(tmp_path):
+    """Test that custom toolsets are loaded from a YAML file."""
+    from strands_client.toolsets import load_toolsets
+    
+    toolsets_file = tmp_path / "toolsets.yaml"
+    toolsets_file.write_text("matching:\n  include: ['*match*']\n  exclude: ['*reject*']\n")
+    
+    toolsets = load_toolsets(str(toolsets_file))
+    assert "read-only" in toolsets
+    assert toolsets["matching"].matches("get_entity_matches_tool")
+    assert not toolsets["matching"].matches("reject_entity_match_tool")
+
+
+def test_keyword_tool_selector_picks_relevant_tools():
+    """Test that dynamic selection ranks tools by prompt relevance."""
+    from strands_client.toolsets import KeywordToolSelector
+    
+    tools = [
+        _make_tool("search_entities_tool", "Search entities by attribute values"),
+        _make_tool("get_relation_details_tool", "Get details of a relation"),
+        _make_tool("get_entity_matches_tool", "Find potential matches for an entity"),
+    ]
+    selector = KeywordToolSelector(tools)
+    
+    selected = selector.select("Show potential matches for entity 123", top_k=1)
+    assert [t.tool_name for t in selected] == ["get_entity_matches_tool"]
+    assert selector.select("hello there", top_k=1) == tools
+
+
+@patch('strands_client.client.Agent')
+def test_process_prompt_with_toolset_reports_savings(mock_agent_class):
+    """Test that a per-call toolset rebuilds the agent and reports token savings."""
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._tools = [_make_tool("search_entities_tool", "x" * 400), _make_tool("delete_entity_tool", "y" * 400)]
+    old_agent = Mock()
+    client._agent = old_agent
+    new_agent = Mock(return_value="response")
+    mock_agent_class.return_value = new_agent
+    
+    response = client.process_prompt("Find John", toolset="read-only")
+    
+    assert response == "response"
+    assert mock_agent_class.call_args.kwargs["tools"] == [client._tools[0]]
+    assert mock_agent_class.call_args.kwargs["messages"] is old_agent.messages
+    assert client._agent is new_agent
+    report = client.get_metrics()["tool_selection"]
+    assert report["tools_selected"] == 1
+    assert report["tokens_saved"] > 100
+
+
+@patch('strands_client.client.Agent')
+def test_process_prompt_restores_default_tools_after_toolset(mock_agent_class):
+    """Test that a prompt without a toolset goes back to the client's default tools."""
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._tools = [_make_tool("search_entities_tool"), _make_tool("delete_entity_tool")]
+    client._agent = Mock()
+    client._agent_tool_names = ["search_entities_tool", "delete_entity_tool"]
+    mock_agent_class.side_effect = lambda **kwargs: Mock(return_value="response", messages=kwargs["messages"])
+    
+    client.process_prompt("Find John", toolset="read-only")
+    assert mock_agent_class.call_args.kwargs["tools"] == [client._tools[0]]
+    
+    client.process_prompt("Delete entity 1")
+    assert mock_agent_class.call_count == 2
+    assert mock_agent_class.call_args.kwargs["tools"] == client._tools
+    
+    client.process_prompt("Delete entity 2")
+    assert mock_agent_class.call_count == 2
+
+
+# Record/Replay Tests
+
+def test_model_record_and_replay_roundtrip(tmp_path):
+    """Test that recorded model events are replayed for the same request."""
+    import asyncio
+    from strands_client.recording import RecordingModel, ReplayModel, TrafficRecorder, TrafficRecording
+    
+    class FakeModel:
+        async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+            yield {"messageStart": {"role": "assistant"}}
+            yield {"contentBlockDelta": {"delta": {"text": "hello"}}}
+    
+    async def collect(model, messages):
+        return [event async for event in model.stream(messages, None, "system")]
+    
+    path = str(tmp_path / "traffic.jsonl.gz")
+    messages = [{"role": "user", "content": [{"text": "hi"}]}]
+    recorder = TrafficRecorder(path)
+    recorded = asyncio.run(collect(RecordingModel(FakeModel(), recorder), messages))
+    recorder.close()
+    
+    recording = TrafficRecording.load(path, latency_scale=0)
+    replayed = asyncio.run(collect(ReplayModel(recording), messages))
+    
+    assert replayed == recorded
+
+
+def test_traffic_recording_matches_mcp_calls():
+    """Test MCP replay matching by exact params, then by tool name."""
+    from config.exceptions import ReplayError
+    from strands_client.recording import TrafficRecording
+    
+    def entry(entity_id):
+        return {
+            "kind": "mcp",
+            "method": "tools/call",
+            "params": {"name": "get_entity_tool", "arguments": {"entity_id": entity_id}},
+            "latency": 0.2,
+            "response": {"jsonrpc": "2.0", "id": 1, "result": {"content": [{"type": "text", "text": entity_id}]}},
+        }
+    
+    recording = TrafficRecording([entry("1"), entry("2")], latency_scale=0.5)
+    
+    assert recording.next_mcp("tools/call", {"name": "get_entity_tool", "arguments": {"entity_id": "2"}})["params"]["arguments"]["entity_id"] == "2"
+    assert recording.next_mcp("tools/call", {"name": "get_entity_tool", "arguments": {"entity_id": "9"}})["params"]["arguments"]["entity_id"] == "1"
+    assert recording.delay(0.2) == pytest.approx(0.1)
+    with pytest.raises(ReplayError):
+        recording.next_mcp("tools/call", {"name": "search_entities_tool", "arguments": {}})
+
+
+def test_replay_mode_skips_oauth(tmp_path):
+    """Test that replay mode serves MCP traffic without requesting a token."""
+    from strands_client.recording import TrafficRecording
+    
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client.oauth_client = Mock()
+    client._replay = TrafficRecording([])
+    
+    transport_callable = client._create_mcp_transport()
+    
+    assert callable(transport_callable)
+    client.oauth_client.get_access_token.assert_not_called()
+
+
+# Bulk Tool Tests
+
+def test_bulk_tool_fans_out_and_deduplicates():
+    """Test that bulk_call deduplicates values and aggregates results."""
+    import json
+    from strands_client.bulk import create_bulk_tool
+    
+    entity_tool = Mock(tool_name="get_entity_tool", tool_spec={
+        "name": "get_entity_tool",
+        "inputSchema": {"json": {"properties": {"entity_id": {}, "tenant_id": {}}}},
+    })
+    entity_tool.mcp_tool.name = "get_entity_tool"
+    merge_tool = Mock(tool_name="merge_entities_tool", tool_spec={"name": "merge_entities_tool"})
+    
+    def call(tool_use_id, name, arguments):
+        if arguments["entity_id"] == "bad":
+            return {"status": "error", "content": [{"text": "not found"}]}
+        return {"status": "success", "content": [{"text": json.dumps({"id": arguments["entity_id"], "tenant": arguments["tenant_id"]})}]}
+    
+    call_mock = Mock(side_effect=call)
+    bulk_tool = create_bulk_tool([entity_tool, merge_tool], call_mock, "test_tenant", max_concurrency=4)
+    
+    assert bulk_tool.tool_spec["inputSchema"]["json"]["properties"]["tool_name"]["enum"] == ["get_entity_tool"]
+    
+    result = bulk_tool._func({
+        "toolUseId": "bulk-1",
+        "name": "bulk_call",
+        "input": {"tool_name": "get_entity_tool", "argument_name": "entity_id", "values": ["1", "2", "1", "bad", 2]},
+    })
+    summary = json.loads(result["content"][0]["text"])
+    
+    assert call_mock.call_count == 3
+    assert summary["unique"] == 3
+    assert summary["results"]["2"] == {"id": "2", "tenant": "test_tenant"}
+    assert summary["errors"] == {"bad": "not found"}
+    
+    result = bulk_tool._func({
+        "toolUseId": "bulk-3",
+        "input": {"tool_name": "get_entity_tool", "argument_name": "entity_uri", "values": ["1"]},
+    })
+    assert result["status"] == "error"
+    assert "entity_id" in result["content"][0]["text"]
+    assert call_mock.call_count == 3
+
+
+def test_bulk_tool_rejects_write_tools():
+    """Test that bulk_call refuses tools outside the read-only catalog."""
+    from strands_client.bulk import create_bulk_tool
+    
+    merge_tool = Mock(tool_name="merge_entities_tool", tool_spec={"name": "merge_entities_tool"})
+    search_tool = Mock(tool_name="search_entities_tool", tool_spec={"name": "search_entities_tool"})
+    
+    assert create_bulk_tool([merge_tool], Mock(), "t") is None
+    bulk_tool = create_bulk_tool([search_tool, merge_tool], Mock(), "t")
+    result = bulk_tool._func({
+        "toolUseId": "bulk-2",
+        "input": {"tool_name": "merge_entities_tool", "argument_name": "entity_id", "values": ["1"]},
+    })
+    assert result["status"] == "error"
+
+
+# Profiling Tests
+
+def test_profiler_records_spans_and_listeners():
+    """Test that spans are recorded only while a profiler is active."""
+    from strands_client.profiling import Profiler, span
+    
+    with span("ignored"):
+        pass
+    
+    profiler = Profiler()
+    seen = []
+    profiler.add_listener(seen.append)
+    with profiler.activate():
+        with span("oauth_token"):
+            pass
+        with span("tool_call", tool="get_entity_tool"):
+            pass
+        with span("tool_call", tool="search_entities_tool"):
+            pass
+    
+    summary = profiler.summary()
+    assert set(summary) == {"oauth_token", "tool_call"}
+    assert summary["tool_call"]["count"] == 2
+    assert seen[1]["attrs"] == {"tool": "get_entity_tool"}
+    assert "oauth_token" in profiler.format_summary()
+
+
+def test_profile_run_writes_timeline_and_stacks(tmp_path):
+    """Test that --profile writes the timeline and folded stacks."""
+    import argparse
+    import json
+    import time
+    from strands_client.profiling import add_profile_arguments, profile_run, span
+    
+    parser = argparse.ArgumentParser()
+    add_profile_arguments(parser)
+    output = str(tmp_path / "profile.json")
+    args = parser.parse_args(["--profile", "--profile-stacks", "--profile-output", output])
+    
+    with profile_run(args):
+        with span("prompt"):
+            time.sleep(0.05)
+    
+    with open(output) as f:
+        data = json.load(f)
+    assert data["timeline"][0]["name"] == "prompt"
+    assert os.path.exists(output + ".folded")
+
+
+def test_call_mcp_tool_reports_tool_span():
+    """Test that MCP tool calls are routed and timed while profiling."""
+    from strands_client.profiling import Profiler
+    
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._mcp_client = Mock()
+    client._mcp_client.call_tool_sync.return_value = {"status": "success", "content": []}
+    
+    profiler = Profiler()
+    with profiler.activate():
+        assert client._intercepts_tool_calls()
+        client._call_mcp_tool("id-1", "get_entity_tool", {})
+    
+    assert not client._intercepts_tool_calls()
+    assert profiler.timeline()[0]["attrs"] == {"tool": "get_entity_tool"}
+
+
+# Session Persistence Tests
+
+def _session_messages(result_text):
+    return [
+        {"role": "user", "content": [{"text": "Find entity 1"}]},
+        {"role": "assistant", "content": [{"toolUse": {"toolUseId": "t1", "name": "get_entity_tool", "input": {"entity_id": "1"}}}]},
+        {"role": "user", "content": [{"toolResult": {"toolUseId": "t1", "status": "success", "content": [{"text": result_text}]}}]},
+        {"role": "assistant", "content": [{"text": "Done"}]},
+    ]
+
+
+@pytest.mark.parametrize("backend", ["file", "sqlite"])
+def test_session_store_roundtrip_stores_large_results_by_reference(tmp_path, backend):
+    """Test that both stores restore history and keep large tool results by reference."""
+    from strands_client.sessions import FileSessionStore, SQLiteSessionStore, pack_messages
+    
+    if backend == "file":
+        store = FileSessionStore(str(tmp_path / "sessions"), ref_threshold=100)
+    else:
+        store = SQLiteSessionStore(str(tmp_path / "sessions.db"), ref_threshold=100)
+    messages = _session_messages("x" * 500)
+    
+    packed, blobs = pack_messages(messages, 100)
+    assert len(blobs) == 1
+    assert "$ref" in packed[2]["content"][0]["toolResult"]["content"]
+    
+    store.save("s1", messages)
+    assert store.load("s1") == messages
+    assert store.load("missing") is None
+    
+    store.delete("s1")
+    assert store.load("s1") is None
+
+
+def test_session_store_bounds_size_and_evicts_idle(tmp_path):
+    """Test that old turns are trimmed to the size limit and idle sessions evicted."""
+    from strands_client.sessions import SQLiteSessionStore
+    
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), max_bytes=800)
+    messages = _session_messages("a" * 300) + _session_messages("b" * 300)
+    store.save("s1", messages)
+    
+    restored = store.load("s1")
+    assert restored == messages[4:]
+    assert restored[0]["role"] == "user" and "text" in restored[0]["content"][0]
+    
+    with pytest.raises(ValueError):
+        store.save("../escape", messages)
+    
+    assert store.evict_idle(3600) == 0
+    assert store.evict_idle(-1) == 1
+    assert store.load("s1") is None
+
+
+def test_session_store_evicts_idle_sessions_periodically(tmp_path):
+    """Test that saves evict idle sessions once the eviction interval has passed."""
+    from strands_client.sessions import FileSessionStore, SessionStore
+    
+    with pytest.raises(TypeError):
+        SessionStore()
+    
+    store = FileSessionStore(str(tmp_path), idle_ttl=60, evict_interval=3600)
+    store.save("old", _session_messages("x"))
+    os.utime(tmp_path / "old.json.gz", (0, 0))
+    
+    store.save("new", _session_messages("y"))
+    assert store.load("old") is not None
+    
+    store.evict_interval = 0
+    store.save("new", _session_messages("y"))
+    assert store.load("old") is None
+    assert store.load("new") is not None
+
+
+@patch('strands_client.client.Agent')
+def test_resume_session_rehydrates_agent(mock_agent_class, tmp_path):
+    """Test that prompts are saved and a new client resumes the conversation."""
+    from strands_client.sessions import FileSessionStore
+    
+    store = FileSessionStore(str(tmp_path))
+    messages = _session_messages("result")
+    
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._tools = [_make_tool("get_entity_tool")]
+    client._tool_selectors = {}
+    client._session_store = store
+    client.session_id = "s1"
+    client._agent = Mock(messages=messages)
+    client.process_prompt("Find entity 1")
+    
+    resumed = StrandsReltioClient.__new__(StrandsReltioClient)
+    resumed._tools = client._tools
+    resumed._tool_selectors = {}
+    resumed._session_store = store
+    resumed._agent = Mock()
+    
+    assert resumed.resume_session("s1")
+    assert mock_agent_class.call_args.kwargs["messages"] == messages
+    assert resumed.session_id == "s1"
+    assert not resumed.resume_session("missing")
+    
+    with pytest.raises(ConfigurationError):
+        StrandsReltioClient.__new__(StrandsReltioClient).resume_session("s1")
+
+
+# Worker Pool Tests
+
+def test_worker_pool_processes_prompts_and_restarts_crashed_workers(tmp_path):
+    """Test that forked workers reuse warmed tool schemas and crashed workers are restarted."""
+    from strands_client.workers import WorkerPool
+    
+    crash_marker = tmp_path / "crashed"
+    
+    class FakeClient:
+        def __init__(self, oauth_client=None, toolset=None, record_file=None, mcp_tools=None):
+            self.oauth_client = oauth_client or Mock(client_id="client")
+            self.mcp_tools = mcp_tools
+            self._tools = [Mock(mcp_tool={"name": "get_entity_tool"})]
+        
+        def process_prompt(self, prompt, toolset=None, timeout=None):
+            if prompt == "crash" and not crash_marker.exists():
+                crash_marker.write_text("1")
+                os._exit(1)
+            if prompt == "fail":
+                raise RuntimeError("boom")
+            return f"{prompt.upper()} {self.mcp_tools[0]['name']}"
+        
+        def close(self):
+            pass
+    
+    with patch('strands_client.client.StrandsReltioClient', FakeClient):
+        with WorkerPool(workers=2) as pool:
+            results = pool.map(["a", "crash", "fail", "b"])
+            metrics = pool.metrics()
+    
+    assert [r.get("response") for r in results] == ["A get_entity_tool", "CRASH get_entity_tool", None, "B get_entity_tool"]
+    assert results[2]["error"] == "RuntimeError: boom"
+    assert metrics["restarts"] == 1
+    assert metrics["completed"] == 3 and metrics["failed"] == 1
+
+
+def test_worker_pool_recycles_workers_that_exceed_the_task_timeout():
+    """Test that a hung worker is killed, its prompt fails and a new worker takes over."""
+    import time
+    from strands_client.workers import WorkerPool
+    
+    class HangingClient:
+        def __init__(self, **kwargs):
+            self.oauth_client = Mock(client_id="client")
+            self._tools = []
+        
+        def process_prompt(self, prompt, toolset=None, timeout=None):
+            if prompt == "hang":
+                time.sleep(60)
+            return prompt.upper()
+        
+        def close(self):
+            pass
+    
+    started = time.monotonic()
+    with patch('strands_client.client.StrandsReltioClient', HangingClient), \
+            patch('strands_client.workers.TASK_KILL_GRACE_SECONDS', 0):
+        with WorkerPool(workers=1, task_timeout=0.5) as pool:
+            results = pool.map(["hang", "a"])
+            metrics = pool.metrics()
+    
+    assert time.monotonic() - started < 30
+    assert results[0]["error"] == "Timed out after 0.5s"
+    assert results[1]["response"] == "A"
+    assert metrics["timeouts"] == 1 and metrics["restarts"] == 1
+
+
+# Prefetch Tests
+
+def test_load_prefetch_rules_rejects_write_tools(tmp_path):
+    """Test that prefetch rules are loaded from YAML and limited to read tools."""
+    from strands_client.prefetch import load_prefetch_rules
+    
+    rules_file = tmp_path / "prefetch.yaml"
+    rules_file.write_text(
+        "entity-summary:\n"
+        "  pattern: 'entity (?:id )?(?P<entity_id>[0-9]+)'\n"
+        "  tool: get_entity_tool\n"
+        "  arguments:\n"
+        "    entity_id: '{entity_id}'\n"
+    )
+    rules = load_prefetch_rules(str(rules_file))
+    assert rules[0].calls("Summary for entity ID 123 and entity 456") == [{"entity_id": "123"}, {"entity_id": "456"}]
+    
+    rules_file.write_text("bad:\n  pattern: 'merge (?P<id>[0-9]+)'\n  tool: merge_entities_tool\n")
+    with pytest.raises(ConfigurationError):
+        load_prefetch_rules(str(rules_file))
+
+
+def test_prefetched_results_served_to_agent_tool_calls():
+    """Test that matching agent tool calls use prefetched results and unused ones count as wasted."""
+    import re
+    from strands_client.prefetch import Prefetcher, PrefetchRule
+    
+    entity_tool = Mock(tool_name="get_entity_tool", tool_spec={
+        "name": "get_entity_tool",
+        "inputSchema": {"json": {"properties": {"entity_id": {}, "tenant_id": {}}}},
+    })
+    rule = PrefetchRule("entity", re.compile(r"entity (?P<entity_id>\d+)"), "get_entity_tool", {"entity_id": "{entity_id}"})
+    
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client.tenant_id = "test_tenant"
+    client._mcp_client = Mock()
+    client._mcp_client.call_tool_sync.return_value = {"toolUseId": "x", "status": "success", "content": [{"text": "{}"}]}
+    client._prefetcher = Prefetcher([rule], [entity_tool], client._prefetch_call, "test_tenant")
+    
+    def agent(prompt, **kwargs):
+        result = client._call_agent_tool("tool-1", "get_entity_tool", {"entity_id": "1", "tenant_id": "test_tenant"})
+        assert result["toolUseId"] == "tool-1"
+        return "done"
+    
+    client._agent = Mock(side_effect=agent)
+    assert client._intercepts_tool_calls()
+    assert client.process_prompt("Compare entity 1 with entity 2") == "done"
+    
+    metrics = client.get_metrics()["prefetch"]
+    # The agent's call was served from the prefetch, not sent to MCP again
+    assert all(call.args[0].startswith("prefetch-") for call in client._mcp_client.call_tool_sync.call_args_list)
+    assert metrics["launched"] == 2
+    assert metrics["hits"] == 1
+    assert metrics["wasted"] == 1
+    assert metrics["hit_rate"] == 0.5
+    client._prefetcher.close()
+
+
+# Direct Tool Call Tests
+
+def _direct_client():
+    import json
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client.tenant_id = "test_tenant"
+    client._argument_validators = {}
+    client._tools = [Mock(tool_name="get_entity_tool", tool_spec={
+        "name": "get_entity_tool",
+        "description": "Get an entity by ID",
+        "inputSchema": {"json": {
+            "type": "object",
+            "properties": {"entity_id": {"type": "string"}, "tenant_id": {"type": "string"}, "max_results": {"type": "integer"}},
+            "required": ["entity_id", "tenant_id"],
+        }},
+    })]
+    client._tools[0].mcp_tool.name = "get_entity_tool"
+    client._tool_names = ["get_entity_tool"]
+    client._mcp_client = Mock()
+    client._mcp_client.call_tool_sync.side_effect = lambda tool_use_id, name, arguments: {
+        "status": "success", "content": [{"text": json.dumps(arguments)}],
+    }
+    return client
+
+
+def test_call_tool_validates_and_injects_tenant():
+    """Test that direct calls validate arguments, inject the tenant and decode results."""
+    from config import ToolCallError
+    
+    client = _direct_client()
+    assert client.call_tool("get_entity_tool", entity_id="123") == {"entity_id": "123", "tenant_id": "test_tenant"}
+    
+    with pytest.raises(ToolCallError, match="max_results"):
+        client.call_tool("get_entity_tool", {"entity_id": "123", "max_results": "ten"})
+    with pytest.raises(ToolCallError, match="Unknown tool"):
+        client.call_tool("merge_entities_tool")
+    
+    client._mcp_client.call_tool_sync.side_effect = None
+    client._mcp_client.call_tool_sync.return_value = {"status": "error", "content": [{"text": "not found"}]}
+    with pytest.raises(ToolCallError, match="not found"):
+        client.call_tool("get_entity_tool", entity_id="404")
+
+
+def test_direct_calls_do_not_inherit_the_agent_turn():
+    """Test that direct calls use their own cancellation token, not the agent turn's token or prefetches."""
+    from strands_client.cancellation import CancellationToken
+    
+    client = _direct_client()
+    turn_token = CancellationToken()
+    turn_token.cancel()
+    client._cancel_token = turn_token
+    client._prefetch_batch = Mock()
+    
+    # The cancelled turn neither cancels nor serves the direct call
+    assert client.call_tool("get_entity_tool", entity_id="1")["entity_id"] == "1"
+    client._prefetch_batch.take.assert_not_called()
+    
+    own_token = CancellationToken()
+    client._mcp_client.call_tool_sync.side_effect = lambda tool_use_id, name, arguments, cancel_signal: {
+        "status": "success", "content": [{"text": str(cancel_signal is own_token.event).lower()}],
+    }
+    assert client.call_tools([("get_entity_tool", {"entity_id": "1"})], cancel_token=own_token) == [True]
+
+
+def test_generated_tool_methods_and_concurrent_calls():
+    """Test the per-tool methods generated from schemas and concurrent direct calls."""
+    import inspect
+    from config import ToolCallError
+    
+    client = _direct_client()
+    method = client.tools.get_entity_tool
+    assert list(inspect.signature(method).parameters) == ["entity_id", "max_results"]
+    assert method.__doc__ == "Get an entity by ID"
+    assert method(entity_id="1")["entity_id"] == "1"
+    
+    results = client.call_tools(
+        [("get_entity_tool", {"entity_id": str(i)}) for i in range(5)] + [("get_entity_tool", {})],
+        max_concurrency=3,
+        return_exceptions=True,
+    )
+    assert [r["entity_id"] for r in results[:5]] == ["0", "1", "2", "3", "4"]
+    assert isinstance(results[5], ToolCallError)
+
+
+# Large Result Tests
+
+def test_large_array_result_spilled_and_paged(tmp_path):
+    """Test that oversize array results are replaced by a summary and read back by page."""
+    import json
+    from strands_client.results import LargeResultHandler, ResultStore
+    
+    store = ResultStore(str(tmp_path))
+    handler = LargeResultHandler(store, threshold_chars=1000, page_items=10)
+    entities = [{"uri": f"entities/{i}", "label": f"Entity {i}"} for i in range(25)]
+    small = {"toolUseId": "t0", "status": "success", "content": [{"text": "[]"}]}
+    assert handler.process("search_entities_tool", small) is small
+    
+    result = handler.process("search_entities_tool", {"toolUseId": "t1", "status": "success", "content": [{"text": json.dumps(entities)}]})
+    summary = json.loads(result["content"][0]["text"])
+    assert summary["items"] == 25
+    assert summary["pages"] == 3
+    assert summary["preview"][0] == entities[0]
+    
+    read_result = handler.create_tool()
+    page = json.loads(read_result._func({"toolUseId": "r1", "input": {"result_handle": summary["result_handle"], "page": 2}})["content"][0]["text"])
+    assert page["first_item"] == 20
+    assert page["items"] == entities[20:]
+    
+    missing = read_result._func({"toolUseId": "r2", "input": {"result_handle": "res-unknown"}})
+    assert missing["status"] == "error"
+    assert handler.metrics()["spilled"] == 1
+    
+    # Pages never exceed the spill threshold; a cut page says where to continue
+    wide = [{"uri": f"entities/{i}", "label": "x" * 300} for i in range(12)]
+    result = handler.process("search_entities_tool", {"toolUseId": "t2", "status": "success", "content": [{"text": json.dumps(wide)}]})
+    handle = json.loads(result["content"][0]["text"])["result_handle"]
+    page = json.loads(read_result._func({"toolUseId": "r3", "input": {"result_handle": handle}})["content"][0]["text"])
+    assert page["items"] == wide[:3]
+    assert page["next_item"] == 3
+    page = json.loads(read_result._func({"toolUseId": "r4", "input": {"result_handle": handle, "first_item": 3}})["content"][0]["text"])
+    assert page["first_item"] == 3 and page["items"] == wide[3:6]
+    huge = store.read_page(handle, 0, 10, 100)
+    assert huge["items"][0].endswith("...") and len(huge["items"][0]) == 103
+
+
+def test_large_text_result_paged_by_chars_and_store_bounded(tmp_path):
+    """Test character paging of non-array payloads and eviction of the oldest results."""
+    import json
+    from strands_client.results import LargeResultHandler, ResultStore
+    
+    store = ResultStore(str(tmp_path), max_bytes=2000)
+    handler = LargeResultHandler(store, threshold_chars=100, page_chars=600)
+    graph = json.dumps({"relations": [{"id": i} for i in range(100)], "total": 100})
+    
+    result = handler.process("get_entity_graph_tool", {"status": "success", "content": [{"text": graph}]})
+    summary = json.loads(result["content"][0]["text"])
+    assert summary["structure"] == {"relations": "array[100]", "total": "int"}
+    assert store.read_page(summary["result_handle"], 1, 50, 600)["text"] == graph[600:1200]
+    
+    handler.process("get_entity_graph_tool", {"status": "success", "content": [{"text": graph}]})
+    assert store.info(summary["result_handle"]) is None
+    
+    store.close()
+    assert os.listdir(str(tmp_path)) == []
+
+
+# Memory Footprint Tests
+
+def test_slim_history_minifies_truncates_and_trims_metrics():
+    """Test that history slimming compacts tool results and per-cycle metrics."""
+    from types import SimpleNamespace
+    from strands_client.memory import slim_history
+    
+    def result(text):
+        return {"role": "user", "content": [{"toolResult": {"toolUseId": "t", "status": "success", "content": [{"text": text}]}}]}
+    
+    old_text = "x" * 500
+    new_text = '{\n  "entity": {\n    "id": "123"\n  }\n}'
+    agent = SimpleNamespace(
+        messages=[{"role": "user", "content": [{"text": "hi"}]}, result(old_text), result(new_text)],
+        event_loop_metrics=SimpleNamespace(traces=list(range(10)), cycle_durations=list(range(10)), agent_invocations=[]),
+    )
+    
+    saved = slim_history(agent, turn_start=2, max_old_result_chars=100)
+    
+    assert agent.messages[2]["content"][0]["toolResult"]["content"][0]["text"] == '{"entity":{"id":"123"}}'
+    truncated = agent.messages[1]["content"][0]["toolResult"]["content"][0]["text"]
+    assert len(truncated) == 100 and truncated.endswith("[truncated]")
+    assert saved == len(old_text) - 100 + len(new_text) - len('{"entity":{"id":"123"}}')
+    assert agent.event_loop_metrics.traces == [8, 9]
+    assert agent.event_loop_metrics.cycle_durations == [8, 9]
+    # Already slimmed history is left unchanged
+    assert slim_history(agent, turn_start=3, max_old_result_chars=100) == 0
+
+    # The turn is found by the message before it, even after the front was trimmed
+    from strands_client.memory import find_turn_start
+    last_before_turn = agent.messages[1]
+    assert find_turn_start(agent.messages[1:], last_before_turn) == 1
+    assert find_turn_start(agent.messages[2:], last_before_turn) == 0
+    assert find_turn_start(agent.messages, None) == 0
+
+
+def test_memory_profiler_reports_components():
+    """Test that memory snapshots are grouped by component with history size."""
+    from strands_client.memory import MemoryProfiler, component_of
+    
+    assert component_of("/venv/lib/python3.11/site-packages/strands/agent/agent.py") == "strands"
+    assert component_of("/src/strands_client/client.py") == "client"
+    assert component_of("/venv/lib/python3.11/site-packages/httpx/_client.py") == "transport"
+    
+    profiler = MemoryProfiler()
+    try:
+        profiler.snapshot("ready", [])
+        messages = [{"role": "user", "content": [{"text": "hello"}]}]
+        entry = profiler.snapshot("turn 1", messages)
+        report = profiler.report()
+    finally:
+        profiler.stop()
+    
+    assert entry["history_messages"] == 1
+    assert entry["by_component"]
+    assert report["snapshots"] == 2
+    assert report["history_chars"] == len('[{"role":"user","content":[{"text":"hello"}]}]')
+
+
+@patch('strands_client.client.config')
+def test_close_stops_memory_tracing(mock_config, tmp_path):
+    """Test that closing the client writes the memory report and stops tracing."""
+    import json
+    import threading
+    import tracemalloc
+    from strands_client.memory import MemoryProfiler
+    
+    if tracemalloc.is_tracing():
+        pytest.skip("tracemalloc is already on")
+    mock_config.memory_profile_output = str(tmp_path / "memory.json")
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._connection_started = True
+    client._mcp_client = Mock()
+    client._session_lock = threading.Lock()
+    client._memory_profiler = MemoryProfiler()
+    client._memory_profiler.snapshot("ready", [])
+    assert tracemalloc.is_tracing()
+    
+    client.close()
+    
+    assert not tracemalloc.is_tracing()
+    assert len(json.loads((tmp_path / "memory.json").read_text())["snapshots"]) == 1
+
+
+def test_idle_session_memory_with_shared_tool_registry():
+    """Benchmark: agents share tool wrappers and stay under the per-session memory target."""
+    import gc
+    import tracemalloc
+    from strands import Agent
+    from strands_client.rate_limit import RateLimiterRegistry
+    from strands_client.recording import ReplayModel, TrafficRecording
+    from strands_client.tools import ClientTool
+    
+    def spec(i):
+        properties = {f"p{j}": {"type": "string", "description": "Entity attribute " * 5} for j in range(6)}
+        return {"name": f"tool_{i}", "description": "Retrieve entity details " * 10, "inputSchema": {"json": {"type": "object", "properties": properties}}}
+    
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._tools = [ClientTool(f"tool_{i}", spec(i), lambda tool_use: {}) for i in range(60)]
+    client._rate_limiters = RateLimiterRegistry(1, 1, 1, 1, max_concurrency=1)
+    model = ReplayModel(TrafficRecording([]))
+    
+    first = client._agent_tools(client._tools)
+    assert client._agent_tools(client._tools)[0] is first[0]
+    
+    sessions = 30
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        gc.collect()
+        baseline = tracemalloc.get_traced_memory()[0]
+        agents = [
+            Agent(tools=client._agent_tools(client._tools), model=model, system_prompt="You are helpful")
+            for _ in range(sessions)
+        ]
+        gc.collect()
+        per_session = (tracemalloc.get_traced_memory()[0] - baseline) / sessions
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    
+    assert len(agents) == sessions
+    assert per_session < 20_000, f"{per_session:.0f} bytes per idle session"
+
+
+# Cancellation Tests
+
+def test_cancellation_token_deadline_and_first_reason_wins():
+    """Test that a deadline cancels the token and later reasons are ignored."""
+    import time
+    from strands_client.cancellation import CancellationToken
+    
+    token = CancellationToken(timeout=0.05)
+    assert not token.cancelled and 0 < token.remaining() <= 0.05
+    assert token.event.wait(2)
+    assert token.reason == "deadline"
+    assert token.cancel("interrupted") is False
+    assert token.reason == "deadline"
+    
+    token = CancellationToken(timeout=0.05)
+    token.close()
+    time.sleep(0.1)
+    assert not token.cancelled
+
+
+def test_cancellable_model_aborts_in_flight_stream():
+    """Test that a cancelled invocation aborts a model stream waiting on the provider."""
+    import asyncio
+    import threading
+    import time
+    from strands_client.cancellation import CancellationStats
+    
+    closed = []
+    
+    class HangingModel:
+        async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+            try:
+                yield {"messageStart": {"role": "assistant"}}
+                await asyncio.sleep(30)
+                yield {"messageStop": {"stopReason": "end_turn"}}
+            finally:
+                closed.append(True)
+    
+    stats = CancellationStats()
+    model = CancellableModel(HangingModel(), stats, poll_interval=0.01)
+    cancel_signal = threading.Event()
+    threading.Timer(0.05, cancel_signal.set).start()
+    
+    async def collect():
+        return [event async for event in model.stream([], cancel_signal=cancel_signal)]
+    
+    started = time.monotonic()
+    events = asyncio.run(collect())
+    
+    assert events == [{"messageStart": {"role": "assistant"}}]
+    assert time.monotonic() - started < 2
+    assert closed == [True]
+    assert stats.metrics()["model_streams_cancelled"] == 1
+
+
+def test_process_prompt_deadline_cancels_turn_and_mcp_calls():
+    """Test that a deadline propagates to the agent and in-flight MCP calls."""
+    from config import PromptCancelledError
+    from strands_client.cancellation import CancellationStats
+    
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._cancel_stats = CancellationStats()
+    client._mcp_client = Mock()
+    
+    def call_tool_sync(tool_use_id, name, arguments, cancel_signal=None, read_timeout_seconds=None):
+        assert read_timeout_seconds.total_seconds() <= 0.1
+        cancel_signal.wait(2)
+        return {"toolUseId": tool_use_id, "status": "error", "content": [{"text": "cancelled"}]}
+    
+    client._mcp_client.call_tool_sync.side_effect = call_tool_sync
+    
+    def agent(prompt, cancel_signal):
+        client._call_agent_tool("t1", "get_entity_tool", {"entity_id": "1"})
+        return "partial"
+    
+    client._agent = Mock(side_effect=agent, messages=[])
+    
+    with pytest.raises(PromptCancelledError, match="deadline"):
+        client.process_prompt("Get entity 1", timeout=0.1)
+    
+    metrics = client.get_metrics()["cancellation"]
+    assert metrics["by_reason"] == {"deadline": 1}
+    assert metrics["mcp_calls_cancelled"] == 1
+    assert metrics["stop_max_seconds"] < 1
+    assert client._cancel_token is None
+    # Direct calls outside a turn are not cancellable
+    assert client.cancel() is False
+
+
+def test_cancel_stops_prompt_in_progress():
+    """Test that cancel() from another thread stops the current prompt."""
+    import threading
+    from config import PromptCancelledError
+    from strands_client.cancellation import CancellationStats
+    
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._cancel_stats = CancellationStats()
+    started = threading.Event()
+    
+    def agent(prompt, cancel_signal):
+        started.set()
+        cancel_signal.wait(2)
+        return "stopped"
+    
+    client._agent = Mock(side_effect=agent)
+    threading.Thread(target=lambda: started.wait(2) and client.cancel("disconnected")).start()
+    
+    with pytest.raises(PromptCancelledError, match="disconnected"):
+        client.process_prompt("Long running request")
+    assert client.get_metrics()["cancellation"]["by_reason"] == {"disconnected": 1}
+
+
+@patch('builtins.input', side_effect=['long request', 'quit'])
+def test_chat_cancelled_turn_keeps_session(mock_input, capsys):
+    """Test that a cancelled turn does not end the chat session."""
+    from config import PromptCancelledError
+    from strands_client.chat import run_interactive_chat
+    
+    mock_client = Mock(session_id=None)
+    mock_client.process_prompt.side_effect = PromptCancelledError("Prompt interrupted")
+    
+    with patch('strands_client.client.StrandsReltioClient', return_value=mock_client):
+        assert run_interactive_chat() == 0
+    
+    output = capsys.readouterr().out
+    assert "Request cancelled" in output
+    assert "Goodbye" in output
+
+
+# Load Test Tests
+
+def test_loadtest_percentiles_and_saturation():
+    """Test latency percentiles and saturation detection across stages."""
+    from strands_client.loadtest import find_saturation, percentile, summarize
+    
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile(values, 99) == pytest.approx(99.01)
+    assert summarize([])["p95"] == 0.0
+    
+    def stage(name, rps, p95, error_rate=0.0, target=None):
+        return {"stage": name, "throughput_rps": rps, "latency": {"p95": p95}, "error_rate": error_rate, "target_rps": target}
+    
+    assert find_saturation([stage("c=1", 5, 1.0), stage("c=2", 9.5, 1.1)]) is None
+    saturated = find_saturation([stage("c=1", 5, 1.0), stage("c=2", 9.5, 1.1), stage("c=4", 10, 2.0)])
+    assert saturated["stage"] == "c=4"
+    assert find_saturation([stage("c=1", 5, 1.0, error_rate=0.2)])["stage"] == "c=1"
+    assert find_saturation([stage("rps=10", 6, 1.0, target=10)])["stage"] == "rps=10"
+
+
+def test_loadtest_splits_latency_by_phase_and_counts_errors():
+    """Test that request phases come from client spans and failures are reported."""
+    import time
+    from strands_client.loadtest import LoadTest
+    from strands_client.profiling import span
+    
+    def process_prompt(prompt):
+        with span("model_call"):
+            time.sleep(0.02)
+        with span("tool_call", tool="get_entity_tool"):
+            time.sleep(0.01)
+        if prompt == "fail":
+            raise RuntimeError("boom")
+        return "ok"
+    
+    def make_client():
+        client = Mock()
+        client.process_prompt.side_effect = process_prompt
+        return client
+    
+    test = LoadTest(["ok", "ok", "ok", "fail"], make_client, requests=8)
+    report = test.run(concurrency_levels=[1, 2])
+    resets = sum(client.reset_conversation.call_count for client in test._clients)
+    test.close()
+    
+    assert resets == 16
+    assert set(report["stages"][0]["phases"]) == {"model", "tool", "other"}
+    
+    assert report["startup"]["clients"] == 2
+    first = report["stages"][0]
+    assert first["requests"] == 8
+    assert first["errors_by_type"] == {"RuntimeError": 2}
+    assert first["error_rate"] == 0.25
+    assert first["phases"]["model"]["p50"] >= 0.02
+    assert 0.01 <= first["phases"]["tool"]["p50"] < first["phases"]["model"]["p50"]
+    assert first["latency"]["p50"] >= first["phases"]["model"]["p50"] + first["phases"]["tool"]["p50"]
+    assert report["saturation"]["stage"] == "concurrency=1"
+
+
+def test_loadtest_runs_client_against_synthetic_traffic(monkeypatch):
+    """Test a real client against the local MCP and model stand-ins."""
+    from config import config
+    from strands_client.loadtest import LoadTest, SyntheticTraffic
+    
+    monkeypatch.setattr(config, "mcp_endpoint", "http://localhost/mcp-mock")
+    monkeypatch.setattr(config, "reltio_tenant_id", "mock-tenant")
+    traffic = SyntheticTraffic(model_latency=0, tool_latency=0, tool_calls=2)
+    
+    test = LoadTest(["Get entity 1"], lambda: StrandsReltioClient(traffic=traffic), requests=3)
+    try:
+        report = test.run(concurrency_levels=[1])
+        client = test._clients[0]
+        assert sorted(client._tool_names) == ["get_entity_tool", "search_entities_tool"]
+        tool_results = [
+            block for message in client._agent.messages for block in message["content"] if "toolResult" in block
+        ]
+    finally:
+        test.close()
+    
+    stage = report["stages"][0]
+    assert stage["requests"] == 3 and stage["errors"] == 0
+    # History is reset between prompts, so the last turn holds its own two tool calls
+    assert len(tool_results) == 2
+
+
+@patch('strands_client.client.Agent')
+def test_reset_conversation_starts_a_new_session(mock_agent_class, tmp_path):
+    """Test that resetting clears the history and moves persistence to a new session."""
+    from strands_client.sessions import FileSessionStore
+    
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._session_store = FileSessionStore(str(tmp_path))
+    client.session_id = "s1"
+    client._agent = Mock(messages=_session_messages("result"))
+    
+    client.reset_conversation()
+    
+    assert client._agent.messages == []
+    assert client.session_id != "s1"
+
+
+# Scheduler Tests
+
+def _queue_in_order(scheduler, requests, admitted):
+    """Start one thread per (priority, tenant) request, each queued before the next starts."""
+    import threading
+    import time
+    
+    def run(priority, tenant):
+        ticket = scheduler.acquire(priority, tenant)
+        admitted.append((priority, tenant))
+        scheduler.release(ticket)
+    
+    threads = []
+    for count, (priority, tenant) in enumerate(requests, start=1):
+        thread = threading.Thread(target=run, args=(priority, tenant))
+        thread.start()
+        threads.append(thread)
+        while sum(c["queued"] for c in scheduler.metrics()["classes"].values()) < count:
+            time.sleep(0.001)
+    return threads
+
+
+def test_scheduler_serves_interactive_first_within_class_limits():
+    """Test that interactive turns overtake queued batch turns and batch stays under its limit."""
+    from strands_client.scheduling import FairScheduler
+    
+    scheduler = FairScheduler(max_concurrency=2, class_limits={"batch": 1})
+    running_batch = scheduler.acquire("batch", "tenant-a")
+    holder = scheduler.acquire("interactive", "tenant-a")
+    admitted = []
+    threads = _queue_in_order(scheduler, [("batch", "tenant-a"), ("batch", "tenant-a"), ("interactive", "tenant-b")], admitted)
+    
+    scheduler.release(holder)
+    for thread in threads[2:]:
+        thread.join(2)
+    # The free slot goes to the interactive turn; batch is at its class limit
+    assert admitted == [("interactive", "tenant-b")]
+    assert scheduler.metrics()["classes"]["batch"]["queued"] == 2
+    
+    scheduler.release(running_batch)
+    for thread in threads:
+        thread.join(2)
+    metrics = scheduler.metrics()["classes"]
+    assert metrics["batch"]["admitted"] == 3 and metrics["interactive"]["admitted"] == 2
+    assert metrics["batch"]["queue_wait_max_seconds"] > 0
+
+
+def test_scheduler_weighted_fair_queuing_across_tenants():
+    """Test that a tenant's backlog is interleaved with other tenants by weight."""
+    from strands_client.scheduling import FairScheduler, parse_tenant_weights
+    
+    weights = parse_tenant_weights("tenant-a:2, tenant-b:1")
+    assert weights == {"tenant-a": 2.0, "tenant-b": 1.0}
+    with pytest.raises(ConfigurationError):
+        parse_tenant_weights("tenant-a")
+    
+    scheduler = FairScheduler(max_concurrency=1, tenant_weights=weights)
+    holder = scheduler.acquire("batch", "tenant-c")
+    admitted = []
+    threads = _queue_in_order(scheduler, [("batch", "tenant-a")] * 4 + [("batch", "tenant-b")] * 2, admitted)
+    scheduler.release(holder)
+    for thread in threads:
+        thread.join(2)
+    
+    order = [tenant for _, tenant in admitted]
+    # FIFO would serve all of tenant-a first; tenant-b gets one slot in every three
+    assert order == ["tenant-a", "tenant-b", "tenant-a", "tenant-a", "tenant-b", "tenant-a"]
+    assert scheduler.metrics()["admitted_by_tenant"] == {"tenant-c": 1, "tenant-a": 4, "tenant-b": 2}
+
+
+def test_scheduler_does_not_charge_tenants_for_abandoned_turns():
+    """Test that turns abandoned in the queue do not push back the tenant's later turns."""
+    from strands_client.cancellation import CancellationToken
+    from strands_client.scheduling import FairScheduler
+    
+    scheduler = FairScheduler(max_concurrency=1)
+    holder = scheduler.acquire("batch", "tenant-c")
+    cancelled = CancellationToken()
+    cancelled.cancel()
+    for _ in range(3):
+        assert scheduler.acquire("batch", "tenant-a", cancelled) is None
+    assert scheduler._finish_tags[("batch", "tenant-a")] == 0.0
+    
+    admitted = []
+    threads = _queue_in_order(scheduler, [("batch", "tenant-a"), ("batch", "tenant-b")], admitted)
+    scheduler.release(holder)
+    for thread in threads:
+        thread.join(2)
+    
+    # Charged for the abandoned turns, tenant-a would queue behind tenant-b
+    assert [tenant for _, tenant in admitted] == ["tenant-a", "tenant-b"]
+    assert scheduler.metrics()["classes"]["batch"]["cancelled"] == 3
+
+
+def test_process_prompt_queued_turn_honors_deadline():
+    """Test that prompts wait for a scheduler slot and give up at their deadline."""
+    from config import PromptCancelledError
+    from strands_client.cancellation import CancellationStats
+    from strands_client.scheduling import FairScheduler
+    
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client.tenant_id = "tenant-a"
+    client._cancel_stats = CancellationStats()
+    client._scheduler = FairScheduler(max_concurrency=1)
+    client._agent = Mock(return_value="done")
+    
+    assert client.process_prompt("Get entity 1", priority="batch") == "done"
+    
+    holder = client._scheduler.acquire("interactive", "tenant-b")
+    with pytest.raises(PromptCancelledError, match="deadline"):
+        client.process_prompt("Get entity 2", timeout=0.05)
+    client._scheduler.release(holder)
+    
+    metrics = client.get_metrics()
+    assert client._agent.call_count == 1
+    assert metrics["scheduler"]["classes"]["batch"]["admitted"] == 1
+    assert metrics["scheduler"]["classes"]["interactive"]["cancelled"] == 1
+    assert metrics["scheduler"]["classes"]["interactive"]["running"] == 0
+    assert metrics["cancellation"]["by_reason"] == {"deadline": 1}
+
+
+# Health Watchdog Tests
+
+def test_watchdog_replaces_degraded_session_and_expiring_token():
+    """Test that repeated probe failures and a token due for refresh trigger a standby swap."""
+    from strands_client.watchdog import HealthWatchdog
+    
+    statuses = ["healthy", "unhealthy", "unhealthy", "healthy", "unhealthy", "unhealthy"]
+    reconnect = Mock(side_effect=[None, ConnectionError("standby down")])
+    expires_in = [600.0]
+    watchdog = HealthWatchdog(
+        probe=lambda: {"status": statuses.pop(0)},
+        reconnect=reconnect,
+        token_expires_in=lambda: expires_in[0],
+        failure_threshold=2,
+    )
+    assert watchdog.last_health == {"status": "unknown"}
+    
+    assert watchdog.check()["status"] == "healthy"
+    assert watchdog.check()["consecutive_failures"] == 1
+    assert reconnect.call_count == 0
+    health = watchdog.check()
+    assert reconnect.call_count == 1
+    assert health["status"] == "healthy"
+    assert health["reconnects"] == 1
+    assert health["consecutive_failures"] == 0
+    
+    expires_in[0] = -1.0
+    watchdog.check()
+    assert reconnect.call_count == 2
+    assert watchdog.last_health["status"] == "healthy"
+    
+    metrics = watchdog.metrics()
+    assert metrics["probes"] == 4
+    assert metrics["failed_probes"] == 2
+    assert metrics["reconnects"] == 1
+    assert metrics["reconnect_failures"] == 1
+
+
+@patch('strands_client.client.config')
+@patch('strands_client.client.Agent')
+def test_standby_session_swapped_in_and_health_cached(mock_agent_class, mock_config):
+    """Test that the agent moves to the standby session at its next turn and health is served from memory."""
+    import threading
+    import time
+    from strands_client.watchdog import HealthWatchdog
+    
+    mock_config.health_watchdog_probe_timeout = 5
+    ok = {"content": [{"text": '{"status": "ok"}'}]}
+    old_session = Mock()
+    old_session.call_tool_sync.side_effect = RuntimeError("session expired")
+    standby = Mock()
+    standby.call_tool_sync.return_value = ok
+    standby_tools = [_make_tool("get_entity_tool")]
+    
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._session_lock = threading.Lock()
+    client._mcp_client = old_session
+    client._tools = [_make_tool("get_entity_tool")]
+    client._tool_selectors = {}
+    client.oauth_client = Mock(token_expires_in=Mock(return_value=3000.0))
+    client._agent = Mock(return_value="done", messages=[{"role": "user", "content": [{"text": "hi"}]}])
+    client._connect_mcp = Mock(return_value=(standby, standby_tools))
+    client._watchdog = HealthWatchdog(
+        probe=lambda: client._probe_mcp(client._mcp_client, 5),
+        reconnect=client._swap_in_standby,
+        token_expires_in=client._session_token_expires_in,
+        failure_threshold=1,
+    )
+    
+    client._watchdog.check()
+    assert client._mcp_client is standby
+    assert client._tools is standby_tools
+    assert client._standby_pending
+    standby.call_tool_sync.assert_called_once_with(ANY, "health_check", {}, read_timeout_seconds=ANY)
+    
+    # Served from the last probe without another MCP call
+    health = client.health_check()
+    assert health["status"] == "healthy"
+    assert health["reconnects"] == 1
+    assert standby.call_tool_sync.call_count == 1
+    assert client.health_check(live=True) == {"status": "healthy"}
+    
+    old_agent = client._agent
+    assert client.process_prompt("Get entity 1") == str(mock_agent_class.return_value.return_value)
+    assert mock_agent_class.call_args.kwargs["tools"] == standby_tools
+    assert mock_agent_class.call_args.kwargs["messages"] is old_agent.messages
+    assert not client._standby_pending
+    for _ in range(100):
+        if old_session.stop.called:
+            break
+        time.sleep(0.01)
+    old_session.stop.assert_called_once_with(None, None, None)
+    assert client.get_metrics()["health"]["reconnects"] == 1
+
+
+# Call Coalescing Tests
+
+def _coalescing_client(mcp_client):
+    from strands_client.coalescing import SingleFlight
+    
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client.mcp_endpoint = "https://dev.reltio.com/ai/tools/mcp/"
+    client.tenant_id = "test_tenant"
+    client.oauth_client = Mock(client_id="test_client")
+    client._mcp_client = mcp_client
+    client._single_flight = SingleFlight(poll_interval=0.01)
+    return client
+
+
+def test_concurrent_identical_read_calls_are_coalesced():
+    """Test that identical concurrent read calls share one MCP request and writes never do."""
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    
+    def call_tool_sync(tool_use_id, name, arguments):
+        time.sleep(0.2)
+        return {"toolUseId": tool_use_id, "status": "success", "content": [{"text": f"{name}:{arguments}"}]}
+    
+    mcp_client = Mock()
+    mcp_client.call_tool_sync.side_effect = call_tool_sync
+    client = _coalescing_client(mcp_client)
+    calls = [
+        ("get_entity_tool", {"entity_id": "1", "tenant_id": "test_tenant"}),
+        ("get_entity_tool", {"tenant_id": "test_tenant", "entity_id": "1"}),
+        ("get_entity_tool", {"entity_id": "1", "tenant_id": "test_tenant"}),
+        ("get_entity_tool", {"entity_id": "2", "tenant_id": "test_tenant"}),
+        ("update_entity_tool", {"entity_id": "1"}),
+        ("update_entity_tool", {"entity_id": "1"}),
+    ]
+    start = threading.Barrier(len(calls))
+    
+    def run(index):
+        start.wait()
+        return client._call_mcp_tool(f"use-{index}", *calls[index])
+    
+    with ThreadPoolExecutor(len(calls)) as pool:
+        results = list(pool.map(run, range(len(calls))))
+    
+    assert mcp_client.call_tool_sync.call_count == 4
+    assert [result["toolUseId"] for result in results] == [f"use-{i}" for i in range(len(calls))]
+    assert results[0]["content"] == results[1]["content"] == results[2]["content"]
+    assert results[1]["content"] is not results[2]["content"]
+    metrics = client.get_metrics()["coalescing"]
+    assert metrics["calls"] == 2
+    assert metrics["coalesced"] == 2
+    assert metrics["coalesced_by_tool"] == {"get_entity_tool": 2}
+    assert metrics["in_flight"] == 0
+    
+    # Finished calls are not cached
+    client._call_mcp_tool("use-7", *calls[0])
+    assert mcp_client.call_tool_sync.call_count == 5
+
+
+def test_coalesced_call_not_shared_when_leader_cancelled():
+    """Test that a waiting call runs on its own when the shared call was cut short by cancellation."""
+    import threading
+    import time
+    from strands_client.cancellation import CancellationToken
+    
+    leader_started = threading.Event()
+    
+    def call_tool_sync(tool_use_id, name, arguments, **kwargs):
+        if tool_use_id == "leader":
+            leader_started.set()
+            kwargs["cancel_signal"].wait(1)
+            return {"toolUseId": tool_use_id, "status": "error", "content": [{"text": "cancelled"}]}
+        return {"toolUseId": tool_use_id, "status": "success", "content": [{"text": "entity"}]}
+    
+    mcp_client = Mock()
+    mcp_client.call_tool_sync.side_effect = call_tool_sync
+    client = _coalescing_client(mcp_client)
+    key = ("get_entity_tool", {"entity_id": "1"})
+    token = CancellationToken()
+    
+    thread = threading.Thread(target=lambda: client._call_mcp_tool_limited("leader", *key, token))
+    thread.start()
+    leader_started.wait(1)
+    results = []
+    follower = threading.Thread(target=lambda: results.append(client._call_mcp_tool_limited("follower", *key)))
+    follower.start()
+    time.sleep(0.05)
+    token.cancel()
+    thread.join(2)
+    follower.join(2)
+    
+    assert results[0]["status"] == "success"
+    metrics = client._single_flight.metrics()
+    assert metrics["coalesced"] == 1
+    assert metrics["fallbacks"] == 1
+
+
+def test_cancelled_coalesced_waiter_does_not_call_the_server():
+    """Test that a waiting call whose turn is cancelled gives up without a call of its own."""
+    import threading
+    import time
+    import pytest
+    from config import PromptCancelledError
+    from strands_client.cancellation import CancellationToken
+    from strands_client.coalescing import SingleFlight
+    
+    release = threading.Event()
+    leader_started = threading.Event()
+    
+    def call_tool_sync(tool_use_id, name, arguments, **kwargs):
+        leader_started.set()
+        release.wait(2)
+        return {"toolUseId": tool_use_id, "status": "success", "content": [{"text": "entity"}]}
+    
+    mcp_client = Mock()
+    mcp_client.call_tool_sync.side_effect = call_tool_sync
+    client = _coalescing_client(mcp_client)
+    key = ("get_entity_tool", {"entity_id": "1"})
+    
+    leader = threading.Thread(target=lambda: client._call_mcp_tool_limited("leader", *key))
+    leader.start()
+    leader_started.wait(1)
+    token = CancellationToken()
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(client._call_mcp_tool_limited("waiter", *key, token)))
+    waiter.start()
+    token.cancel("disconnected")
+    waiter.join(2)
+    release.set()
+    leader.join(2)
+    
+    assert results == [{
+        "status": "error",
+        "toolUseId": "waiter",
+        "content": [{"text": "Tool execution cancelled (disconnected)"}],
+        "cancelled": True,
+    }]
+    assert mcp_client.call_tool_sync.call_count == 1
+    assert client._single_flight.metrics()["fallbacks"] == 0
+    
+    # Without a cancelled outcome the waiter raises
+    hold = threading.Event()
+    flight = SingleFlight(poll_interval=0.01)
+    first = threading.Thread(target=flight.call, args=("key", lambda: hold.wait(2)))
+    first.start()
+    while not flight.metrics()["in_flight"]:
+        time.sleep(0.01)
+    event = threading.Event()
+    event.set()
+    with pytest.raises(PromptCancelledError):
+        flight.call("key", lambda: "own call", cancel_event=event)
+    hold.set()
+    first.join(2)
+
+
+# Tool Schema Compaction Tests
+
+def _verbose_tool(name):
+    address = {
+        "type": "object",
+        "title": "Address",
+        "description": "A postal address. Street, city and country are matched separately.",
+        "properties": {
+            "street": {"type": "string", "description": "Street line including the house number"},
+            "city": {"type": "string", "x-reltio-attribute": "City"},
+            "country": {"type": "string", "enum": [f"C{i:02d}" for i in range(40)]},
+        },
+    }
+    return Mock(tool_name=name, tool_spec={
+        "name": name,
+        "description": "Search entities by attributes. " + "Returns matching entities with all attributes. " * 10,
+        "inputSchema": {"json": {
+            "type": "object",
+            "properties": {
+                "home": address,
+                "work": address,
+                "tenant_id": {"type": "string", "examples": ["tenant"], "description": "Tenant ID"},
+            },
+            "required": ["tenant_id"],
+        }},
+    })
+
+
+def test_compact_tool_spec_strips_deduplicates_and_shortens_enums():
+    """Test that compaction keeps the schema meaning in far fewer tokens."""
+    import copy
+    from strands_client.schemas import compact_tool_spec, context_window, tool_block_tokens
+    
+    spec = _verbose_tool("search_entities_tool").tool_spec
+    original = copy.deepcopy(spec)
+    compacted = compact_tool_spec(spec, description_chars=160, max_enum=10)
+    
+    assert spec == original
+    assert compacted["description"] == "Search entities by attributes."
+    schema = compacted["inputSchema"]["json"]
+    assert schema["properties"]["home"] == schema["properties"]["work"] == {"$ref": "#/$defs/home"}
+    address = schema["$defs"]["home"]
+    assert "title" not in address
+    assert address["description"] == "A postal address."
+    assert "x-reltio-attribute" not in address["properties"]["city"]
+    assert "enum" not in address["properties"]["country"]
+    assert address["properties"]["country"]["description"].startswith("One of 40 values, e.g. C00, C01")
+    assert schema["properties"]["tenant_id"] == {"type": "string", "description": "Tenant ID"}
+    assert schema["required"] == ["tenant_id"]
+    assert tool_block_tokens([compacted]) < tool_block_tokens([spec]) / 2
+    
+    assert context_window("gpt-4") == 8192
+    assert context_window("gpt-4o-mini") == 128000
+    assert context_window("claude-3-5-haiku-20241022") == 200000
+    assert context_window("gpt-4", override=32000) == 32000
+
+
+def test_compact_schema_keeps_definitions_named_like_keywords():
+    """Test that names in $defs and other name-to-schema maps are not taken for keywords."""
+    from strands_client.schemas import compact_schema
+    
+    schema = compact_schema({
+        "type": "object",
+        "$defs": {"title": {"type": "string", "title": "Title"}},
+        "definitions": {"example": {"type": "integer", "examples": [1]}},
+        "patternProperties": {"^x-": {"type": "string"}},
+        "dependentSchemas": {"title": {"required": ["name"]}},
+        "properties": {"title": {"$ref": "#/$defs/title"}},
+    })
+    
+    assert schema["$defs"] == {"title": {"type": "string"}}
+    assert schema["definitions"] == {"example": {"type": "integer"}}
+    assert schema["patternProperties"] == {"^x-": {"type": "string"}}
+    assert schema["dependentSchemas"] == {"title": {"required": ["name"]}}
+    assert schema["properties"] == {"title": {"$ref": "#/$defs/title"}}
+
+
+@patch('strands_client.client.config')
+def test_tool_schemas_compacted_when_over_model_budget(mock_config, caplog):
+    """Test that tool blocks over the model input budget are compacted in auto mode and reported in warn mode."""
+    mock_config.get_preferred_model_provider.return_value = "openai"
+    mock_config.model_id = "gpt-4"
+    mock_config.model_max_tokens = 4096
+    mock_config.model_context_window = 0
+    mock_config.tool_schema_budget_fraction = 0.25
+    mock_config.tool_description_max_chars = 160
+    mock_config.tool_schema_max_enum = 10
+    tools = [_verbose_tool(f"search_{i}_tool") for i in range(6)]
+    
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._schema_compaction = "warn"
+    with caplog.at_level(logging.WARNING):
+        assert client._agent_tools(tools) is tools
+    report = client.get_metrics()["tool_schema"]
+    assert report["budget_tokens"] == 1024
+    assert report["tokens"] > 1024
+    assert not report["compacted"]
+    assert "TOOL_SCHEMA_COMPACTION=auto" in caplog.text
+    
+    client._schema_compaction = "auto"
+    client._tool_schema_key = None
+    agent_tools = client._agent_tools(tools)
+    report = client.get_metrics()["tool_schema"]
+    assert report["compacted"]
+    assert report["compacted_tokens"] < report["budget_tokens"]
+    assert [tool.tool_name for tool in agent_tools] == [tool.tool_name for tool in tools]
+    assert agent_tools[0].tool_spec["description"] == "Search entities by attributes."
+    assert client._agent_tools(tools)[0] is agent_tools[0]
+    
+    # A model with room for the full schemas gets them back
+    mock_config.model_id = "gpt-4.1"
+    assert client._agent_tools(tools) is tools
+
+
+# Local Model Provider Tests
+
+@patch('strands_client.client.config')
+@patch('strands_client.client.OpenAIModel')
+def test_local_provider_uses_openai_compatible_endpoint(mock_openai_model, mock_config):
+    """Test that the local provider points the OpenAI model at the configured server."""
+    mock_config.local_model_base_url = "http://localhost:8080/v1"
+    mock_config.local_model_api_key = ""
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    
+    model = client._create_provider_model("local", "qwen2.5-7b-instruct", 0.2, 1024)
+    
+    assert model is mock_openai_model.return_value
+    mock_openai_model.assert_called_once_with(
+        client_args={"api_key": "local", "base_url": "http://localhost:8080/v1"},
+        model_id="qwen2.5-7b-instruct",
+        params={"max_tokens": 1024, "temperature": 0.2},
+    )
+    
+    mock_config.model_provider = "llamafile"
+    with pytest.raises(ConfigurationError, match="Unknown MODEL_PROVIDER"):
+        client._create_provider_model("llamafile", "model", 0.2, 1024)
+
+
+# Prompt Fan-Out Tests
+
+@patch('strands_client.client.Agent')
+def test_process_prompts_runs_independent_agents_concurrently(mock_agent_class):
+    """Test that fan-out prompts run on separate agents in parallel with ordered results and per-item errors."""
+    import threading
+    import time
+    
+    lock = threading.Lock()
+    running = [0, 0]
+    
+    def make_agent(**kwargs):
+        def answer(prompt, **call_kwargs):
+            with lock:
+                running[0] += 1
+                running[1] = max(running[1], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            if prompt == "Summarize entity bad":
+                raise RuntimeError("model unavailable")
+            return f"answer to {prompt}"
+        return Mock(side_effect=answer, messages=[], **kwargs)
+    
+    mock_agent_class.side_effect = make_agent
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._tools = [_make_tool("get_entity_tool")]
+    client._agent = Mock(model="model", system_prompt="system", messages=[])
+    client._mcp_client = Mock()
+    client._session_lock = threading.Lock()
+    
+    results = client.map_prompt("Summarize entity {item}", ["1", "bad", "3", "4", "5", "6"], concurrency=3)
+    
+    assert [result["item"] for result in results] == ["1", "bad", "3", "4", "5", "6"]
+    assert results[0] == {"prompt": "Summarize entity 1", "response": "answer to Summarize entity 1", "item": "1"}
+    assert results[1]["error"] == "model unavailable"
+    assert "response" not in results[1]
+    assert running[1] == 3
+    assert mock_agent_class.call_count == 6
+    agent_kwargs = mock_agent_class.call_args.kwargs
+    assert agent_kwargs["model"] == "model"
+    assert agent_kwargs["system_prompt"] == "system"
+    assert agent_kwargs["callback_handler"] is None
+    assert [tool.tool_name for tool in agent_kwargs["tools"]] == ["get_entity_tool"]
+    client._agent.assert_not_called()
+    
+    assert client.map_prompt("Compare {a} with {b}", [{"a": "x", "b": "y"}])[0]["prompt"] == "Compare x with y"
+    mixed = client.map_prompt("Compare {a} with {b}", [{"a": "x"}, {"a": "x", "b": "z"}])
+    assert mixed[0]["prompt"] == "Compare {a} with {b}"
+    assert mixed[0]["error"].startswith("Cannot fill the template with {'a': 'x'}: KeyError('b')")
+    assert mixed[1]["response"] == "answer to Compare x with z"
+    
+    summary = client.reduce_results(results[:2], "Rank the entities")
+    assert mock_agent_class.call_args.kwargs["tools"] == []
+    assert summary.startswith("answer to Rank the entities")
+    assert "### 1. Summarize entity 1\nanswer to Summarize entity 1" in summary
+    assert "### 2. Summarize entity bad\n[failed: model unavailable]" in summary
+
+
+@patch('strands_client.client.Agent')
+def test_fan_out_prompts_cancelled_with_client_and_answers_truncated(mock_agent_class):
+    """Test that cancel() reaches running and queued fan-out prompts and reduce_results bounds its prompt."""
+    import threading
+    
+    started = threading.Event()
+    
+    def make_agent(**kwargs):
+        def answer(prompt, cancel_signal=None, **call_kwargs):
+            if prompt.startswith("Summarize"):
+                started.set()
+                cancel_signal.wait(5)
+                raise RuntimeError("stream aborted")
+            return prompt
+        return Mock(side_effect=answer, messages=[], **kwargs)
+    
+    mock_agent_class.side_effect = make_agent
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._tools = [_make_tool("get_entity_tool")]
+    client._agent = Mock(model="model", system_prompt="system", messages=[])
+    client._mcp_client = Mock()
+    client._session_lock = threading.Lock()
+    
+    results = []
+    runner = threading.Thread(target=lambda: results.extend(client.map_prompt("Summarize {item}", ["1", "2", "3"], concurrency=1)))
+    runner.start()
+    assert started.wait(5)
+    assert client.cancel("disconnected")
+    runner.join(5)
+    
+    assert [result["error"] for result in results] == ["Prompt disconnected"] * 3
+    assert mock_agent_class.call_count == 1
+    assert client._fan_out_tokens is None
+    assert client._fan_out_siblings is None
+    
+    long_answers = [{"prompt": f"Summarize {index}", "response": "x" * 500} for index in range(4)]
+    summary = client.reduce_results(long_answers, "Rank them", max_chars=400)
+    assert summary.count("x" * 85 + "... [truncated]") == 4
+    assert "x" * 101 not in summary
+    assert "x" * 500 in client.reduce_results(long_answers, "Rank them", max_chars=0)
+
+
+@patch('strands_client.client.Agent')
+def test_retargeted_fan_out_sibling_stays_silent(mock_agent_class):
+    """Test that a fan-out agent rebuilt for a per-prompt toolset keeps its silent callback handler."""
+    import threading
+    
+    mock_agent_class.side_effect = lambda **kwargs: Mock(return_value="done", **{"messages": [], **kwargs})
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._tools = [_make_tool("get_entity_tool"), _make_tool("update_entity_tool")]
+    client._agent = Mock(model="model", system_prompt="system", messages=[])
+    client._mcp_client = Mock()
+    client._session_lock = threading.Lock()
+    
+    results = client.process_prompts(["Get entity 1"], toolset="read-only")
+    
+    assert results == [{"prompt": "Get entity 1", "response": "done"}]
+    assert mock_agent_class.call_count == 2
+    retargeted = mock_agent_class.call_args.kwargs
+    assert [tool.tool_name for tool in retargeted["tools"]] == ["get_entity_tool"]
+    assert retargeted["callback_handler"] is None
+
+
+@patch('strands_client.client.config')
+@patch('strands_client.client.Agent')
+def test_retired_session_kept_open_until_fan_out_sibling_releases_it(mock_agent_class, mock_config):
+    """Test that a session replaced by the watchdog stays open while a fan-out sibling still uses it."""
+    import threading
+    import time
+    
+    mock_config.health_watchdog_probe_timeout = 5
+    old_session = Mock()
+    standby = Mock()
+    standby.call_tool_sync.return_value = {"content": [{"text": '{"status": "ok"}'}]}
+    client = StrandsReltioClient.__new__(StrandsReltioClient)
+    client._session_lock = threading.Lock()
+    client._mcp_client = old_session
+    client._tools = [_make_tool("get_entity_tool")]
+    client._tool_selectors = {}
+    client.oauth_client = Mock(token_expires_in=Mock(return_value=3000.0))
+    client._agent = Mock(model="model", system_prompt="system", messages=[])
+    client._connect_mcp = Mock(return_value=(standby, [_make_tool("get_entity_tool")]))
+    
+    sibling = client._fan_out_client()
+    client._swap_in_standby()
+    client._adopt_standby()
+    
+    assert sibling._mcp_client is old_session
+    assert client._retired_mcp_clients == [old_session]
+    old_session.stop.assert_not_called()
+    
+    client._release_fan_out_client(sibling)
+    for _ in range(100):
+        if old_session.stop.called:
+            break
+        time.sleep(0.01)
+    old_session.stop.assert_called_once_with(None, None, None)
+    assert client._retired_mcp_clients is None
+    assert client._fan_out_siblings is None